@@ -0,0 +1,34 @@
+# benchmarks/bench_batch_engine.py
+# Plant-steps per second of BatchSimulationEngine against a loop over
+# scalar SimulationEngine instances, both on the tabulated steam backend.
+#
+# Run from the repo root:  python benchmarks/bench_batch_engine.py
+
+import time
+
+from powerplantsim.simulation.batch import BatchSimulationEngine
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+
+def main(sizes=(1000, 10000, 100000), n_steps=10):
+    table = TabulatedSteamProperties()
+
+    engine = SimulationEngine(steam_properties=table)
+    start = time.perf_counter()
+    for _ in range(n_steps * 100):
+        engine.step_simulation(0.1)
+    scalar_rate = n_steps * 100 / (time.perf_counter() - start)
+    print(f"Scalar engine:          {scalar_rate:12.0f} plant-steps/s")
+
+    for n in sizes:
+        batch = BatchSimulationEngine(n, steam_properties=table)
+        start = time.perf_counter()
+        for _ in range(n_steps):
+            batch.step(0.1)
+        rate = n * n_steps / (time.perf_counter() - start)
+        print(f"Batch engine, N={n:<7}{rate:12.0f} plant-steps/s ({rate / scalar_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
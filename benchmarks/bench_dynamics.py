@@ -0,0 +1,66 @@
+# benchmarks/bench_dynamics.py
+# Wall time and accuracy of the dynamic plant model (engine with
+# dynamics=True) over two hours with a wellhead flow step and a fan speed
+# step: the adaptive DormandPrince45 driven once per minute of output
+# against fixed-step RK4 driven at the GUI and main.py step sizes. Errors
+# are the largest deviation from a tight-tolerance reference at the
+# one-minute output points.
+#
+# Run from the repo root:  python benchmarks/bench_dynamics.py
+
+import time
+import numpy as np
+
+from powerplantsim.simulation.dynamics import DormandPrince45, FixedStepRK4, PlantDynamics
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+DURATION = 7200.0   # s
+OUTPUT_EVERY = 60.0  # s
+# (time, field, value) input changes
+EVENTS = [(600.0, "wellhead_flow", 100.0), (3600.0, "fan_speed", 40.0)]
+
+
+def simulate(integrator, step, table):
+    """Returns (wall time, outputs at every OUTPUT_EVERY, integrator)."""
+    engine = SimulationEngine(steam_properties=table, dynamics=True, integrator=integrator)
+    engine.solve_steady_state()
+    engine.state["generator_load"] = engine.state["generator_power"]
+
+    per_output = int(round(OUTPUT_EVERY / step))
+    outputs = []
+    start = time.perf_counter()
+    while engine.simulation_time < DURATION - 1e-9:
+        for at, name, value in EVENTS:
+            if abs(engine.simulation_time - at) < 1e-6:
+                engine.state[name] = value
+        for _ in range(per_output):
+            engine.step_simulation(step)
+        outputs.append([engine.state[name] for name in PlantDynamics.STATES])
+    return time.perf_counter() - start, np.array(outputs), engine.dynamics.integrator
+
+
+def main():
+    table = TabulatedSteamProperties()
+    atol = np.array([1e-3, 1e-6, 1e-5, 1e-4])
+    _, reference, _ = simulate(DormandPrince45(rtol=1e-11, atol=atol * 1e-5), OUTPUT_EVERY, table)
+
+    runs = [
+        ("Fixed RK4, dt=0.1 s", FixedStepRK4(0.1), 0.1),
+        ("Fixed RK4, dt=1.0 s", FixedStepRK4(1.0), 1.0),
+    ] + [
+        (f"Adaptive DP45, rtol={rtol:.0e}", DormandPrince45(rtol=rtol, atol=atol * rtol / 1e-6), OUTPUT_EVERY)
+        for rtol in (1e-4, 1e-6, 1e-8)
+    ]
+
+    print(f"{'':30} {'wall (s)':>9} {'steps':>8} {'f evals':>8}   max error: "
+          + "  ".join(f"{name:>18}" for name in PlantDynamics.STATES))
+    for label, integrator, step in runs:
+        wall, outputs, used = simulate(integrator, step, table)
+        error = np.max(np.abs(outputs - reference), axis=0)
+        print(f"{label:30} {wall:9.3f} {used.steps:8d} {used.evaluations:8d}   "
+              + "            " + "  ".join(f"{e:18.2e}" for e in error))
+
+
+if __name__ == "__main__":
+    main()
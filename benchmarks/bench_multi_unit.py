@@ -0,0 +1,52 @@
+# benchmarks/bench_multi_unit.py
+# Step time of MultiUnitEngine as the field grows from one well and one
+# turbine train to 100 wells and 8 trains, against stepping one scalar
+# SimulationEngine per turbine train. Both use the tabulated steam backend.
+#
+# Run from the repo root:  python benchmarks/bench_multi_unit.py
+
+import time
+import numpy as np
+
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.multiunit import MultiUnitEngine
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+# (wells, separators, headers, turbine trains)
+LAYOUTS = [(1, 1, 1, 1), (10, 2, 1, 2), (25, 4, 1, 4), (50, 6, 2, 4), (100, 10, 2, 8)]
+
+
+def time_steps(step, n_steps):
+    step(0.1)
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        step(0.1)
+    return (time.perf_counter() - start) / n_steps
+
+
+def main(n_steps=5000):
+    table = TabulatedSteamProperties()
+    print(f"{'wells':>5} {'seps':>5} {'hdrs':>5} {'trains':>6} {'step (us)':>10} {'per unit (us)':>14}"
+          f" {'scalar engines (us)':>20}")
+    for wells, separators, headers, turbines in LAYOUTS:
+        engine = MultiUnitEngine(wells, separators, turbines, headers, steam_properties=table)
+        engine.state["wellhead_flow"][:] = np.linspace(50.0, 150.0, wells)
+        step = time_steps(engine.step_simulation, n_steps)
+
+        # One scalar engine per well, the only way to get this many units
+        # out of SimulationEngine
+        scalars = [SimulationEngine(steam_properties=table) for _ in range(wells)]
+
+        def step_all(dt):
+            for scalar in scalars:
+                scalar.state.wellhead_flow += 1e-9  # defeat skipping, as in a live field
+                scalar.step_simulation(dt)
+
+        scalar_step = time_steps(step_all, max(n_steps // wells, 50))
+        units = wells + separators + headers + 2 * turbines
+        print(f"{wells:5d} {separators:5d} {headers:5d} {turbines:6d} {step * 1e6:10.1f} "
+              f"{step * 1e6 / units:14.2f} {scalar_step * 1e6:20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_plant_state.py
+# Per-step state access overhead and memory per instance: the old
+# string-keyed dict against PlantState.
+#
+# Run from the repo root:  python benchmarks/bench_plant_state.py
+
+import time
+import tracemalloc
+
+from powerplantsim.simulation.state import INITIAL_STATE, PlantState
+
+
+def dict_step(state):
+    # Same reads and writes as step_simulation did on the dict
+    p, t, f = state["wellhead_pressure"], state["wellhead_temp"], state["wellhead_flow"]
+    state["separator_outlet_pressure"] = p - 2
+    state["separator_outlet_steam_flow"] = f * 0.9
+    state["separator_outlet_steam_temp"] = t * 0.995
+    state["steam_flow"] = state["separator_outlet_steam_flow"]
+    power = state["separator_outlet_steam_flow"] * (state["separator_outlet_pressure"] - state["condenser_pressure"])
+    state["turbine_out_power"] = power
+    state["condenser_pressure"] = 0.1 + 0 * state["steam_flow"] * state["wellhead_temp"]
+    state["condenser_temp"] = 40.0
+
+
+def slots_step(state):
+    p, t, f = state.wellhead_pressure, state.wellhead_temp, state.wellhead_flow
+    state.separator_outlet_pressure = p - 2
+    state.separator_outlet_steam_flow = f * 0.9
+    state.separator_outlet_steam_temp = t * 0.995
+    state.steam_flow = state.separator_outlet_steam_flow
+    power = state.separator_outlet_steam_flow * (state.separator_outlet_pressure - state.condenser_pressure)
+    state.turbine_out_power = power
+    state.condenser_pressure = 0.1 + 0 * state.steam_flow * state.wellhead_temp
+    state.condenser_temp = 40.0
+
+
+def time_steps(step, state, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        step(state)
+    return (time.perf_counter() - start) / n
+
+
+def bytes_per_instance(factory, n):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [factory() for _ in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return (after - before) / n
+
+
+def main(n_steps=500000, n_instances=10000):
+    t_dict = time_steps(dict_step, dict(INITIAL_STATE), n_steps)
+    t_slots = time_steps(slots_step, PlantState(), n_steps)
+    m_dict = bytes_per_instance(lambda: dict(INITIAL_STATE), n_instances)
+    m_slots = bytes_per_instance(PlantState, n_instances)
+
+    print(f"State access per step, dict:       {t_dict * 1e9:8.0f} ns")
+    print(f"State access per step, PlantState: {t_slots * 1e9:8.0f} ns ({t_dict / t_slots:.2f}x)")
+    print(f"Memory per instance, dict:         {m_dict:8.0f} bytes")
+    print(f"Memory per instance, PlantState:   {m_slots:8.0f} bytes ({m_dict / m_slots:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
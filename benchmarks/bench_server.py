@@ -0,0 +1,116 @@
+# benchmarks/bench_server.py
+# Load test of the WebSocket simulation server: starts the server in its own
+# process, connects hundreds of local viewers that decode every frame, a few
+# stalled viewers that never read, and one controller that moves the
+# wellhead flow like a slider. Reports the frame rate each viewer actually
+# got and the bytes per frame.
+#
+# Run from the repo root:
+#   python benchmarks/bench_server.py                 # 300 viewers for 10 s
+#   python benchmarks/bench_server.py --viewers 500 --stalled 20 --seconds 20
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from powerplantsim.server.websocket import ConnectionClosed, connect
+from powerplantsim.simulation.frames import KEY, FrameDecoder
+
+
+def start_server(rate):
+    env = dict(os.environ)
+    python_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [python_dir, env.get("PYTHONPATH")]))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "powerplantsim.server.simulation_server", "--port", "0", "--rate", str(rate)],
+        env=env, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()  # "Serving on ws://host:port/"
+    port = int(line.rsplit(":", 1)[1].strip("/\n"))
+    return process, port
+
+
+async def viewer(port, stop, stats):
+    websocket = await connect("127.0.0.1", port)
+    decoder = FrameDecoder(json.loads(await websocket.recv())["fields"])
+    frames = keys = size = errors = 0
+    first = None
+    try:
+        while time.perf_counter() < stop:
+            message = await asyncio.wait_for(websocket.recv(), stop - time.perf_counter())
+            if isinstance(message, str):
+                continue
+            if first is None:
+                first = time.perf_counter()
+            frames += 1
+            size += len(message)
+            keys += message[0] == KEY
+            try:
+                decoder.decode(message)
+            except ValueError:
+                errors += 1
+    except (asyncio.TimeoutError, ConnectionClosed):
+        pass
+    elapsed = time.perf_counter() - first if first else 0.0
+    stats.append((frames / elapsed if elapsed else 0.0, size, frames, keys, errors))
+    await websocket.close()
+
+
+async def stalled_viewer(port, stop):
+    # Never reads; once its buffers fill the server skips it
+    websocket = await connect("127.0.0.1", port)
+    await asyncio.sleep(max(0.0, stop - time.perf_counter()))
+    websocket.writer.transport.abort()
+
+
+async def controller(port, stop):
+    websocket = await connect("127.0.0.1", port)
+    flow = 85.0
+    while time.perf_counter() < stop:
+        flow = 185.0 - flow  # alternate between 85 and 100 kg/s
+        await websocket.send(json.dumps({"type": "input", "name": "wellhead_flow", "value": flow}))
+        await asyncio.sleep(0.5)
+    await websocket.close()
+
+
+async def load_test(port, n_viewers, n_stalled, seconds):
+    stats = []
+    stop = time.perf_counter() + seconds
+    tasks = [viewer(port, stop, stats) for _ in range(n_viewers)]
+    tasks += [stalled_viewer(port, stop) for _ in range(n_stalled)]
+    tasks.append(controller(port, stop))
+    await asyncio.gather(*tasks)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WebSocket server load test")
+    parser.add_argument("--viewers", type=int, default=300)
+    parser.add_argument("--stalled", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=20.0, help="server frames per second")
+    args = parser.parse_args(argv)
+
+    process, port = start_server(args.rate)
+    try:
+        stats = asyncio.run(load_test(port, args.viewers, args.stalled, args.seconds))
+    finally:
+        process.terminate()
+        process.wait()
+
+    rates = [s[0] for s in stats]
+    frames = sum(s[2] for s in stats)
+    print(f"{len(stats)} viewers, {args.stalled} stalled, {args.seconds:.0f} s at {args.rate:.0f} Hz")
+    print(f"frames per viewer per second: mean {statistics.mean(rates):.1f}, "
+          f"min {min(rates):.1f}, max {max(rates):.1f}")
+    print(f"frames delivered: {frames} ({frames / args.seconds:.0f}/s), "
+          f"key frames: {sum(s[3] for s in stats)}, decode errors: {sum(s[4] for s in stats)}")
+    print(f"bytes per frame: {sum(s[1] for s in stats) / max(frames, 1):.1f}")
+
+
+if __name__ == "__main__":
+    main()
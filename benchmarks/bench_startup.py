@@ -0,0 +1,70 @@
+# benchmarks/bench_startup.py
+# Cold start of a headless worker: `python -X importtime` of the headless
+# entry points, listing the slowest imports, and the wall time from
+# interpreter start to the first engine step with the tabulated backend
+# (its table comes from the cache directory after the first run).
+#
+# Run from the repo root:  python benchmarks/bench_startup.py
+
+import os
+import subprocess
+import statistics
+import sys
+import time
+
+MODULES = ("powerplantsim.simulation.engine", "powerplantsim.simulation.batch",
+           "powerplantsim.simulation.sweep")
+
+FIRST_STEP = ("from powerplantsim.simulation.engine import SimulationEngine; "
+              "from powerplantsim.simulation.thermo import TabulatedSteamProperties; "
+              "SimulationEngine(steam_properties=TabulatedSteamProperties()).step_simulation(0.1)")
+
+
+def _env():
+    env = dict(os.environ)
+    python_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [python_dir, env.get("PYTHONPATH")]))
+    return env
+
+
+def import_times(modules):
+    """Returns [(cumulative us, self us, module, top level)] from python -X importtime."""
+    code = "; ".join(f"import {name}" for name in modules)
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=_env(),
+                            capture_output=True, text=True, check=True).stderr
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below the module that triggered them
+        times.append((int(cumulative_us), int(self_us), name.strip(), not name.startswith("  ")))
+    return times
+
+
+def time_first_step(repeat=5):
+    """Median wall time in seconds from interpreter start to the first step."""
+    subprocess.run([sys.executable, "-c", FIRST_STEP], env=_env(), check=True)  # fill the cache
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", FIRST_STEP], env=_env(), check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main(top=10):
+    times = import_times(MODULES)
+    total = sum(cumulative for cumulative, _, _, top_level in times if top_level)
+    print(f"import {', '.join(MODULES)}: {total / 1000:.1f} ms")
+    print(f"\n{'self (ms)':>10} {'cumulative (ms)':>16}  module")
+    for cumulative, self_us, name, _ in sorted(times, key=lambda t: t[1], reverse=True)[:top]:
+        print(f"{self_us / 1000:10.2f} {cumulative / 1000:16.2f}  {name}")
+    loaded = {name.split(".")[0] for _, _, name, _ in times}
+    heavy = sorted(loaded & {"PyQt5", "pyqtgraph", "cv2", "iapws", "scipy"})
+    print(f"\nHeavy packages imported: {', '.join(heavy) or 'none'}")
+    print(f"Interpreter start to first step: {time_first_step() * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
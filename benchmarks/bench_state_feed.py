@@ -0,0 +1,86 @@
+# benchmarks/bench_state_feed.py
+# What a consumer of every engine step receives: the full state dict (as
+# the GUI worker publishes it, and as JSON for the network) against binary
+# delta frames from SimulationEngine.state_feed(), exact and with per-field
+# deadbands. The states are recorded first, so the timings cover only
+# producing the update, not the engine step.
+#
+# Run from the repo root:  python benchmarks/bench_state_feed.py
+
+import json
+import time
+
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.frames import FrameEncoder
+from powerplantsim.simulation.scenario import InputSeries
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+# Roughly the resolution anyone looks at
+DEADBANDS = {
+    "wellhead_pressure": 0.01, "wellhead_temp": 0.05, "wellhead_flow": 0.05,
+    "separator_outlet_pressure": 0.01, "separator_outlet_steam_flow": 0.05,
+    "separator_outlet_steam_temp": 0.05, "turbine_out_power": 0.01, "turbine_exhaust_flow": 0.05,
+    "steam_flow": 0.05, "condenser_pressure": 0.0005, "condenser_temp": 0.05,
+    "rotor_speed": 0.1, "hotwell_level": 0.001, "basin_temp": 0.05, "generator_power": 0.01,
+}
+
+
+def record_states(n_steps, dynamics):
+    """States of n_steps steps of 0.1 s with a slider move every 100 s."""
+    engine = SimulationEngine(steam_properties=TabulatedSteamProperties(), dynamics=dynamics)
+    times = [0.0]
+    flows = [85.0]
+    for t in range(100, int(n_steps * 0.1) + 100, 100):
+        times += [t - 0.01, t]
+        flows += [flows[-1], 185.0 - flows[-1]]  # 85 <-> 100 kg/s
+    inputs = InputSeries(times, ["wellhead_flow"], [[f] for f in flows])
+    states = []
+    block = inputs.sample([0.1 * (i + 1) for i in range(n_steps)]).tolist()
+    for (flow,) in block:
+        engine.state.wellhead_flow = flow
+        engine.step_simulation(0.1)
+        states.append((engine.simulation_time, engine.state.copy()))
+    return states
+
+
+def measure(name, produce, states):
+    """'produce' returns (bytes or None when in-process, number of fields) per state."""
+    start = time.perf_counter()
+    sizes = [produce(t, state) for t, state in states]
+    elapsed = time.perf_counter() - start
+    n = len(states)
+    empty = sum(1 for _, fields in sizes if fields == 0)
+    size = "-" if sizes[0][0] is None else f"{sum(s for s, _ in sizes) / n:.1f}"
+    print(f"{name:24} {elapsed / n * 1e6:9.2f} {size:>10} "
+          f"{sum(f for _, f in sizes) / n:11.2f} {100 * empty / n:9.1f}%")
+
+
+def main(n_steps=20000):
+    for dynamics in (False, True):
+        states = record_states(n_steps, dynamics)
+        print(f"\n{n_steps} steps, dynamics={dynamics}")
+        print(f"{'update':24} {'us/step':>9} {'bytes/step':>10} {'fields/step':>11} {'no change':>10}")
+
+        n_fields = len(states[0][1])
+
+        def copy(t, state):
+            state.copy()  # what SimulationWorker publishes
+            return None, n_fields
+
+        def as_json(t, state):
+            return len(json.dumps({"time": t, **state.as_dict()})), n_fields
+
+        measure("full state copy", copy, states)
+        measure("full dict as JSON", as_json, states)
+
+        for label, deadbands in (("delta frames, exact", None), ("delta frames, deadband", DEADBANDS)):
+            encoder = FrameEncoder(deadbands=deadbands)
+
+            def produce(t, state):
+                frame = encoder.encode(t, state)
+                return len(frame), (len(frame) - 16) // 8
+            measure(label, produce, states)
+
+
+if __name__ == "__main__":
+    main()
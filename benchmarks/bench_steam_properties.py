@@ -0,0 +1,54 @@
+# benchmarks/bench_steam_properties.py
+# Compares the exact IAPWS-97 backend with the tabulated backend: time per
+# enthalpy call, time per engine step, and the worst enthalpy error over
+# random points in the operating envelope.
+#
+# Run from the repo root:  python benchmarks/bench_steam_properties.py
+
+import time
+import numpy as np
+
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.thermo import IAPWS97Properties, TabulatedSteamProperties
+
+
+def time_per_call(func, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n
+
+
+def main(n_samples=5000, n_steps=2000):
+    exact = IAPWS97Properties()
+
+    start = time.perf_counter()
+    table = TabulatedSteamProperties()
+    build_time = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    P = rng.uniform(table.p_grid[0], table.p_grid[-1], n_samples)
+    T = rng.uniform(table.t_grid[0], table.t_grid[-1], n_samples)
+    h_exact = np.array([exact.enthalpy(p, t) for p, t in zip(P, T)])
+    h_table = np.array([table.enthalpy(p, t) for p, t in zip(P, T)])
+    max_error = np.max(np.abs(h_table - h_exact))
+
+    t_exact = time_per_call(lambda: exact.enthalpy(0.85, 450.25), n_steps)
+    t_table = time_per_call(lambda: table.enthalpy(0.85, 450.25), n_steps)
+
+    engine_exact = SimulationEngine()
+    engine_table = SimulationEngine(steam_properties=table)
+    s_exact = time_per_call(lambda: engine_exact.step_simulation(0.1), n_steps)
+    s_table = time_per_call(lambda: engine_table.step_simulation(0.1), n_steps)
+
+    print(f"Table build time:       {build_time * 1e3:.1f} ms")
+    print(f"Enthalpy, exact:        {t_exact * 1e6:.2f} us/call")
+    print(f"Enthalpy, tabulated:    {t_table * 1e6:.2f} us/call  ({t_exact / t_table:.1f}x)")
+    print(f"Engine step, exact:     {s_exact * 1e6:.2f} us/step ({1 / s_exact:.0f} steps/s)")
+    print(f"Engine step, tabulated: {s_table * 1e6:.2f} us/step ({1 / s_table:.0f} steps/s, {s_exact / s_table:.1f}x)")
+    print(f"Max enthalpy error:     {max_error:.4f} kJ/kg over {n_samples} points "
+          f"(bound {table.max_error} kJ/kg, {table.fallback_count} fallbacks)")
+
+
+if __name__ == "__main__":
+    main()
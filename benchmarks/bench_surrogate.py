@@ -0,0 +1,59 @@
+# benchmarks/bench_surrogate.py
+# Steady-state power queries per second from PlantSurrogate against the
+# engine it replaces (one SimulationEngine step per query, exact and
+# tabulated steam backends), plus the surrogate's error on fresh engine
+# runs. Queries are uniform over the trained envelope, so the share that
+# falls back to the engine is included in the timings.
+#
+# Run from the repo root:  python benchmarks/bench_surrogate.py
+
+import time
+import numpy as np
+
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.sensitivity import evaluate
+from powerplantsim.simulation.surrogate import DEFAULT_INPUTS, PlantSurrogate
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+
+def engine_rate(steam_properties, X):
+    engine = SimulationEngine(steam_properties=steam_properties)
+    start = time.perf_counter()
+    for row in X:
+        for parameter, value in zip(DEFAULT_INPUTS, row):
+            engine.state[parameter.name] = value
+        engine.step_simulation(1.0)
+    return len(X) / (time.perf_counter() - start)
+
+
+def main(n_queries=100000, seed=1):
+    start = time.perf_counter()
+    surrogate = PlantSurrogate.train()
+    print(f"Training:                {time.perf_counter() - start:10.2f} s, "
+          f"{100 * surrogate.validation['valid_fraction']:.1f} % of cells valid")
+
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([p.scale(rng.random(n_queries)) for p in DEFAULT_INPUTS])
+    exact = evaluate(DEFAULT_INPUTS, X, workers=1)[:, 0]
+
+    print(f"Engine, exact IAPWS:     {engine_rate(None, X[:50]):10.0f} queries/s")
+    print(f"Engine, tabulated:       {engine_rate(TabulatedSteamProperties(), X[:2000]):10.0f} queries/s")
+
+    start = time.perf_counter()
+    for pressure, temp, flow in X[:2000].tolist():
+        surrogate.predict_one(pressure, temp, flow)
+    print(f"Surrogate, one by one:   {2000 / (time.perf_counter() - start):10.0f} queries/s")
+
+    surrogate.fallback_count = 0
+    start = time.perf_counter()
+    values, bound = surrogate.predict(X)
+    print(f"Surrogate, batch of {n_queries}: {n_queries / (time.perf_counter() - start):10.0f} queries/s, "
+          f"{100 * surrogate.fallback_count / n_queries:.1f} % from the engine")
+
+    error = np.abs(values - exact)
+    print(f"Error: max {error.max():.4f} MW, rms {np.sqrt(np.mean(error ** 2)):.4f} MW, "
+          f"{100 * np.mean(error > bound):.3f} % above the reported bound")
+
+
+if __name__ == "__main__":
+    main()
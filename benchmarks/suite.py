@@ -0,0 +1,253 @@
+# benchmarks/suite.py
+# Regression-tracked benchmarks of the simulation hot path. Each run writes
+# its timings as JSON and compares them with a baseline; the exit status is
+# 1 if any benchmark got slower than its threshold allows.
+#
+# Run from the repo root:
+#   python benchmarks/suite.py                      # run and compare with benchmarks/baseline.json
+#   python benchmarks/suite.py -o results.json      # also keep this run's results
+#   python benchmarks/suite.py --save-baseline      # record a new baseline
+#   python benchmarks/suite.py -k engine            # only benchmarks whose name contains "engine"
+#
+# Baselines are machine specific: record one on the machine that runs the
+# comparison (e.g. the CI runner) before relying on the thresholds.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from powerplantsim.simulation.components import SteamTurbine
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+from bench_startup import FIRST_STEP, _env
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Slowdown factor of the median time that counts as a regression
+DEFAULT_THRESHOLD = 1.3
+
+# name -> (setup, number, repeat, threshold)
+BENCHMARKS = {}
+
+
+class Skip(Exception):
+    """Raised by a setup function when the benchmark cannot run here."""
+
+
+def benchmark(number, repeat=5, threshold=DEFAULT_THRESHOLD):
+    """
+    Registers a setup function. It is called once and returns the callable
+    that is timed; 'number' calls make one sample, 'repeat' samples are taken.
+    """
+    def register(setup):
+        BENCHMARKS[setup.__name__] = (setup, number, repeat, threshold)
+        return setup
+    return register
+
+
+@benchmark(number=200)
+def turbine_power_exact():
+    turbine = SteamTurbine()
+    return lambda: turbine.compute_mechanical_power_output(8.5, 177.11, 76.5, 0.1)
+
+
+@benchmark(number=20000)
+def turbine_power_tabulated():
+    turbine = SteamTurbine(steam_properties=TabulatedSteamProperties())
+    return lambda: turbine.compute_mechanical_power_output(8.5, 177.11, 76.5, 0.1)
+
+
+def _changing_step(engine):
+    # Alternate an input so the schedule cannot skip any node
+    flows = [85.0, 85.5]
+    state = engine.state
+
+    def step():
+        state.wellhead_flow = flows[int(engine.simulation_time * 10) % 2]
+        engine.step_simulation(0.1)
+    return step
+
+
+@benchmark(number=200)
+def engine_step_exact():
+    return _changing_step(SimulationEngine())
+
+
+@benchmark(number=20000)
+def engine_step_tabulated():
+    return _changing_step(SimulationEngine(steam_properties=TabulatedSteamProperties()))
+
+
+@benchmark(number=20000)
+def engine_step_steady():
+    engine = SimulationEngine(steam_properties=TabulatedSteamProperties())
+    return lambda: engine.step_simulation(0.1)
+
+
+@benchmark(number=20000)
+def engine_restore():
+    engine = SimulationEngine(steam_properties=TabulatedSteamProperties())
+    engine.step_simulation(0.1)
+    blob = engine.snapshot()
+    return lambda: engine.restore(blob)
+
+
+@benchmark(number=1, repeat=3)
+def headless_run_100k():
+    table = TabulatedSteamProperties()
+
+    def run():
+        engine = SimulationEngine(steam_properties=table)
+        engine.run(100000, dt=0.1, record=["turbine_out_power", "steam_flow", "condenser_pressure"])
+    return run
+
+
+@benchmark(number=1, repeat=5, threshold=1.5)
+def headless_cold_start():
+    # Interpreter start to the first step, in a fresh process
+    command = [sys.executable, "-c", FIRST_STEP]
+    env = _env()
+    return lambda: subprocess.run(command, env=env, check=True)
+
+
+@benchmark(number=200, threshold=1.5)
+def flow_diagram_update_values():
+    try:
+        from PyQt5.QtWidgets import QApplication
+        from powerplantsim.gui.flow_diagram import FlowDiagramWidget
+    except ImportError:
+        raise Skip("PyQt5 not installed")
+    app = QApplication.instance() or QApplication([])
+    widget = FlowDiagramWidget()
+    states = []
+    for flow in (85.0, 120.0):
+        engine = SimulationEngine(steam_properties=TabulatedSteamProperties())
+        engine.state["wellhead_flow"] = flow
+        engine.step_simulation(0.1)
+        states.append(engine.state)
+    calls = [0]
+
+    def update():
+        calls[0] += 1
+        widget.update_values(states[calls[0] % 2])
+        app.processEvents()
+    # Keep a reference to the application for as long as the widget lives
+    update.app = app
+    return update
+
+
+def run_benchmarks(pattern=None):
+    """Returns name -> result dict for every registered benchmark matching 'pattern'."""
+    results = {}
+    for name, (setup, number, repeat, threshold) in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        try:
+            func = setup()
+        except Skip as reason:
+            print(f"{name:32} skipped: {reason}")
+            continue
+        func()  # warm up caches and tables
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number)
+        results[name] = {
+            "median": statistics.median(samples),
+            "min": min(samples),
+            "number": number,
+            "repeat": repeat,
+            "threshold": threshold,
+        }
+        print(f"{name:32} {_format(results[name]['median']):>10}")
+    return results
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def compare(results, baseline):
+    """
+    Compares median times with the baseline.
+
+    Returns:
+        List of (name, ratio) for the benchmarks slower than their threshold
+    """
+    regressions = []
+    print(f"\n{'benchmark':32} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:32} {'-':>10} {_format(result['median']):>10}     new")
+            continue
+        ratio = result["median"] / base["median"]
+        flag = ""
+        if ratio > result["threshold"]:
+            regressions.append((name, ratio))
+            flag = f"  REGRESSION (> {result['threshold']:.2f}x)"
+        print(f"{name:32} {_format(base['median']):>10} {_format(result['median']):>10} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def _format(seconds):
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation hot-path benchmarks with regression check")
+    parser.add_argument("-o", "--output", help="write this run's results to a JSON file")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains this")
+    args = parser.parse_args(argv)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "results": run_benchmarks(args.pattern),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != report["machine"]:
+        print("\nNote: the baseline was recorded on a different machine or software stack")
+    regressions = compare(report["results"], baseline["results"])
+    if regressions:
+        print(f"\n{len(regressions)} regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QPolygonF, QFont, QPainterPath
 from PyQt5.QtCore import Qt, QPointF, QRectF, QTimer
+import time
 import numpy as np
 
 class ComponentSymbol:
@@ -168,6 +169,28 @@ class FlowDiagramWidget(QGraphicsView):
         self.labels = {}
         self.symbols = {}
 
+        # Last text and color shown per component; items are only touched
+        # when these change
+        self.shown_text = {}
+        self.shown_colors = {}
+        self.item_updates = 0
+
+        # One timer ends the highlight flash for every component at once
+        self.pending_flash = {}
+        self.flash_timer = QTimer(self)
+        self.flash_timer.setSingleShot(True)
+        self.flash_timer.timeout.connect(self.end_flash)
+
+        # Repaint statistics. The rate is refreshed by a timer rather than
+        # by paintEvent, so it drops to 0 when repaints stop.
+        self.repaint_count = 0
+        self.repaints_per_second = 0.0
+        self.repaint_window_start = time.perf_counter()
+        self.repaint_window_count = 0
+        self.repaint_rate_timer = QTimer(self)
+        self.repaint_rate_timer.timeout.connect(self.update_repaint_rate)
+        self.repaint_rate_timer.start(1000)
+
         # Define flow colors
         self.flow_colors = {
             "steam": QColor("#E6E6E6"),  # Light gray for steam
@@ -398,36 +421,74 @@ class FlowDiagramWidget(QGraphicsView):
             f"Temperature: {state['wellhead_temp']:.1f} °C\n"
             f"Flow: {state['wellhead_flow']:.1f} kg/s"
         )
-        self.labels["Wellhead"]["text"].setPlainText(wellhead_text)
+        self.set_component_text("Wellhead", wellhead_text)
 
         # Update separator values
-        if state['separator_outlet_pressure'] is not None:
-            separator_text = (
-                f"Outlet Pressure: {state['separator_outlet_pressure']:.1f} barG\n"
-                f"Steam Flow: {state['separator_outlet_steam_flow']:.1f} kg/s\n"
-                f"Steam Temp: {state['separator_outlet_steam_temp']:.1f} °C"
-            )
-            self.labels["Steam Separator"]["text"].setPlainText(separator_text)
+        separator_text = (
+            f"Outlet Pressure: {state['separator_outlet_pressure']:.1f} barG\n"
+            f"Steam Flow: {state['separator_outlet_steam_flow']:.1f} kg/s\n"
+            f"Steam Temp: {state['separator_outlet_steam_temp']:.1f} °C"
+        )
+        self.set_component_text("Steam Separator", separator_text)
+
+        # Update moisture separator values
+        moisture_text = (
+            f"Outlet Pressure: {state['turbine_inlet_pressure']:.1f} barG\n"
+            f"Steam Flow: {state['turbine_inlet_flow']:.1f} kg/s\n"
+            f"Steam Temp: {state['turbine_inlet_temp']:.1f} °C"
+        )
+        self.set_component_text("Moisture Sep", moisture_text)
 
         # Update turbine values
         turbine_text = f"Power Output: {state['turbine_out_power']:.1f} MW"
-        self.labels["Turbine"]["text"].setPlainText(turbine_text)
+        self.set_component_text("Turbine", turbine_text)
 
         # Update condenser values
         condenser_text = (
             f"Pressure: {state['condenser_pressure']:.3f} barA\n"
             f"Temperature: {state['condenser_temp']:.1f} °C"
         )
-        self.labels["Condenser"]["text"].setPlainText(condenser_text)
+        self.set_component_text("Condenser", condenser_text)
 
         # Color-code components based on their state
         self.update_component_colors(state)
 
+    def set_component_text(self, key, text):
+        """Sets a value label, skipping the scene update if the text is unchanged"""
+        if self.shown_text.get(key) == text:
+            return
+        self.shown_text[key] = text
+        self.labels[key]["text"].setPlainText(text)
+        self.item_updates += 1
+
+    def set_component_color(self, key, color):
+        """Sets a symbol color if its bucket changed and queues a highlight flash"""
+        rgb = color.rgb()
+        if self.shown_colors.get(key) == rgb:
+            return
+        self.shown_colors[key] = rgb
+        self.item_updates += 1
+        # Flash lighter now; the shared flash timer restores the real color
+        self.labels[key]["symbol"].setBrush(QBrush(color.lighter(120)))
+        self.pending_flash[key] = QBrush(color)
+        if not self.flash_timer.isActive():
+            self.flash_timer.start(100)
+
+    def end_flash(self):
+        """Restores every highlighted symbol in one pass"""
+        for key, brush in self.pending_flash.items():
+            self.labels[key]["symbol"].setBrush(brush)
+        self.pending_flash.clear()
+
     def update_component_colors(self, state):
         """Updates component colors based on their operational state"""
-        # Helper function to get color based on value range
+        # Helper function to get color based on value range. Gradients are
+        # quantized into color_steps buckets so that small changes in value
+        # don't repaint the symbol.
+        color_steps = 16
+
         def get_color(value, min_val, max_val, good_range=(0.3, 0.7)):
-            if value is None:
+            if np.isnan(value):
                 return QColor("#808080")  # Gray for unknown state
             
             # Normalize value to 0-1 range
@@ -435,7 +496,7 @@ class FlowDiagramWidget(QGraphicsView):
             
             if normalized < good_range[0]:
                 # Too low - use blue to yellow gradient
-                ratio = normalized / good_range[0]
+                ratio = np.clip(round(normalized / good_range[0] * color_steps) / color_steps, 0, 1)
                 return QColor(
                     int(255 * ratio),  # R
                     int(255 * ratio),  # G
@@ -443,7 +504,7 @@ class FlowDiagramWidget(QGraphicsView):
                 )
             elif normalized > good_range[1]:
                 # Too high - use yellow to red gradient
-                ratio = (normalized - good_range[1]) / (1 - good_range[1])
+                ratio = np.clip(round((normalized - good_range[1]) / (1 - good_range[1]) * color_steps) / color_steps, 0, 1)
                 return QColor(
                     255,               # R
                     int(255 * (1 - ratio)),  # G
@@ -459,16 +520,15 @@ class FlowDiagramWidget(QGraphicsView):
             min_val=8.0,    # Minimum acceptable pressure
             max_val=12.0    # Maximum acceptable pressure
         )
-        self.labels["Wellhead"]["symbol"].setBrush(QBrush(wellhead_color))
+        self.set_component_color("Wellhead", wellhead_color)
 
         # Separator coloring based on steam flow
-        if state['separator_outlet_steam_flow'] is not None:
-            separator_color = get_color(
-                state['separator_outlet_steam_flow'],
-                min_val=70.0,   # Minimum acceptable flow
-                max_val=100.0   # Maximum acceptable flow
-            )
-            self.labels["Steam Separator"]["symbol"].setBrush(QBrush(separator_color))
+        separator_color = get_color(
+            state['separator_outlet_steam_flow'],
+            min_val=70.0,   # Minimum acceptable flow
+            max_val=100.0   # Maximum acceptable flow
+        )
+        self.set_component_color("Steam Separator", separator_color)
 
         # Turbine coloring based on power output
         turbine_color = get_color(
@@ -476,7 +536,7 @@ class FlowDiagramWidget(QGraphicsView):
             min_val=0.0,    # Minimum power
             max_val=50.0    # Maximum expected power
         )
-        self.labels["Turbine"]["symbol"].setBrush(QBrush(turbine_color))
+        self.set_component_color("Turbine", turbine_color)
 
         # Condenser coloring based on pressure (vacuum)
         condenser_color = get_color(
@@ -485,14 +545,21 @@ class FlowDiagramWidget(QGraphicsView):
             max_val=0.08,   # Maximum acceptable vacuum
             good_range=(0.4, 0.6)
         )
-        self.labels["Condenser"]["symbol"].setBrush(QBrush(condenser_color))
-
-        # Add visual feedback animation
-        for key in self.labels:
-            original_brush = self.labels[key]["symbol"].brush()
-            highlight_brush = QBrush(original_brush.color().lighter(120))
-            self.labels[key]["symbol"].setBrush(highlight_brush)
-            QTimer.singleShot(100, lambda k=key, b=original_brush: self.labels[k]["symbol"].setBrush(b))
+        self.set_component_color("Condenser", condenser_color)
+
+    def paintEvent(self, event):
+        """Counts repaints so the effect of skipped updates can be measured."""
+        super().paintEvent(event)
+        self.repaint_count += 1
+
+    def update_repaint_rate(self):
+        """Sets repaints_per_second from the repaints since the last call."""
+        now = time.perf_counter()
+        elapsed = now - self.repaint_window_start
+        if elapsed > 0:
+            self.repaints_per_second = (self.repaint_count - self.repaint_window_count) / elapsed
+        self.repaint_window_start = now
+        self.repaint_window_count = self.repaint_count
 
     def wheelEvent(self, event):
         """Implements zoom functionality."""
@@ -1,14 +1,36 @@
+import math
+import os
 import sys
-import random
+import time
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QHBoxLayout, QPushButton, QVBoxLayout,
-    QLabel, QSlider, QGroupBox, QGridLayout, QLCDNumber, QFrame, QStatusBar
+    QLabel, QSlider, QGroupBox, QGridLayout, QLCDNumber, QFrame, QStatusBar,
+    QCheckBox
 )
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPalette, QColor
 from flow_diagram import FlowDiagramWidget
 from plots import PlotWidget
+from simulation_worker import SimulationWorker
 from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.frames import FrameEncoder
+from powerplantsim.simulation.profiling import Profiler
+from powerplantsim.simulation.scenario import load_scenario
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+# Key metric -> (state field, decimals shown)
+METRICS = {
+    "Wellhead Pressure": ("wellhead_pressure", 1),
+    "Wellhead Temperature": ("wellhead_temp", 1),
+    "Wellhead Flow": ("wellhead_flow", 1),
+    "Separator Pressure": ("separator_outlet_pressure", 1),
+    "Steam Flow": ("separator_outlet_steam_flow", 1),
+    "Turbine Power": ("turbine_out_power", 1),
+    "Condenser Pressure": ("condenser_pressure", 3),
+    "Condenser Temperature": ("condenser_temp", 1),
+}
+# Half the last displayed digit; smaller changes are not redrawn
+DISPLAY_DEADBANDS = {field: 0.5 * 10.0 ** -decimals for field, decimals in METRICS.values()}
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -20,11 +42,33 @@ class MainWindow(QMainWindow):
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Simulation running...")
-
-        # Initialize simulation engine first
-        self.simulation_engine = SimulationEngine()
+        self.profile_label = QLabel()
+        self.statusBar.addPermanentWidget(self.profile_label)
+        self.profile_label.hide()
+
+        # Initialize simulation engine first. The tabulated steam tables are
+        # well inside display precision and make time-warp much faster.
+        self.steam_properties = TabulatedSteamProperties()
+        self.simulation_engine = SimulationEngine(steam_properties=self.steam_properties)
+        self.load_parameters(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                          "..", "..", "..", "parameters.xlsx"))
+        # Reset returns the engine to this snapshot
+        self.initial_snapshot = self.simulation_engine.snapshot()
         self.simulation_time = 0.0
         self.dt = 0.1  # simulation time step in seconds
+        self.simulation_running = False
+
+        # The engine is stepped on a worker thread; the GUI only draws the
+        # snapshots it publishes. Commands sent before start() are applied
+        # when the thread starts.
+        self.simulation_worker = SimulationWorker(self.simulation_engine, self.dt, speed=1.0)
+
+        # Fields that moved by a visible amount since they were last drawn
+        self.display_changes = FrameEncoder(deadbands=DISPLAY_DEADBANDS)
+
+        # Opt-in per-component timing, shared by the worker and the GUI
+        self.profiler = Profiler()
+        self.profile_overlay_time = 0.0
 
         # Central widget container
         central_widget = QWidget()
@@ -65,10 +109,21 @@ class MainWindow(QMainWindow):
         # Digital display panel for key metrics
         self.create_digital_display(right_layout)
 
-        # Timer setup
-        self.simulation_running = False
+        # Redraw timer, at most once per display refresh
+        refresh_rate = QApplication.primaryScreen().refreshRate() or 60.0
+        self.frame_interval = 1000.0 / refresh_rate  # ms
+        self.late_frames = 0
+        self.last_frame_time = None
+        # Achieved simulation seconds per wall-clock second
+        self.sim_rate = 0.0
+        self.rate_reference = None  # (wall time, simulation time)
         self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_simulation_values)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        # Looked up on every tick so profiling can wrap the method
+        self.timer.timeout.connect(lambda: self.update_simulation_values())
+        self.timer.start(int(self.frame_interval))
+
+        self.simulation_worker.start()
 
     def create_simulation_controls(self, parent_layout):
         """Creates the simulation control panel"""
@@ -91,12 +146,34 @@ class MainWindow(QMainWindow):
         self.speed_slider.setMaximum(20)
         self.speed_slider.setValue(10)
         self.speed_slider.setTickPosition(QSlider.TicksBelow)
+        self.speed_slider.valueChanged.connect(self.speed_changed)
         sim_layout.addWidget(self.speed_slider)
         sim_layout.addWidget(QLabel("Speed"))
 
+        # Time warp: run as many steps per frame as the frame budget allows
+        self.time_warp_checkbox = QCheckBox("Time Warp")
+        self.time_warp_checkbox.toggled.connect(self.time_warp_toggled)
+        sim_layout.addWidget(self.time_warp_checkbox)
+
+        # Profiling: per-component timings in the status bar, Chrome trace
+        # written when switched off
+        self.profile_checkbox = QCheckBox("Profile")
+        self.profile_checkbox.toggled.connect(self.profiling_toggled)
+        sim_layout.addWidget(self.profile_checkbox)
+
         sim_group.setLayout(sim_layout)
         parent_layout.addWidget(sim_group)
 
+    def load_parameters(self, path):
+        """Applies the plant parameters of the workbook at 'path', if there is one"""
+        if not os.path.exists(path):
+            return
+        try:
+            # Compiled once and cached, later starts skip the xlsx parsing
+            load_scenario(path).apply(self.simulation_engine)
+        except ValueError as error:
+            self.statusBar.showMessage(f"Ignoring {os.path.basename(path)}: {error}")
+
     def create_plant_controls(self, parent_layout):
         """Creates the plant control panel with sliders"""
         control_group = QGroupBox("Plant Controls")
@@ -116,6 +193,17 @@ class MainWindow(QMainWindow):
             "Cooling Tower Fan Speed": {"min": 0, "max": 100, "default": 70, "unit": "%"}
         }
 
+        # Values loaded from the parameters workbook may lie outside the
+        # default ranges
+        state = self.simulation_engine.state
+        for name, field in (("Wellhead Pressure", "wellhead_pressure"),
+                            ("Wellhead Temperature", "wellhead_temp"),
+                            ("Wellhead Flow", "wellhead_flow")):
+            params = controls[name]
+            params["default"] = state[field]
+            params["min"] = min(params["min"], math.floor(state[field]))
+            params["max"] = max(params["max"], math.ceil(state[field]))
+
         # Create controls
         for i, (name, params) in enumerate(controls.items()):
             self.add_control(control_layout, i, name, params)
@@ -149,13 +237,7 @@ class MainWindow(QMainWindow):
         display_layout = QGridLayout()
 
         self.displays = {}
-        metrics = [
-            "Wellhead Pressure", "Wellhead Temperature", "Wellhead Flow",
-            "Separator Pressure", "Steam Flow", "Turbine Power",
-            "Condenser Pressure", "Condenser Temperature"
-        ]
-
-        for i, metric in enumerate(metrics):
+        for i, metric in enumerate(METRICS):
             lcd = QLCDNumber()
             lcd.setSegmentStyle(QLCDNumber.Flat)
             lcd.setDigitCount(6)
@@ -198,80 +280,136 @@ class MainWindow(QMainWindow):
         value = self.sliders[label].value() / 10
         self.value_labels[label].setText(f"{value} {self.get_unit(label)}")
         
-        # Update simulation state based on slider changes
+        # Send the new input to the simulation worker
         if label == "Wellhead Pressure":
-            self.simulation_engine.state["wellhead_pressure"] = value
+            self.simulation_worker.set_input("wellhead_pressure", value)
         elif label == "Wellhead Temperature":
-            self.simulation_engine.state["wellhead_temp"] = value
+            self.simulation_worker.set_input("wellhead_temp", value)
         elif label == "Wellhead Flow":
-            self.simulation_engine.state["wellhead_flow"] = value
+            self.simulation_worker.set_input("wellhead_flow", value)
         elif label == "Turbine Load":
             # Convert percentage to actual power output
             max_power = 50.0  # Maximum power output in MW
-            self.simulation_engine.state["turbine_out_power"] = (value / 100.0) * max_power
+            self.simulation_worker.set_input("turbine_out_power", (value / 100.0) * max_power)
         elif label == "Cooling Tower Fan Speed":
             # Adjust condenser temperature based on fan speed
             base_temp = 35.0  # Base condenser temperature
             temp_range = 10.0  # Temperature range affected by fan speed
-            self.simulation_engine.state["condenser_temp"] = base_temp + (100 - value) / 100.0 * temp_range
+            self.simulation_worker.set_input("condenser_temp", base_temp + (100 - value) / 100.0 * temp_range)
         
-        # Update displays with new simulation values
-        self.update_simulation_values()
         self.statusBar.showMessage(f"Adjusted {label} to {value} {self.get_unit(label)}")
 
+    def speed_changed(self, value):
+        """Sets simulation seconds per wall-clock second (slider 10 = real time)"""
+        self.simulation_worker.set_speed(value / 10)
+
+    def time_warp_toggled(self, enabled):
+        """Switches between paced stepping and time-warp mode"""
+        self.simulation_worker.set_time_warp(enabled, self.frame_interval / 1000.0)
+        self.speed_slider.setEnabled(not enabled)
+
+    def profiling_toggled(self, enabled):
+        """Starts or stops timing the engine components and the GUI updates"""
+        gui_methods = [
+            (self, "update_simulation_values", "gui.update_simulation_values"),
+            (self.plot_widget, "update_plot", "gui.plot.update_plot"),
+            (self.flow_diagram, "update_values", "gui.flow_diagram.update_values"),
+        ]
+        if enabled:
+            self.profiler.reset()
+            for obj, attr, name in gui_methods:
+                self.profiler.wrap_method(obj, attr, name)
+            self.simulation_worker.set_profiler(self.profiler)
+            self.profile_label.show()
+        else:
+            self.simulation_worker.set_profiler(None)
+            self.profiler.unwrap([obj for obj, _, _ in gui_methods])
+            self.profile_label.hide()
+            path = os.path.abspath("powerplantsim_trace.json")
+            self.profiler.dump_chrome_trace(path)
+            self.statusBar.showMessage(f"Profile trace written to {path}")
+
+    def update_profile_overlay(self, now):
+        """Refreshes the profiling summary in the status bar twice a second"""
+        if now - self.profile_overlay_time >= 0.5:
+            self.profile_overlay_time = now
+            self.profile_label.setText(self.profiler.summary())
+
     def toggle_simulation(self):
         """Start/Stop the simulation"""
         self.simulation_running = not self.simulation_running
+        self.simulation_worker.set_running(self.simulation_running)
         if self.simulation_running:
             self.start_stop_btn.setText("Stop")
-            self.timer.start(1000 // self.speed_slider.value())
             self.statusBar.showMessage("Simulation running...")
         else:
             self.start_stop_btn.setText("Start")
-            self.timer.stop()
             self.statusBar.showMessage("Simulation paused")
 
     def reset_simulation(self):
         """Reset the simulation to initial conditions"""
         self.simulation_running = False
         self.simulation_time = 0.0
-        self.simulation_engine = SimulationEngine()  # Create fresh simulation
+        self.simulation_worker.set_running(False)
+        self.simulation_worker.restore(self.initial_snapshot)
         self.start_stop_btn.setText("Start")
-        self.update_simulation_values()  # Update displays with initial values
+        self.plot_widget.reset_plot()
 
-    def update_simulation_values(self):
-        """Update all display values from the simulation engine"""
-        if self.simulation_running:
-            # Step the simulation forward
-            self.simulation_engine.step_simulation(self.dt)
-            self.simulation_time += self.dt
-
-            # Update displays with actual simulation values
-            state = self.simulation_engine.state
-            
-            # Update wellhead values
-            self.displays["Wellhead Pressure"].display(f"{state['wellhead_pressure']:.1f}")
-            self.displays["Wellhead Temperature"].display(f"{state['wellhead_temp']:.1f}")
-            self.displays["Wellhead Flow"].display(f"{state['wellhead_flow']:.1f}")
-            
-            # Update separator values
-            if state['separator_outlet_pressure'] is not None:
-                self.displays["Separator Pressure"].display(f"{state['separator_outlet_pressure']:.1f}")
-            if state['separator_outlet_steam_flow'] is not None:
-                self.displays["Steam Flow"].display(f"{state['separator_outlet_steam_flow']:.1f}")
-            
-            # Update turbine values
-            self.displays["Turbine Power"].display(f"{state['turbine_out_power']:.1f}")
-            
-            # Update condenser values
-            self.displays["Condenser Pressure"].display(f"{state['condenser_pressure']:.3f}")
-            self.displays["Condenser Temperature"].display(f"{state['condenser_temp']:.1f}")
+    def closeEvent(self, event):
+        """Stops the simulation worker before the window closes"""
+        self.simulation_worker.stop()
+        super().closeEvent(event)
 
-            # Update status bar with simulation time
-            self.statusBar.showMessage(f"Simulation running... Time: {self.simulation_time:.1f} s")
+    def update_simulation_values(self):
+        """Draws the latest snapshot published by the simulation worker"""
+        now = time.perf_counter()
+        if self.last_frame_time is not None and (now - self.last_frame_time) * 1000 > 2 * self.frame_interval:
+            self.late_frames += 1
+        self.last_frame_time = now
+        if self.profile_checkbox.isChecked():
+            self.update_profile_overlay(now)
+
+        snapshot = self.simulation_worker.snapshots.take()
+        if snapshot is not None:
+            self.simulation_time, state = snapshot
+            self.update_sim_rate(now)
+
+            # Redraw only the displays whose values moved visibly
+            changed = self.display_changes.changes(state)
+            for metric, (field, decimals) in METRICS.items():
+                if field in changed:
+                    self.displays[metric].display(f"{changed[field]:.{decimals}f}")
+
+            # Update status bar with simulation time and frame counters
+            if self.simulation_running:
+                self.statusBar.showMessage(
+                    f"Simulation running... Time: {self.simulation_time:.1f} s | "
+                    f"Speed: {self.sim_rate:.1f}x | "
+                    f"Dropped snapshots: {self.simulation_worker.snapshots.dropped} | "
+                    f"Late frames: {self.late_frames} | "
+                    f"Diagram repaints/s: {self.flow_diagram.repaints_per_second:.0f} | "
+                    f"Overruns: {self.simulation_worker.overruns}"
+                )
 
             # Update flow diagram
-            self.flow_diagram.update_values(state)
+            if changed:
+                self.flow_diagram.update_values(state)
+
+            # Update plot
+            self.plot_widget.update_plot(
+                state['turbine_out_power'], state['steam_flow'],
+                simulation_time=self.simulation_time
+            )
+
+    def update_sim_rate(self, now):
+        """Updates the achieved simulation speed about twice a second"""
+        if self.rate_reference is None or self.simulation_time < self.rate_reference[1]:
+            self.rate_reference = (now, self.simulation_time)
+            return
+        wall_elapsed = now - self.rate_reference[0]
+        if wall_elapsed >= 0.5:
+            self.sim_rate = (self.simulation_time - self.rate_reference[1]) / wall_elapsed
+            self.rate_reference = (now, self.simulation_time)
 
     def get_unit(self, label):
         """Returns the appropriate unit for each control"""
@@ -284,30 +422,6 @@ class MainWindow(QMainWindow):
         }
         return units.get(label, "")
 
-    def update_simulation_values(self):
-        """Get values from sliders and update the GUI"""
-        new_data = {
-            "Wellhead": f"{self.sliders['Wellhead Flow'].value() / 10:.1f} kg/s",
-            "Wellhead Temp": f"{self.sliders['Wellhead Temperature'].value() / 10:.1f} °C",
-            "Steam Separator": f"{random.uniform(85, 100):.1f} kg/s",
-            "Moisture Sep": f"{random.uniform(80, 95):.1f} kg/s",
-            "Relief Valves": f"{random.uniform(0,15):.1f} %",
-            "Turbine": f"{random.uniform(5, 20):.1f} MW",
-            "Condenser": f"{random.uniform(30, 40):.1f} °C",
-            "Cooling Tower": f"{random.uniform(25, 35):.1f} °C"
-        }
-
-        # Update flow diagram
-        self.flow_diagram.update_values(new_data)
-
-        # Update plot (for example, tracking turbine power output)
-        self.plot_widget.update_plot(float(new_data["Turbine"].split()[0]))
-
-    def slider_changed(self, label):
-        """Updates label text when a slider is moved"""
-        value = self.sliders[label].value() / 10  # Convert back to decimal
-        self.labels[label].setText(f"{label}: {value} {self.get_unit(label)}")
-
 def main():
     app = QApplication(sys.argv)
     
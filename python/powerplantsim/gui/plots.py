@@ -6,7 +6,79 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QLabel
 import pyqtgraph as pg
 import numpy as np
 
+
+class MinMaxRing:
+    """
+    Circular buffer of (time, min, max) buckets, each summarising
+    'bucket_size' consecutive samples of every series. With bucket_size=1
+    it is a plain ring of raw samples.
+    """
+
+    def __init__(self, capacity, bucket_size, n_series):
+        self.capacity = capacity
+        self.bucket_size = bucket_size
+        self.time = np.zeros(capacity)
+        self.min = np.full((n_series, capacity), np.nan)
+        self.max = np.full((n_series, capacity), np.nan)
+        self.head = 0   # next slot to write
+        self.count = 0  # committed buckets
+
+        # Bucket still being filled
+        self.pending = 0
+        self.pending_time = 0.0
+        self.pending_min = np.full(n_series, np.nan)
+        self.pending_max = np.full(n_series, np.nan)
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.pending = 0
+
+    def append(self, t, values):
+        if self.pending == 0:
+            self.pending_time = t
+            self.pending_min[:] = values
+            self.pending_max[:] = values
+        else:
+            np.fmin(self.pending_min, values, out=self.pending_min)
+            np.fmax(self.pending_max, values, out=self.pending_max)
+        self.pending += 1
+
+        if self.pending == self.bucket_size:
+            self.time[self.head] = self.pending_time
+            self.min[:, self.head] = self.pending_min
+            self.max[:, self.head] = self.pending_max
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.pending = 0
+
+    def size(self):
+        return self.count + (1 if self.pending else 0)
+
+    def latest(self, n):
+        """Returns (time, min, max) of the newest n buckets, oldest first."""
+        n_committed = min(n - (1 if self.pending else 0), self.count)
+        idx = (self.head - n_committed + np.arange(n_committed)) % self.capacity
+        time, vmin, vmax = self.time[idx], self.min[:, idx], self.max[:, idx]
+        if self.pending:
+            time = np.append(time, self.pending_time)
+            vmin = np.column_stack([vmin, self.pending_min])
+            vmax = np.column_stack([vmax, self.pending_max])
+        return time, vmin, vmax
+
+
 class PlotWidget(QWidget):
+    # Time window choices in seconds
+    TIME_WINDOWS = {
+        '1 minute': 60,
+        '5 minutes': 300,
+        '15 minutes': 900,
+        '30 minutes': 1800,
+        '1 hour': 3600,
+        '6 hours': 6 * 3600,
+        '24 hours': 24 * 3600,
+    }
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout()
@@ -14,14 +86,14 @@ class PlotWidget(QWidget):
 
         # Create controls for plot configuration
         controls_layout = QHBoxLayout()
-        
+
         # Time window selector
         self.time_window_selector = QComboBox()
-        self.time_window_selector.addItems(['1 minute', '5 minutes', '15 minutes', '30 minutes', '1 hour'])
+        self.time_window_selector.addItems(list(self.TIME_WINDOWS))
         self.time_window_selector.currentTextChanged.connect(self.update_time_window)
         controls_layout.addWidget(QLabel("Time Window:"))
         controls_layout.addWidget(self.time_window_selector)
-        
+
         # Add stretch to push controls to the left
         controls_layout.addStretch()
         self.layout.addLayout(controls_layout)
@@ -37,85 +109,115 @@ class PlotWidget(QWidget):
         self.plot_widget.showGrid(x=True, y=True)
         self.plot_widget.addLegend()
 
-        # Initialize data storage
-        self.max_points = 3600  # Store up to 1 hour of data at 1 Hz
-        self.time_data = np.zeros(self.max_points)
-        self.value_data = {
-            'Power Output (MW)': np.zeros(self.max_points),
-            'Steam Flow (kg/s)': np.zeros(self.max_points),
-            'Efficiency (%)': np.zeros(self.max_points)
-        }
-        
+        # Initialize data storage: level 0 holds raw samples, every further
+        # level buckets 4x more samples into one min/max pair. Rendering
+        # picks the finest level whose newest buckets span the time window
+        # at roughly one bucket per pixel, so the cost per tick stays
+        # constant however long the window is.
+        self.series = ['Power Output (MW)', 'Steam Flow (kg/s)', 'Efficiency (%)']
+        self.level_capacity = 4096
+        self.levels = [
+            MinMaxRing(self.level_capacity, 4 ** level, len(self.series))
+            for level in range(10)
+        ]
+        self.sample_count = 0
+        self.latest_time = 0.0
+
         # Create plot lines with different colors
         self.plot_lines = {}
-        colors = {'Power Output (MW)': (255, 0, 0), 
+        colors = {'Power Output (MW)': (255, 0, 0),
                  'Steam Flow (kg/s)': (0, 255, 0),
                  'Efficiency (%)': (0, 0, 255)}
-        
+
         for name, color in colors.items():
             self.plot_lines[name] = self.plot_widget.plot(
-                self.time_data, 
-                self.value_data[name],
+                [], [],
                 pen=pg.mkPen(color=color, width=2),
-                name=name
+                name=name,
+                connect='finite'
             )
 
-        self.current_index = 0
-        self.start_time = 0
         self.display_window = 60  # Default to 1 minute
 
     def update_time_window(self, window_text):
         """Updates the time window for the plot"""
-        minutes = int(window_text.split()[0])
-        self.display_window = minutes * 60
-        self.update_plot_range()
+        self.display_window = self.TIME_WINDOWS[window_text]
+        self.redraw()
 
     def update_plot_range(self):
         """Updates the visible range of the plot"""
-        if self.current_index > 0:
+        if self.sample_count > 0:
             self.plot_widget.setXRange(
-                max(0, self.time_data[self.current_index-1] - self.display_window),
-                self.time_data[self.current_index-1]
+                max(0, self.latest_time - self.display_window),
+                self.latest_time,
+                padding=0
             )
 
     def reset_plot(self):
         """Resets all plot data"""
-        self.current_index = 0
-        self.start_time = 0
-        self.time_data.fill(0)
-        for data in self.value_data.values():
-            data.fill(0)
-        self.update_plot_range()
+        self.sample_count = 0
+        self.latest_time = 0.0
+        for level in self.levels:
+            level.clear()
+        self.redraw()
 
-    def update_plot(self, power_output, steam_flow=None, efficiency=None):
+    def update_plot(self, power_output, steam_flow=None, efficiency=None, simulation_time=None):
         """
         Updates the plot with new values.
-        
+
         Args:
             power_output (float): Current power output in MW
             steam_flow (float): Current steam flow in kg/s
             efficiency (float): Current efficiency in %
+            simulation_time (float): Simulation time in s; defaults to the
+                sample count when not given
         """
-        # Update time data
-        current_time = self.current_index
-        self.time_data[self.current_index] = current_time
-        
-        # Update value data
-        self.value_data['Power Output (MW)'][self.current_index] = power_output
-        if steam_flow is not None:
-            self.value_data['Steam Flow (kg/s)'][self.current_index] = steam_flow
-        if efficiency is not None:
-            self.value_data['Efficiency (%)'][self.current_index] = efficiency
-
-        # Update plot lines
-        for name, line in self.plot_lines.items():
-            line.setData(
-                self.time_data[:self.current_index+1],
-                self.value_data[name][:self.current_index+1]
-            )
+        if simulation_time is None:
+            simulation_time = float(self.sample_count)
+        values = np.array([
+            power_output,
+            np.nan if steam_flow is None else steam_flow,
+            np.nan if efficiency is None else efficiency,
+        ], dtype=float)
+
+        for level in self.levels:
+            level.append(simulation_time, values)
+        self.sample_count += 1
+        self.latest_time = simulation_time
+
+        self.redraw()
+
+    def redraw(self):
+        """Renders the visible window from the coarsest level it needs"""
+        if self.sample_count == 0:
+            for line in self.plot_lines.values():
+                line.setData([], [])
+            return
+
+        # Aim for one bucket per pixel (two points: min and max)
+        target = min(max(int(self.plot_widget.width()), 100), self.level_capacity)
+        window_start = self.latest_time - self.display_window
+        for level in self.levels:
+            time, vmin, vmax = level.latest(target)
+            if level.size() <= target or time[0] <= window_start:
+                break
+
+        visible = time >= window_start
+        # Keep the bucket straddling the window start so the line reaches
+        # the left edge.
+        first = max(int(np.argmax(visible)) - 1, 0) if visible.any() else len(time) - 1
+        time, vmin, vmax = time[first:], vmin[:, first:], vmax[:, first:]
 
-        # Increment index and wrap around if necessary
-        self.current_index = (self.current_index + 1) % self.max_points
+        if level.bucket_size == 1:
+            x = time
+        else:
+            x = np.repeat(time, 2)
+        for i, name in enumerate(self.series):
+            if level.bucket_size == 1:
+                y = vmin[i]
+            else:
+                y = np.column_stack([vmin[i], vmax[i]]).ravel()
+            self.plot_lines[name].setData(x, y, connect='finite')
 
         # Update visible range
         self.update_plot_range()
@@ -0,0 +1,195 @@
+# simulation_worker.py
+# Steps the SimulationEngine on its own thread so neither a slow step nor a
+# slow redraw holds up the other. The GUI only reads the latest published
+# snapshot; it never touches the engine directly.
+
+import time
+import queue
+from PyQt5.QtCore import QThread
+
+
+class LatestValue:
+    """
+    Single-slot handoff between one writer and one reader. Publishing
+    replaces the slot with a new (sequence, value) tuple, which is a single
+    atomic reference assignment, so no lock is needed. Values overwritten
+    before the reader took them are counted as dropped.
+    """
+
+    def __init__(self):
+        self._slot = (0, None)
+        self._last_taken = 0
+        self.dropped = 0
+
+    def publish(self, value):
+        self._slot = (self._slot[0] + 1, value)
+
+    def take(self):
+        """Returns the newest value, or None if nothing new was published."""
+        seq, value = self._slot
+        if seq == self._last_taken:
+            return None
+        self.dropped += seq - self._last_taken - 1
+        self._last_taken = seq
+        return value
+
+
+class SimulationWorker(QThread):
+    """
+    Advances the engine at 'speed' times real time using a fixed step 'dt'.
+    Inputs are queued and applied between steps. After every batch of steps
+    a (simulation_time, state copy) snapshot is published to 'snapshots'.
+
+    In time-warp mode the speed setting is ignored: every frame interval
+    the worker runs a batch of K steps, publishes once and sleeps for the
+    rest of the frame. K adapts so a batch fills 'warp_duty' of the frame,
+    which leaves the GUI thread time to draw.
+
+    Args:
+        engine (SimulationEngine): Engine to step; owned by this thread
+        dt (float): Simulation time step in seconds
+        speed (float): Simulation seconds per wall-clock second
+    """
+
+    # Longest the worker lets the simulation lag behind before giving up on
+    # catching up, in seconds of wall-clock time.
+    MAX_BACKLOG = 0.25
+
+    def __init__(self, engine, dt=0.1, speed=1.0, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.dt = dt
+        self.speed = speed
+        self.snapshots = LatestValue()
+        self.overruns = 0  # times the worker fell behind and dropped sim time
+        self.profiler = None  # applied to every engine this worker steps
+        self._commands = queue.SimpleQueue()
+        self._running = False
+        self._stopping = False
+
+        self.time_warp = False
+        self.frame_interval = 1 / 60  # s
+        self.warp_duty = 0.6
+        self.warp_steps = 1  # K, steps per frame in time-warp mode
+
+    # Called from the GUI thread ------------------------------------------
+
+    def set_input(self, name, value):
+        self._commands.put(("input", name, value))
+
+    def set_speed(self, speed):
+        self._commands.put(("speed", speed))
+
+    def set_running(self, running):
+        self._commands.put(("running", running))
+
+    def set_time_warp(self, enabled, frame_interval=None):
+        self._commands.put(("warp", enabled, frame_interval))
+
+    def replace_engine(self, engine):
+        self._commands.put(("engine", engine))
+
+    def restore(self, blob):
+        """Restores the engine from a SimulationEngine.snapshot() blob."""
+        self._commands.put(("restore", blob))
+
+    def set_profiler(self, profiler):
+        """Profiles the engine into 'profiler' (a Profiler), or stops with None."""
+        self._commands.put(("profiler", profiler))
+
+    def stop(self):
+        self._stopping = True
+        self.wait()
+
+    # Worker thread --------------------------------------------------------
+
+    def _apply_commands(self):
+        changed = False
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return changed
+            kind = command[0]
+            if kind == "input":
+                self.engine.state[command[1]] = command[2]
+            elif kind == "speed":
+                self.speed = command[1]
+            elif kind == "running":
+                self._running = command[1]
+            elif kind == "warp":
+                self.time_warp = command[1]
+                if command[2]:
+                    self.frame_interval = command[2]
+            elif kind == "engine":
+                self.engine = command[1]
+                if self.profiler is not None:
+                    self.engine.enable_profiling(self.profiler)
+            elif kind == "restore":
+                self.engine.restore(command[1])
+            elif kind == "profiler":
+                self.profiler = command[1]
+                if self.profiler is not None:
+                    self.engine.enable_profiling(self.profiler)
+                else:
+                    self.engine.disable_profiling()
+            changed = True
+
+    def _publish(self):
+        self.snapshots.publish((self.engine.simulation_time, self.engine.state.copy()))
+
+    def run(self):
+        self._publish()
+        last = time.perf_counter()
+        sim_debt = 0.0  # simulation seconds owed to the wall clock
+        while not self._stopping:
+            if self._apply_commands() and not self._running:
+                self._publish()
+            now = time.perf_counter()
+            if not self._running:
+                last = now
+                sim_debt = 0.0
+                time.sleep(0.005)
+                continue
+
+            if self.time_warp:
+                self._run_warp_frame()
+                last = time.perf_counter()
+                sim_debt = 0.0
+                continue
+
+            sim_debt += (now - last) * self.speed
+            last = now
+            if sim_debt > self.MAX_BACKLOG * self.speed + self.dt:
+                self.overruns += 1
+                sim_debt = self.dt
+
+            stepped = False
+            while sim_debt >= self.dt:
+                self.engine.step_simulation(self.dt)
+                sim_debt -= self.dt
+                stepped = True
+            if stepped:
+                self._publish()
+
+            # Sleep until the next step is due
+            wait = (self.dt - sim_debt) / self.speed if self.speed > 0 else 0.005
+            time.sleep(min(max(wait, 0.0), 0.005))
+
+    def _run_warp_frame(self):
+        frame_start = time.perf_counter()
+        for _ in range(self.warp_steps):
+            self.engine.step_simulation(self.dt)
+        elapsed = time.perf_counter() - frame_start
+        self._publish()
+
+        # Adapt K towards the batch budget, at most doubling per frame
+        budget = self.frame_interval * self.warp_duty
+        if elapsed > 0:
+            self.warp_steps = max(1, min(int(self.warp_steps * budget / elapsed), 2 * self.warp_steps))
+        else:
+            self.warp_steps *= 2
+
+        remaining = self.frame_interval - (time.perf_counter() - frame_start)
+        if remaining > 0:
+            time.sleep(remaining)
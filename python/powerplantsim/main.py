@@ -10,8 +10,8 @@ def main():
         engine.step_simulation(dt=1.0)
         print(f"Step {step+1}: Turbine Power = {engine.state['turbine_out_power']} MW")
         print(f"Step {step+1}: Steam Flow = {engine.state['steam_flow']} kg/s")
-        print(f"Step {step+1}: Turbine Inlet Pressure = {engine.state['separator_outlet_pressure']} bar")
-        print(f"Step {step+1}: Turbine Inlet Temp = {engine.state['separator_outlet_steam_temp']} °C")
+        print(f"Step {step+1}: Turbine Inlet Pressure = {engine.state['turbine_inlet_pressure']} bar")
+        print(f"Step {step+1}: Turbine Inlet Temp = {engine.state['turbine_inlet_temp']} °C")
 
     print("Done.")
 
@@ -0,0 +1,311 @@
+# powerplantsim/server/simulation_server.py
+#
+# Serves SimulationEngine sessions to many viewers over WebSocket. Every
+# session steps one authoritative engine in real time (times 'speed') and
+# broadcasts its state as binary frames (see simulation/frames.py) at
+# 'rate' Hz; viewers control it with JSON text messages.
+#
+# Run from the python/ directory:
+#   python -m powerplantsim.server.simulation_server --port 8765
+#
+# Protocol, ws://host:port/<session> (default session "default"):
+#   server -> viewer  text   {"type": "layout", "session", "fields", "dt"} once
+#                            {"type": "error", "message"} for a bad message
+#                     binary key and delta frames, see frames.py
+#   viewer -> server  text   {"type": "input", "name": "wellhead_flow", "value": 100}
+#                            {"type": "running", "value": false}
+#                            {"type": "speed", "value": 2.0}  (clamped to 'max_speed')
+#                            {"type": "reset"}
+#
+# Backpressure is per viewer: frames are written without waiting, and while
+# a viewer's unsent bytes exceed 'high_water' it is skipped. It then gets a
+# key frame once it has caught up, so a slow viewer never holds up the
+# session or the other viewers. A viewer stalled for 'stall_timeout'
+# seconds is disconnected.
+
+import argparse
+import asyncio
+import json
+import math
+import time
+
+from powerplantsim.server.websocket import (
+    BINARY, TEXT, ConnectionClosed, HandshakeError, accept, encode_frame, read_request, reject,
+)
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.state import PlantState
+
+
+class Viewer:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.synced = False      # received every frame up to the session's sequence
+        self.frames = 0          # frames written
+        self.skipped = 0         # frames skipped for backpressure
+        self.stalled_since = None
+
+
+class Session:
+    """
+    One engine and its viewers.
+
+    Args:
+        name (str): Session name, the request path
+        engine (SimulationEngine): Engine stepped by this session
+        dt (float): Simulation time step in seconds
+        speed (float): Simulation seconds per wall-clock second
+        high_water (int): Unsent bytes above which a viewer is skipped
+        stall_timeout (float): Seconds a viewer may stay skipped
+        deadbands (dict): Field -> smallest change sent to viewers
+        max_speed (float): Highest speed a viewer can set
+        max_steps_per_tick (int): Most engine steps run by one advance()
+            call, whatever the speed; the simulation falls behind real
+            time (times 'speed') rather than hold up the event loop
+    """
+
+    # Longest the session lets the simulation lag behind before giving up
+    # on catching up, in seconds of wall-clock time
+    MAX_BACKLOG = 0.25
+
+    def __init__(self, name, engine, dt=0.1, speed=1.0, high_water=64 * 1024, stall_timeout=10.0,
+                 deadbands=None, max_speed=100.0, max_steps_per_tick=100):
+        if max_steps_per_tick < 1:
+            raise ValueError("max_steps_per_tick must be at least 1")
+        self.name = name
+        self.engine = engine
+        self.dt = dt
+        self.max_speed = max_speed
+        self.max_steps_per_tick = max_steps_per_tick
+        self.speed = min(speed, max_speed)
+        self.high_water = high_water
+        self.stall_timeout = stall_timeout
+        self.running = True
+        self.viewers = set()
+        self.feed = engine.state_feed(deadbands)
+        self.initial_snapshot = engine.snapshot()
+        self.overruns = 0
+        self._sim_debt = 0.0
+        self._last = None
+
+    def layout_message(self):
+        return json.dumps({"type": "layout", "session": self.name,
+                           "fields": list(self.feed.fields), "dt": self.dt})
+
+    def handle(self, message):
+        """Applies one control message; returns an error text or None."""
+        try:
+            command = json.loads(message)
+            kind = command["type"]
+            if kind == "input":
+                name = command["name"]
+                if name not in PlantState.FIELDS:
+                    return f"unknown state field {name!r}"
+                value = float(command["value"])
+                # One NaN would poison the session for every viewer
+                if not math.isfinite(value):
+                    return f"{name} must be finite, got {command['value']!r}"
+                self.engine.state[name] = value
+            elif kind == "running":
+                self.running = bool(command["value"])
+            elif kind == "speed":
+                speed = float(command["value"])
+                if not math.isfinite(speed):
+                    return f"speed must be finite, got {command['value']!r}"
+                self.speed = min(max(0.0, speed), self.max_speed)
+            elif kind == "reset":
+                self.engine.restore(self.initial_snapshot)
+            else:
+                return f"unknown message type {kind!r}"
+        except (ValueError, KeyError, TypeError) as error:
+            return f"bad message: {error}"
+        return None
+
+    def advance(self, now):
+        """Steps the engine up to wall-clock time 'now' (perf_counter seconds)."""
+        last, self._last = self._last, now
+        if last is None or not self.running:
+            self._sim_debt = 0.0
+            return
+        self._sim_debt += (now - last) * self.speed
+        backlog = min(self.MAX_BACKLOG * self.speed + self.dt, self.max_steps_per_tick * self.dt)
+        if self._sim_debt > backlog:
+            self.overruns += 1
+            self._sim_debt = backlog
+        while self._sim_debt >= self.dt:
+            self.engine.step_simulation(self.dt)
+            self._sim_debt -= self.dt
+
+    def broadcast(self, now):
+        """Encodes the current state and writes it to every viewer that can take it."""
+        delta = encode_frame(BINARY, self.feed.poll())
+        key = None  # encoded for the first viewer that needs it
+        for viewer in list(self.viewers):
+            websocket = viewer.websocket
+            if websocket.buffered() > self.high_water:
+                viewer.synced = False
+                viewer.skipped += 1
+                if viewer.stalled_since is None:
+                    viewer.stalled_since = now
+                elif now - viewer.stalled_since > self.stall_timeout:
+                    self.viewers.discard(viewer)
+                    websocket.writer.transport.abort()
+                continue
+            viewer.stalled_since = None
+            if viewer.synced:
+                websocket.write_frame(delta)
+            else:
+                if key is None:
+                    key = encode_frame(BINARY, self.feed.key_frame())
+                websocket.write_frame(key)
+                viewer.synced = True
+            viewer.frames += 1
+
+
+class SimulationServer:
+    """
+    Hosts one Session per request path.
+
+    Args:
+        engine_factory (callable): Returns the engine of a new session
+        dt (float): Simulation time step in seconds
+        speed (float): Initial simulation speed of new sessions
+        rate (float): Frames broadcast per second
+        high_water (int): See Session
+        stall_timeout (float): See Session
+        max_sessions (int): Further session names are refused
+        max_viewers (int): Further connections are refused
+        deadbands (dict): See Session
+        max_speed (float): See Session
+        max_steps_per_tick (int): See Session
+    """
+
+    def __init__(self, engine_factory=SimulationEngine, dt=0.1, speed=1.0, rate=20.0,
+                 high_water=64 * 1024, stall_timeout=10.0, max_sessions=16, max_viewers=1000,
+                 deadbands=None, max_speed=100.0, max_steps_per_tick=100):
+        self.engine_factory = engine_factory
+        self.dt = dt
+        self.speed = speed
+        self.rate = rate
+        self.high_water = high_water
+        self.stall_timeout = stall_timeout
+        self.max_sessions = max_sessions
+        self.max_viewers = max_viewers
+        self.deadbands = deadbands
+        self.max_speed = max_speed
+        self.max_steps_per_tick = max_steps_per_tick
+        self.sessions = {}
+        self._server = None
+        self._ticker = None
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    def n_viewers(self):
+        return sum(len(session.viewers) for session in self.sessions.values())
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self._server = await asyncio.start_server(self._connection, host, port, backlog=1024)
+        self._ticker = asyncio.get_running_loop().create_task(self._tick())
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._ticker.cancel()
+        self._server.close()
+        for session in self.sessions.values():
+            for viewer in list(session.viewers):
+                await viewer.websocket.close(1001)
+            session.viewers.clear()
+        await self._server.wait_closed()
+
+    def session(self, path):
+        """Returns the session for a request path, creating it on first use."""
+        name = path.strip("/").split("?")[0] or "default"
+        session = self.sessions.get(name)
+        if session is None:
+            if len(self.sessions) >= self.max_sessions:
+                return None
+            session = self.sessions[name] = Session(
+                name, self.engine_factory(), self.dt, self.speed, self.high_water, self.stall_timeout,
+                self.deadbands, self.max_speed, self.max_steps_per_tick)
+        return session
+
+    async def _connection(self, reader, writer):
+        try:
+            path, key = await read_request(reader, writer)
+        except HandshakeError:
+            return
+        session = self.session(path) if self.n_viewers() < self.max_viewers else None
+        if session is None:
+            reject(writer)
+            return
+        websocket = accept(reader, writer, key)
+        viewer = Viewer(websocket)
+        websocket.write_frame(encode_frame(TEXT, session.layout_message()))
+        session.viewers.add(viewer)
+        try:
+            while True:
+                message = await websocket.recv()
+                if isinstance(message, str):
+                    error = session.handle(message)
+                    if error is not None:
+                        websocket.write_frame(encode_frame(TEXT, json.dumps({"type": "error", "message": error})))
+        except ConnectionClosed:
+            pass
+        finally:
+            session.viewers.discard(viewer)
+            writer.close()
+
+    async def _tick(self):
+        interval = 1.0 / self.rate
+        next_tick = time.perf_counter()
+        while True:
+            now = time.perf_counter()
+            for session in list(self.sessions.values()):
+                session.advance(now)
+                if session.viewers:
+                    session.broadcast(now)
+            next_tick = max(next_tick + interval, now)
+            await asyncio.sleep(next_tick - time.perf_counter())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve PowerPlantSim sessions over WebSocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    parser.add_argument("--dt", type=float, default=0.1, help="simulation time step in seconds")
+    parser.add_argument("--speed", type=float, default=1.0, help="simulation seconds per second")
+    parser.add_argument("--rate", type=float, default=20.0, help="frames per second")
+    parser.add_argument("--max-speed", type=float, default=100.0, help="highest speed a viewer can set")
+    parser.add_argument("--max-steps-per-tick", type=int, default=100,
+                        help="most simulation steps per frame, whatever the speed")
+    parser.add_argument("--exact", action="store_true",
+                        help="exact IAPWS-97 steam properties instead of the tables")
+    args = parser.parse_args(argv)
+
+    if args.exact:
+        factory = SimulationEngine
+    else:
+        from powerplantsim.simulation.thermo import TabulatedSteamProperties
+        table = TabulatedSteamProperties()
+
+        def factory():
+            return SimulationEngine(steam_properties=table)
+
+    async def serve():
+        server = SimulationServer(factory, dt=args.dt, speed=args.speed, rate=args.rate,
+                                  max_speed=args.max_speed, max_steps_per_tick=args.max_steps_per_tick)
+        await server.start(args.host, args.port)
+        print(f"Serving on ws://{args.host}:{server.port}/", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# powerplantsim/server/websocket.py
+#
+# Minimal RFC 6455 WebSocket on asyncio streams: the opening handshake,
+# framing, ping/pong and the closing handshake. No extensions; messages are
+# sent unfragmented. Enough for the simulation server and its clients
+# without a third-party dependency.
+
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+CONTINUATION = 0x0
+TEXT = 0x1
+BINARY = 0x2
+CLOSE = 0x8
+PING = 0x9
+PONG = 0xA
+
+
+class ConnectionClosed(Exception):
+    """Raised by recv() once the connection is closed."""
+
+
+class HandshakeError(Exception):
+    pass
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + GUID).encode()).digest()).decode()
+
+
+def _apply_mask(payload, mask):
+    n = len(payload)
+    key = int.from_bytes((mask * (n // 4 + 1))[:n], "big")
+    return (int.from_bytes(payload, "big") ^ key).to_bytes(n, "big")
+
+
+def encode_frame(opcode, payload, mask=False):
+    """
+    Returns one final frame. Server frames are unmasked, so a broadcast
+    frame can be encoded once and written to every connection.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+    n = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, mask_bit | n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, mask_bit | 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, mask_bit | 127, n)
+    if mask:
+        key = os.urandom(4)
+        return header + key + _apply_mask(payload, key)
+    return header + payload
+
+
+class WebSocket:
+    """
+    One open connection.
+
+    Args:
+        reader, writer: asyncio streams after the handshake
+        client (bool): Mask outgoing frames, as clients must
+        max_size (int): Largest message accepted, in bytes
+    """
+
+    def __init__(self, reader, writer, client=False, max_size=1 << 20):
+        self.reader = reader
+        self.writer = writer
+        self.client = client
+        self.max_size = max_size
+        self.closed = False
+
+    def write_frame(self, frame):
+        """Queues an encoded frame without waiting; see buffered()."""
+        if not self.closed:
+            self.writer.write(frame)
+
+    def buffered(self):
+        """Bytes queued in the transport that the peer has not taken yet."""
+        return self.writer.transport.get_write_buffer_size()
+
+    async def send(self, message):
+        """Sends str as a text message and bytes as a binary message."""
+        opcode = TEXT if isinstance(message, str) else BINARY
+        self.write_frame(encode_frame(opcode, message, mask=self.client))
+        await self.writer.drain()
+
+    async def _read_frame(self):
+        first, second = await self.reader.readexactly(2)
+        n = second & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", await self.reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+        if n > self.max_size:
+            raise ConnectionClosed(f"frame of {n} bytes exceeds max_size")
+        mask = await self.reader.readexactly(4) if second & 0x80 else None
+        payload = await self.reader.readexactly(n)
+        if mask:
+            payload = _apply_mask(payload, mask)
+        return first & 0x80, first & 0x0F, payload
+
+    async def recv(self):
+        """Returns the next text (str) or binary (bytes) message."""
+        message, message_opcode = [], None
+        while True:
+            try:
+                final, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError) as error:
+                self.closed = True
+                raise ConnectionClosed("connection lost") from error
+            if opcode == PING:
+                self.write_frame(encode_frame(PONG, payload, mask=self.client))
+                continue
+            if opcode == PONG:
+                continue
+            if opcode == CLOSE:
+                if not self.closed:
+                    self.write_frame(encode_frame(CLOSE, payload[:2], mask=self.client))
+                    self.closed = True
+                    self.writer.close()
+                raise ConnectionClosed("closed by peer")
+            if opcode != CONTINUATION:
+                message_opcode = opcode
+            message.append(payload)
+            if sum(len(part) for part in message) > self.max_size:
+                raise ConnectionClosed("message exceeds max_size")
+            if final:
+                data = b"".join(message)
+                return data.decode() if message_opcode == TEXT else data
+
+    async def close(self, code=1000):
+        if not self.closed:
+            self.write_frame(encode_frame(CLOSE, struct.pack("!H", code), mask=self.client))
+            self.closed = True
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def _read_headers(reader):
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as error:
+        raise HandshakeError("incomplete HTTP header") from error
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+async def read_request(reader, writer):
+    """
+    Reads a client's opening handshake; answer it with accept() or reject().
+
+    Returns:
+        (request path, Sec-WebSocket-Key)
+
+    Raises:
+        HandshakeError: after replying 400, if the request is not a
+            WebSocket upgrade
+    """
+    request, headers = await _read_headers(reader)
+    parts = request.split()
+    key = headers.get("sec-websocket-key")
+    if (len(parts) != 3 or parts[0] != "GET" or key is None
+            or headers.get("upgrade", "").lower() != "websocket"):
+        reject(writer, "400 Bad Request")
+        raise HandshakeError(f"not a WebSocket request: {request!r}")
+    return parts[1], key
+
+
+def accept(reader, writer, key, max_size=1 << 20):
+    """Completes the handshake and returns the server side WebSocket."""
+    writer.write((
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n"
+    ).encode())
+    return WebSocket(reader, writer, max_size=max_size)
+
+
+def reject(writer, status="503 Service Unavailable"):
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\n\r\n".encode())
+    writer.close()
+
+
+async def connect(host, port, path="/", max_size=1 << 20):
+    """Opens a client connection to ws://host:port/path."""
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write((
+        f"GET {path} HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\n"
+        "Sec-WebSocket-Version: 13\r\n\r\n"
+    ).encode())
+    status, headers = await _read_headers(reader)
+    if " 101 " not in status or headers.get("sec-websocket-accept") != accept_key(key):
+        writer.close()
+        raise HandshakeError(f"server refused the upgrade: {status}")
+    return WebSocket(reader, writer, client=True, max_size=max_size)
@@ -1,7 +1,41 @@
 # powerplantsim/simulation/components.py
 
-from iapws import IAPWS97
-class Wellhead:
+import itertools
+import numpy as np
+from powerplantsim.simulation.thermo import IAPWS97Properties, saturation_temperature
+
+# The *_array methods are NumPy counterparts of the scalar methods, used by
+# BatchSimulationEngine. Every argument is an array (one entry per plant) and
+# the formulas must stay identical to the scalar versions. Component
+# parameters may be arrays too, e.g. one turbine efficiency per plant in a
+# sensitivity study (sensitivity.py).
+#
+# The *_rate methods give time derivatives of the dynamic states; they are
+# integrated by PlantDynamics (dynamics.py) and must be smooth in their
+# arguments so the adaptive integrator can take long steps.
+
+WATER_DENSITY = 990.0  # kg/m3, condensate
+
+_versions = itertools.count(1)
+
+
+class Component:
+    """
+    Base of the plant components. Every attribute assignment stamps the
+    component with a new '_version', unique over all components, so a
+    compiled Schedule (graph.py) sees from one attribute whether a
+    parameter was set, or the component replaced, since its last
+    evaluation. Changes inside a parameter (an array modified in place, a
+    nested object) are not seen.
+    """
+    _version = 0  # no attribute set yet
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, "_version", next(_versions))
+
+
+class Wellhead(Component):
     def __init__(self):
         pass
     def compute_steam_output(self, wellhead_pressure, wellhead_flow):
@@ -10,55 +44,124 @@ class Wellhead:
             "steam_from_wellhead": steam_from_wellhead
         }
 
-class ReliefValve:
+class ReliefValve(Component):
     def __init__(self):
         pass
     def compute_valve_opening(self):
         return 0
 
-class SteamSeparator:
-    def __init__(self):
-        pass    
+class Manifold(Component):
+    """
+    Mixes the streams of several units into fewer outlets, e.g. wells into
+    separators or separators into steam headers. inlet_index[i] is the
+    outlet that inlet i feeds. Pressure and temperature are flow-weighted
+    averages; an outlet with no flow takes the plain average.
+    """
+    def __init__(self, inlet_index, n_outlets):
+        self.inlet_index = np.asarray(inlet_index)
+        self.n_outlets = n_outlets
+    def _average(self, values, flow, total, count):
+        weighted = np.bincount(self.inlet_index, weights=values * flow, minlength=self.n_outlets)
+        plain = np.bincount(self.inlet_index, weights=values, minlength=self.n_outlets)
+        has_flow = total > 0
+        return np.where(has_flow, weighted / np.where(has_flow, total, 1.0), plain / np.maximum(count, 1))
+    def mix_array(self, pressure, temp, flow):
+        total = np.bincount(self.inlet_index, weights=flow, minlength=self.n_outlets)
+        count = np.bincount(self.inlet_index, minlength=self.n_outlets)
+        return {
+            "pressure": self._average(pressure, flow, total, count),
+            "temp": self._average(temp, flow, total, count),
+            "flow": total,
+        }
+
+class Splitter(Component):
+    """
+    Shares each header's flow between the units connected to it, in
+    proportion to 'share' (set a unit's share to 0 to trip it). Every unit
+    sees its header's pressure and temperature. The flow of a header whose
+    units are all tripped is returned as 'vented', one value per header.
+    """
+    def __init__(self, outlet_header, share=None):
+        self.outlet_header = np.asarray(outlet_header)
+        self.share = np.ones(len(self.outlet_header)) if share is None else np.asarray(share, dtype=float)
+    def split_array(self, pressure, temp, flow):
+        total_share = np.bincount(self.outlet_header, weights=self.share, minlength=len(flow))
+        header_share = total_share[self.outlet_header]
+        fraction = np.where(header_share > 0, self.share / np.where(header_share > 0, header_share, 1.0), 0.0)
+        return {
+            "pressure": pressure[self.outlet_header],
+            "temp": temp[self.outlet_header],
+            "flow": flow[self.outlet_header] * fraction,
+            "vented": np.where(total_share > 0, 0.0, flow),
+        }
+
+class SteamSeparator(Component):
+    def __init__(self, pressure_drop=2.0, steam_fraction=0.9, temperature_index=0.995):
+        self.pressure_drop = pressure_drop          # bar
+        self.steam_fraction = steam_fraction        # of the inlet flow that leaves as steam
+        self.temperature_index = temperature_index  # outlet / inlet temperature
     def process(self, separator_inlet_pressure, separator_inlet_temp, separator_inlet_flow):
         # Stub logic
         # In a real scenario, you'd calculate the fraction that becomes steam,
         # the pressure drop, etc.
         return {
-            "separator_outlet_pressure": separator_inlet_pressure - 2,                # pretend we drop 2 bar
-            "separator_outlet_steam_flow": separator_inlet_flow * 0.9,                  # 80% becomes steam, for example
-            "separator_outlet_steam_temp": round(separator_inlet_temp * 0.995, 3),                 # assume 
+            "separator_outlet_pressure": separator_inlet_pressure - self.pressure_drop,
+            "separator_outlet_steam_flow": separator_inlet_flow * self.steam_fraction,
+            "separator_outlet_steam_temp": round(separator_inlet_temp * self.temperature_index, 3),
+        }
+    def process_array(self, separator_inlet_pressure, separator_inlet_temp, separator_inlet_flow):
+        return {
+            "separator_outlet_pressure": separator_inlet_pressure - self.pressure_drop,
+            "separator_outlet_steam_flow": separator_inlet_flow * self.steam_fraction,
+            "separator_outlet_steam_temp": np.round(separator_inlet_temp * self.temperature_index, 3),
         }
 
-class MoistureSeparator:
-    def __init__(self):
-        pass
+class MoistureSeparator(Component):
+    def __init__(self, pressure_drop=0.5, heat_index=0.995, flow_index=0.99):
+        self.pressure_drop = pressure_drop  # bar
+        self.heat_index = heat_index        # outlet / inlet temperature
+        self.flow_index = flow_index        # outlet / inlet flow
     def compute_waste_water(self):
         # placeholder
         return 0
     def process(self, separator_outlet_pressure, inlet_temp, inlet_flow):
         return {
-            "turbine_inlet_pressure": separator_outlet_pressure - 0.5,     # assume 0.5 bar pressure drop
-            "turbine_inlet_temp": inlet_temp * 0.995,               # assume 0.995 heat index
-            "turbine_inlet_flow": inlet_flow * 0.99,                # assume .99 flow index
+            "turbine_inlet_pressure": separator_outlet_pressure - self.pressure_drop,
+            "turbine_inlet_temp": inlet_temp * self.heat_index,
+            "turbine_inlet_flow": inlet_flow * self.flow_index,
         }
+    def process_array(self, separator_outlet_pressure, inlet_temp, inlet_flow):
+        return self.process(separator_outlet_pressure, inlet_temp, inlet_flow)
     
 
-class ReliefValve:
+class ReliefValve(Component):
     def __init__(self):
         pass
     def compute_valve_opening(self):
         return 0
         
-class Generator:
-    def __init__(self):
-        pass
+class Generator(Component):
+    def __init__(self, rated_power=60.0, rated_speed=3000.0, damping=2.5):
+        self.rated_power = rated_power  # MW
+        self.rated_speed = rated_speed  # rpm, synchronous speed
+        self.damping = damping          # pu power per pu speed deviation
     def compute_electric_power_output(self):
         # placeholder
         return 0
+    def electrical_power(self, rotor_speed, load):
+        # Dispatched load plus the grid's reaction to the rotor running
+        # ahead of (or behind) synchronous speed
+        deviation = rotor_speed / self.rated_speed - 1.0
+        return {"electrical_power": load + self.damping * self.rated_power * deviation}
     
-class Condenser:
-    def __init__(self):
-        pass
+class Condenser(Component):
+    def __init__(self, ua=8800.0, latent_heat=2390.0, vapour_capacitance=3600.0,
+                 hotwell_area=20.0, drain_gain=150.0):
+        self.ua = ua                                  # kW/K, tubes to cooling water
+        self.latent_heat = latent_heat                # kJ/kg
+        self.vapour_capacitance = vapour_capacitance  # kg of vapour per bar
+        self.hotwell_area = hotwell_area              # m2
+        self.drain_gain = drain_gain                  # kg/s condensate pumped per m of level
     def compute_cooling_capacity(self, inlet_flow, inlet_temp, dt):
         # Stub logic
         # Maybe you model some cooling over time
@@ -68,17 +171,49 @@ class Condenser:
             "pressure": new_pressure,
             "temperature": new_temp
         }
+    def compute_cooling_capacity_array(self, inlet_flow, inlet_temp, dt):
+        result = self.compute_cooling_capacity(inlet_flow, inlet_temp, dt)
+        return {
+            "pressure": np.full(np.shape(inlet_flow), result["pressure"]),
+            "temperature": np.full(np.shape(inlet_flow), result["temperature"])
+        }
+    def saturation_temp(self, pressure):
+        # bar -> °C; the floor keeps transients inside the IAPWS-97 range
+        return saturation_temperature(max(pressure, 0.01) * 0.1) - 273.15
+    def rates(self, pressure, hotwell_level, inlet_flow, cooling_water_temp):
+        # Steam condenses at the rate the tubes can take its latent heat away;
+        # the difference to the exhaust flow fills or empties the vapour space,
+        # and the condensate collects in the hotwell until the pump drains it.
+        condensed = self.ua * (self.saturation_temp(pressure) - cooling_water_temp) / self.latent_heat
+        condensed = max(condensed, 0.0)
+        return {
+            "pressure_rate": (inlet_flow - condensed) / self.vapour_capacitance,
+            "hotwell_level_rate": (condensed - self.drain_gain * hotwell_level) / (WATER_DENSITY * self.hotwell_area),
+            "heat_load": condensed * self.latent_heat,  # kW
+        }
     
-class CoolingTower:
-    def __init__(self):
-        pass
+class CoolingTower(Component):
+    def __init__(self, ua=23000.0, wet_bulb_temp=15.0, basin_heat_capacity=2.1e7):
+        self.ua = ua                                    # kW/K at full fan speed
+        self.wet_bulb_temp = wet_bulb_temp              # °C
+        self.basin_heat_capacity = basin_heat_capacity  # kJ/K, basin and circulating water
     def compute_cooling(self):
         return 0
+    def basin_temp_rate(self, basin_temp, heat_load, fan_speed):
+        # Natural draught gives 30 % of the full-fan heat rejection
+        rejected = self.ua * (0.3 + 0.7 * fan_speed / 100.0) * (basin_temp - self.wet_bulb_temp)
+        return {"basin_temp_rate": (heat_load - rejected) / self.basin_heat_capacity}
             
             # 0.223
-class SteamTurbine:
-    def __init__(self, efficiency=0.223): 
+class SteamTurbine(Component):
+    def __init__(self, efficiency=0.223, steam_properties=None, inertia_constant=5.0,
+                 rated_power=60.0, rated_speed=3000.0): 
         self.efficiency = efficiency
+        # Any backend from thermo.py, e.g. TabulatedSteamProperties for speed
+        self.steam_properties = steam_properties or IAPWS97Properties()
+        self.inertia_constant = inertia_constant  # s, stored energy at rated speed / rated power
+        self.rated_power = rated_power            # MW
+        self.rated_speed = rated_speed            # rpm
 
     def compute_mechanical_power_output(self, turbine_inlet_pressure, turbine_inlet_temp, turbine_inlet_steam_flow, turbine_outlet_pressure):
         
@@ -88,10 +223,14 @@ class SteamTurbine:
         # Convert temperature from °C to Kelvin
         T_in = turbine_inlet_temp + 273.15
 
-        # Get inlet state properties using iapws
-        inlet_state = IAPWS97(P=p_in, T=T_in)
-        h_in = inlet_state.h  # Enthalpy in kJ/kg
+        # Get inlet enthalpy from the steam property backend
+        h_in = self.steam_properties.enthalpy(p_in, T_in)  # Enthalpy in kJ/kg
+
+        power_MW = self.power_from_enthalpy(h_in, p_in, p_out, turbine_inlet_steam_flow)
+        return {"mechanical_power": round(power_MW, 3), "exhaust_flow": turbine_inlet_steam_flow}
 
+    def power_from_enthalpy(self, h_in, p_in, p_out, steam_flow):
+        """Unrounded mechanical power in MW for a known inlet enthalpy (pressures in MPa)."""
         h_drop_ideal = (p_in - p_out) / p_in * h_in  
         h_out_isentropic = h_in - h_drop_ideal
 
@@ -99,8 +238,25 @@ class SteamTurbine:
         h_out = h_in - self.efficiency * (h_in - h_out_isentropic)
 
         # Mechanical power (in kW) is mass flow (kg/s) * enthalpy drop (kJ/kg)
-        power_kW = turbine_inlet_steam_flow * (h_in - h_out)
+        power_kW = steam_flow * (h_in - h_out)
         # Convert kW to MW
-        power_MW = power_kW / 1e3
+        return power_kW / 1e3
+
+    def rotor_acceleration(self, rotor_speed, mechanical_power, electrical_power):
+        # Swing equation, 2H * w * dw/dt = Pm - Pe in per unit, returned in rpm/s
+        speed = max(rotor_speed / self.rated_speed, 0.1)
+        imbalance = (mechanical_power - electrical_power) / self.rated_power
+        return {"rotor_acceleration": self.rated_speed * imbalance / (2.0 * self.inertia_constant * speed)}
+
+    def compute_mechanical_power_output_array(self, turbine_inlet_pressure, turbine_inlet_temp, turbine_inlet_steam_flow, turbine_outlet_pressure):
+        p_in = turbine_inlet_pressure * 0.1
+        p_out = turbine_outlet_pressure * 0.1
+        T_in = turbine_inlet_temp + 273.15
+
+        h_in = self.steam_properties.enthalpy_array(p_in, T_in)
+        h_drop_ideal = (p_in - p_out) / p_in * h_in
+        h_out_isentropic = h_in - h_drop_ideal
+        h_out = h_in - self.efficiency * (h_in - h_out_isentropic)
 
-        return {"mechanical_power": round(power_MW, 3)}
\ No newline at end of file
+        power_MW = turbine_inlet_steam_flow * (h_in - h_out) / 1e3
+        return {"mechanical_power": np.round(power_MW, 3), "exhaust_flow": turbine_inlet_steam_flow}
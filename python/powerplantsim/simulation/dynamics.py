@@ -0,0 +1,254 @@
+# powerplantsim/simulation/dynamics.py
+#
+# ODE layer for the stateful components: turbine rotor speed, condenser
+# pressure and hotwell level, and cooling tower basin temperature. The
+# algebraic components (separator, turbine inlet) are evaluated once per
+# engine step; the dynamic states are then integrated over the whole step
+# with the inputs held, by an integrator that picks its own internal steps.
+
+import math
+import numpy as np
+
+# Dormand-Prince 5(4) tableau, see Hairer, Norsett & Wanner, Solving
+# Ordinary Differential Equations I, Table 5.2.
+_DP_C = np.array([0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0])
+_DP_A = [
+    np.array([1 / 5]),
+    np.array([3 / 40, 9 / 40]),
+    np.array([44 / 45, -56 / 15, 32 / 9]),
+    np.array([19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729]),
+    np.array([9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]),
+    np.array([35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84]),
+]
+# Fifth-order weights minus the embedded fourth-order ones
+_DP_E = np.array([71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40])
+
+
+class DormandPrince45:
+    """
+    Explicit embedded Runge-Kutta 5(4) integrator with error-controlled
+    step size. Each step's local error estimate is kept below
+    atol + rtol * |y| per component; the step grows while the solution is
+    smooth and shrinks through transients. The last step size is carried
+    over to the next integrate() call.
+
+    Args:
+        rtol (float): Relative tolerance
+        atol (float or array): Absolute tolerance, per component if an array
+        max_step (float): Upper limit on the internal step in seconds
+        first_step (float): Initial step; estimated from the rates if None
+    """
+
+    SAFETY = 0.9
+    MIN_FACTOR = 0.2
+    MAX_FACTOR = 5.0
+
+    def __init__(self, rtol=1e-6, atol=1e-6, max_step=np.inf, first_step=None):
+        self.rtol = rtol
+        self.atol = atol
+        self.max_step = max_step
+        self.h = first_step
+        self.steps = 0        # accepted steps
+        self.rejected = 0     # rejected steps
+        self.evaluations = 0  # calls of f
+
+    def _error_norm(self, error, y, y_new):
+        scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+        return math.sqrt(np.mean((error / scale) ** 2))
+
+    def _initial_step(self, f0, y):
+        scale = self.atol + self.rtol * np.abs(y)
+        d0 = math.sqrt(np.mean((y / scale) ** 2))
+        d1 = math.sqrt(np.mean((f0 / scale) ** 2))
+        return 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+
+    def integrate(self, f, t, y, t_end):
+        """
+        Integrates y' = f(t, y) from t to t_end.
+
+        Args:
+            f (callable): Rates, f(t, y) -> array like y
+            t (float): Start time
+            y (array): State at t
+            t_end (float): End time
+
+        Returns:
+            State at t_end
+
+        Raises:
+            FloatingPointError: if the rates are not finite, or the step
+                shrinks below the resolution of t
+        """
+        y = np.array(y, dtype=float)
+        k = np.empty((7, len(y)))
+        k[0] = f(t, y)
+        self.evaluations += 1
+        h = self.h if self.h else self._initial_step(k[0], y)
+
+        while t < t_end:
+            h = min(h, self.max_step)
+            # Land exactly on t_end without shrinking the step carried over
+            h_step = min(h, t_end - t)
+            for i, a in enumerate(_DP_A):
+                k[i + 1] = f(t + _DP_C[i + 1] * h_step, y + h_step * (a @ k[:i + 1]))
+            self.evaluations += 6
+            y_new = y + h_step * (_DP_A[-1] @ k[:6])
+            error = self._error_norm(h_step * (_DP_E @ k), y, y_new)
+            # A NaN error would be rejected forever with ever smaller steps
+            if not math.isfinite(error):
+                raise FloatingPointError(f"non-finite rates at t = {t}")
+
+            if error <= 1.0:
+                t += h_step
+                y = y_new
+                k[0] = k[6]  # first-same-as-last
+                self.steps += 1
+                factor = self.MAX_FACTOR if error == 0.0 else min(
+                    self.MAX_FACTOR, self.SAFETY * error ** -0.2)
+                if h_step == h:
+                    h *= factor
+            else:
+                self.rejected += 1
+                h = h_step * max(self.MIN_FACTOR, self.SAFETY * error ** -0.2)
+                if t + h == t:
+                    raise FloatingPointError(f"step size underflow at t = {t}")
+
+        self.h = h
+        return y
+
+
+class FixedStepRK4:
+    """
+    Classic fourth-order Runge-Kutta with a fixed step, for comparison with
+    DormandPrince45. A span that is not a multiple of 'step' is split into
+    equal steps no longer than 'step'.
+
+    Args:
+        step (float): Internal step in seconds
+    """
+
+    def __init__(self, step=0.1):
+        self.step = step
+        self.steps = 0
+        self.evaluations = 0
+
+    def integrate(self, f, t, y, t_end):
+        y = np.array(y, dtype=float)
+        n = max(1, math.ceil((t_end - t) / self.step - 1e-9))
+        h = (t_end - t) / n
+        for _ in range(n):
+            k1 = f(t, y)
+            k2 = f(t + h / 2, y + h / 2 * k1)
+            k3 = f(t + h / 2, y + h / 2 * k2)
+            k4 = f(t + h, y + h * k3)
+            y = y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+            t += h
+        self.steps += n
+        self.evaluations += 4 * n
+        return y
+
+
+class PlantDynamics:
+    """
+    Couples the dynamic states of the engine's components and advances
+    them with 'integrator'.
+
+    During one advance() the wellhead and separator outputs are held, while
+    the turbine's mechanical power follows the condenser pressure through
+    SteamTurbine.power_from_enthalpy. A NaN generator_load means the grid
+    takes whatever the turbine produces.
+
+    Args:
+        engine (SimulationEngine): Engine whose state and components are used
+        integrator: DormandPrince45 (default) or FixedStepRK4
+    """
+
+    STATES = ("rotor_speed", "condenser_pressure", "hotwell_level", "basin_temp")
+
+    def __init__(self, engine, integrator=None):
+        self.engine = engine
+        # Absolute tolerances in rpm, bar, m and °C
+        self.integrator = integrator or DormandPrince45(atol=np.array([1e-3, 1e-6, 1e-5, 1e-4]))
+
+    def _rates(self):
+        """Returns (rates(t, y), mechanical_power(y)) for the current inputs."""
+        state = self.engine.state
+        turbine = self.engine.turbine
+        condenser = self.engine.condenser
+        generator = self.engine.generator
+        coolingtower = self.engine.coolingtower
+
+        p_in = state.turbine_inlet_pressure * 0.1  # MPa
+        h_in = turbine.steam_properties.enthalpy(p_in, state.turbine_inlet_temp + 273.15)
+        flow = state.turbine_inlet_flow
+        fan_speed = state.fan_speed
+        load = state.generator_load
+
+        def mechanical_power(y):
+            return turbine.power_from_enthalpy(h_in, p_in, y[1] * 0.1, flow)
+
+        def rates(t, y):
+            rotor_speed, pressure, hotwell_level, basin_temp = y
+            mechanical = turbine.power_from_enthalpy(h_in, p_in, pressure * 0.1, flow)
+            condenser_rates = condenser.rates(pressure, hotwell_level, flow, basin_temp)
+            electrical = generator.electrical_power(
+                rotor_speed, mechanical if load != load else load)["electrical_power"]
+            return np.array([
+                turbine.rotor_acceleration(rotor_speed, mechanical, electrical)["rotor_acceleration"],
+                condenser_rates["pressure_rate"],
+                condenser_rates["hotwell_level_rate"],
+                coolingtower.basin_temp_rate(
+                    basin_temp, condenser_rates["heat_load"], fan_speed)["basin_temp_rate"],
+            ])
+
+        return rates, mechanical_power
+
+    def _store(self, y, mechanical_power):
+        state = self.engine.state
+        for name, value in zip(self.STATES, y):
+            state[name] = value
+        state["condenser_temp"] = self.engine.condenser.saturation_temp(state.condenser_pressure)
+        mechanical = mechanical_power(y)
+        state["turbine_out_power"] = round(mechanical, 3)
+        load = state.generator_load
+        state["generator_power"] = self.engine.generator.electrical_power(
+            state.rotor_speed, mechanical if load != load else load)["electrical_power"]
+
+    def state_vector(self):
+        return np.array([self.engine.state[name] for name in self.STATES])
+
+    def advance(self, duration):
+        """Integrates the dynamic states over 'duration' seconds."""
+        rates, mechanical_power = self._rates()
+        y = self.state_vector()
+        if duration > 0:
+            y = self.integrator.integrate(rates, 0.0, y, duration)
+        self._store(y, mechanical_power)
+
+    def solve_equilibrium(self, tol=1e-10, max_iter=50):
+        """
+        Sets the dynamic states to the point where all rates vanish, by
+        Newton iteration with a finite-difference Jacobian.
+
+        Returns:
+            True if the iteration converged
+        """
+        rates, mechanical_power = self._rates()
+        y = self.state_vector()
+        converged = False
+        for _ in range(max_iter):
+            f0 = rates(0.0, y)
+            jacobian = np.empty((len(y), len(y)))
+            for j in range(len(y)):
+                dy = 1e-7 * max(1.0, abs(y[j]))
+                y_j = y.copy()
+                y_j[j] += dy
+                jacobian[:, j] = (rates(0.0, y_j) - f0) / dy
+            step = np.linalg.solve(jacobian, f0)
+            y = y - step
+            y[1] = max(y[1], 0.01)  # condenser pressure stays positive
+            if np.all(np.abs(step) <= tol * np.maximum(1.0, np.abs(y))):
+                converged = True
+                break
+        self._store(y, mechanical_power)
+        return converged
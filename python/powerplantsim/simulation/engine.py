@@ -1,72 +1,352 @@
 # powerplantsim/simulation/engine.py
 
+from operator import attrgetter
+import numpy as np
 from powerplantsim.simulation.components import *
+from powerplantsim.simulation.dynamics import PlantDynamics
+from powerplantsim.simulation.frames import StateFeed
+from powerplantsim.simulation.graph import plant_graph
+from powerplantsim.simulation.memo import MemoizedComponent
+from powerplantsim.simulation.profiling import Profiler
+from powerplantsim.simulation.snapshot import SnapshotLayout, read_checkpoint, write_checkpoint
+from powerplantsim.simulation.state import PlantState
+from powerplantsim.simulation.trajectory import trajectory_dtype
 
 class SimulationEngine:
-    def __init__(self):
+    """
+    Args:
+        steam_properties: Steam property backend for the turbine
+        dynamics (bool): Integrate the dynamic component states (rotor
+            speed, condenser pressure and hotwell level, basin temperature)
+            instead of using the static condenser
+        integrator: Integrator for the dynamic states, see dynamics.py;
+            defaults to an adaptive DormandPrince45
+    """
+
+    def __init__(self, steam_properties=None, dynamics=False, integrator=None):
         
         self.wellhead = Wellhead()
         self.steamseparator = SteamSeparator()
         self.moistureseparator = MoistureSeparator()
-        self.turbine = SteamTurbine()
+        self.turbine = SteamTurbine(steam_properties=steam_properties)
         self.condenser = Condenser()
         self.generator = Generator()
         self.coolingtower = CoolingTower()
         self.relifvalve = ReliefValve()
 
         # Create an initial state
-        self.state = {
-            "wellhead_pressure": 10.5,   # barG
-            "wellhead_temp": 178,      # °C
-            "wellhead_flow": 85,      # kg/s
-            "separator_outlet_pressure": None,
-            "separator_outlet_steam_flow": None,
-            "separator_outlet_steam_temp": None,
-            "waste_water_flow": None,
-            "turbine_out_power": 0.0,
-            "steam_flow": None,
-            "condenser_pressure": 0.06,
-            "condenser_temp": 35,
+        self.state = PlantState()
+        self.simulation_time = 0.0  # s
+
+        self.dynamics = PlantDynamics(self, integrator) if dynamics else None
+        self.profiler = None  # set by enable_profiling()
+        self._snapshot_layout = None
+
+        # Plant layout, compiled once into the evaluation order
+        self.graph = plant_graph(dynamics=dynamics)
+        self.compile()
+
+    def compile(self):
+        """Recompiles self.graph; call after adding or removing nodes."""
+        self.schedule = self.graph.compile(self)
+
+    # Component attribute -> methods cached by enable_memoization()
+    MEMOIZED_METHODS = {
+        "steamseparator": ("process",),
+        "moistureseparator": ("process",),
+        "turbine": ("compute_mechanical_power_output",),
+    }
+
+    def enable_memoization(self, maxsize=1024, tolerance=1e-6):
+        """
+        Caches component results for repeated inputs, which is most steps in
+        steady operation. See MemoizedComponent for the meaning of the
+        arguments.
+        """
+        self.disable_memoization()
+        for attr, methods in self.MEMOIZED_METHODS.items():
+            setattr(self, attr, MemoizedComponent(getattr(self, attr), methods, maxsize, tolerance))
+
+    def disable_memoization(self):
+        for attr in self.MEMOIZED_METHODS:
+            component = getattr(self, attr)
+            if isinstance(component, MemoizedComponent):
+                setattr(self, attr, component.component)
+
+    def memo_stats(self):
+        """Returns cache_info() of every memoized component, by attribute name."""
+        return {
+            attr: getattr(self, attr).cache_info()
+            for attr in self.MEMOIZED_METHODS
+            if isinstance(getattr(self, attr), MemoizedComponent)
         }
 
+    def snapshot(self):
+        """
+        Returns the simulation time, the full state and every numeric
+        component parameter (e.g. turbine.efficiency) as a compact binary
+        blob for restore().
+        """
+        # Rebuilt on every snapshot so parameters added since are included
+        self._snapshot_layout = SnapshotLayout(self)
+        return self._snapshot_layout.pack(self)
+
+    def restore(self, blob):
+        """
+        Returns the engine to a snapshot() of itself or of an engine built
+        the same way. Takes microseconds, so many what-if branches can be
+        run from one warm state.
+        """
+        if self._snapshot_layout is None:
+            self._snapshot_layout = SnapshotLayout(self)
+        try:
+            self._snapshot_layout.unpack(self, blob)
+        except ValueError:
+            # The components may have changed since the layout was built
+            self._snapshot_layout = SnapshotLayout(self)
+            self._snapshot_layout.unpack(self, blob)
+
+    def state_feed(self, deadbands=None, fields=None):
+        """
+        Returns a StateFeed (see frames.py) whose poll() gives a compact
+        binary frame of only the fields that changed beyond 'deadbands'
+        since they were last sent. Costs nothing until polled.
+
+        Args:
+            deadbands (dict): Field -> smallest change worth sending
+            fields (list): Fields to feed, defaults to all fields
+        """
+        return StateFeed(self, tuple(fields) if fields else PlantState.FIELDS, deadbands)
+
+    def save_checkpoint(self, path):
+        """Writes snapshot() to 'path', replacing it atomically."""
+        write_checkpoint(path, self.snapshot())
+
+    def load_checkpoint(self, path):
+        self.restore(read_checkpoint(path))
+
+    # Component attributes whose process*/compute_* methods are timed by
+    # enable_profiling()
+    PROFILED_COMPONENTS = ("wellhead", "steamseparator", "moistureseparator", "turbine",
+                           "condenser", "generator", "coolingtower", "relifvalve")
+
+    def enable_profiling(self, profiler=None):
+        """
+        Times every process*/compute_* component call, the steam property
+        lookups and step_simulation itself, recording into 'profiler' (a new
+        Profiler if None). Costs nothing until called.
+
+        Returns:
+            The Profiler, also kept as self.profiler
+        """
+        self.disable_profiling()
+        self.profiler = profiler or Profiler()
+        self._profiled = []
+        for attr in self.PROFILED_COMPONENTS:
+            component = getattr(self, attr)
+            cls = type(getattr(component, "component", component))
+            for name in dir(cls):
+                if name.startswith(("process", "compute_")) and callable(getattr(cls, name)):
+                    self.profiler.wrap_method(component, name, f"{attr}.{name}")
+            self._profiled.append(component)
+        backend = self.turbine.steam_properties
+        for name in ("enthalpy", "enthalpy_array"):
+            self.profiler.wrap_method(backend, name, f"steam_properties.{name}")
+        self.profiler.wrap_method(self, "step_simulation", "engine.step_simulation")
+        self._profiled += [backend, self]
+        return self.profiler
+
+    def disable_profiling(self):
+        """Removes the timing wrappers; self.profiler keeps what was recorded."""
+        if self.profiler is not None:
+            self.profiler.unwrap(self._profiled)
+            self._profiled = []
+
+    def profile_stats(self):
+        """Returns self.profiler.stats(), or {} if profiling was never enabled."""
+        return self.profiler.stats() if self.profiler is not None else {}
+
     def step_simulation(self, dt=1.0):
         """
         Advances the simulation by one time-step 'dt'.
+
+        With dynamics enabled the dynamic states are integrated over 'dt'
+        with adaptive internal steps, so 'dt' only needs to be as short as
+        the interval at which inputs change or output is wanted.
+        """
+        self.simulation_time += dt
+        self.update_components(dt)
+        if self.dynamics is not None:
+            self.dynamics.advance(dt)
+
+    def update_components(self, dt):
+        """
+        Evaluates every component once from the current state, without
+        advancing simulation time. The order comes from self.schedule;
+        nodes whose inputs did not change since their last evaluation are
+        skipped.
+        """
+        self.schedule.run(self.state, dt)
+
+    def solve_steady_state(self, inputs=None, tol=1e-9, max_iter=100, acceleration="wegstein"):
+        """
+        Finds the operating point for the given inputs without time-stepping.
+
+        The tear streams of the schedule (the condenser pressure, which the
+        turbine reads before the condenser computes it) are iterated to a
+        fixed point of one component pass, using Wegstein
+        acceleration per variable (or plain substitution with
+        acceleration=None). With dynamics enabled the dynamic states are
+        then solved for zero rates. On return self.state holds the solved
+        plant.
+
+        Args:
+            inputs (dict): State fields to set first, e.g. wellhead values
+            tol (float): Convergence limit on the largest tear-variable change,
+                relative to max(1, |value|)
+            max_iter (int): Maximum number of component passes
+            acceleration (str): "wegstein" or None
+
+        Returns:
+            dict with "converged", "iterations", "residual" and
+            "residual_history"
         """
+        state = self.state
+        for name, value in (inputs or {}).items():
+            state[name] = value
+
+        tears = self.schedule.tears
+        x = np.array([state[name] for name in tears])
+        x_prev = g_prev = None
+        history = []
+        converged = False
+        for iteration in range(1, max_iter + 1):
+            for name, value in zip(tears, x):
+                state[name] = value
+            self.update_components(0.0)
+            g = np.array([state[name] for name in tears])
+
+            residual = float(np.max(np.abs(g - x) / np.maximum(1.0, np.abs(x)), initial=0.0))
+            history.append(residual)
+            if residual <= tol:
+                converged = True
+                break
+
+            if acceleration == "wegstein" and x_prev is not None:
+                dx = x - x_prev
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    slope = np.where(dx != 0, (g - g_prev) / dx, 0.0)
+                    q = np.clip(slope / (slope - 1.0), -5.0, 0.0)
+                q = np.nan_to_num(q)
+                x_next = q * x + (1.0 - q) * g
+            else:
+                x_next = g
+            x_prev, g_prev, x = x, g, x_next
+
+        if self.dynamics is not None:
+            converged = self.dynamics.solve_equilibrium() and converged
+
+        # The last pass ran with the converged tears, so state is consistent
+        return {
+            "converged": converged,
+            "iterations": iteration,
+            "residual": history[-1],
+            "residual_history": history,
+        }
+
+    def run(self, n_steps, dt=1.0, record=None, decimate=1, chunk_size=4096, writer=None,
+            checkpoint=None, checkpoint_every=10000, inputs=None):
+        """
+        Advances the simulation by 'n_steps' steps of 'dt' without any
+        per-step output and returns the recorded trajectory.
+
+        Args:
+            n_steps (int): Number of steps to simulate
+            dt (float): Time step in seconds
+            record (list): State fields to record, defaults to all fields
+            decimate (int): Record only every decimate-th step
+            chunk_size (int): Rows buffered before copying into the result
+            writer: Optional trajectory writer (see trajectory.py); each
+                full chunk is streamed to it instead of kept in memory
+            checkpoint (str): Optional file rewritten with save_checkpoint()
+                every 'checkpoint_every' steps. To resume after a crash,
+                load_checkpoint() it, reopen the .npy writer with
+                append=True, call its discard_after(engine.simulation_time)
+                and run the remaining steps.
+            checkpoint_every (int): Steps between checkpoints
+            inputs (InputSeries): Optional time-series inputs (see
+                scenario.py), sampled at the simulation time of each step
+                'chunk_size' steps at a time and written to the state
+                before the step
+
+        Returns:
+            numpy structured array with a 'time' field plus one float64 field
+            per recorded state field, one row per recorded step, or None when
+            streaming to 'writer'
+
+        Raises:
+            ValueError: for n_steps < 0, decimate < 1, chunk_size < 1, an
+                empty 'record' or, with a checkpoint file, checkpoint_every < 1
+        """
+        if n_steps < 0:
+            raise ValueError(f"n_steps must be >= 0, got {n_steps}")
+        if decimate < 1:
+            raise ValueError(f"decimate must be >= 1, got {decimate}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+        if checkpoint is not None and checkpoint_every < 1:
+            raise ValueError(f"checkpoint_every must be >= 1, got {checkpoint_every}")
+        fields = list(record) if record is not None else list(PlantState.FIELDS)
+        if not fields:
+            raise ValueError("record must name at least one state field")
+        for name in fields:
+            if name not in PlantState.FIELDS:
+                raise KeyError(name)
+        get_row = attrgetter(*fields)
+        if inputs is not None:
+            for name in inputs.fields:
+                if name not in PlantState.FIELDS:
+                    raise KeyError(name)
+            input_fields = inputs.fields
+
+        n_records = n_steps // decimate
+        dtype = trajectory_dtype(fields)
+        trajectory = None if writer is not None else np.empty(n_records, dtype=dtype)
+        # Plain 2-D buffer; writing whole rows is much cheaper than filling
+        # the structured array one element at a time. Its rows have the same
+        # memory layout as the structured dtype, so a view converts it.
+        chunk = np.empty((min(chunk_size, max(n_records, 1)), len(fields) + 1))
 
-        # 1) Update the separator with the wellhead values
-        separator_result = self.steamseparator.process(
-            separator_inlet_pressure=self.state["wellhead_pressure"],
-            separator_inlet_temp=self.state["wellhead_temp"],
-            separator_inlet_flow=self.state["wellhead_flow"]
-        )
-        self.state["separator_outlet_pressure"] = separator_result["separator_outlet_pressure"]
-        self.state["separator_outlet_steam_flow"] = separator_result["separator_outlet_steam_flow"]
-        self.state["separator_outlet_steam_temp"] = separator_result["separator_outlet_steam_temp"]
-        self.state["steam_flow"] = self.state["separator_outlet_steam_flow"]
-
-        # 2) Update the turbine using the steam flow from the separator
-        turbine_result = self.turbine.compute_mechanical_power_output(
-            turbine_inlet_pressure=self.state["separator_outlet_pressure"],
-            turbine_inlet_temp=self.state["separator_outlet_steam_temp"],
-            turbine_inlet_steam_flow=self.state["separator_outlet_steam_flow"],  # distribute among 4 turbines
-            turbine_outlet_pressure=self.state["condenser_pressure"]
-        )
-        self.state["turbine_out_power"] = turbine_result["mechanical_power"]
-        # ... store additional turbine outputs in self.state (mass flow out, etc.)
-
-        # 3) Update the condenser
-        condenser_result = self.condenser.compute_cooling_capacity(
-            inlet_flow=self.state["steam_flow"],
-            inlet_temp=self.state["wellhead_temp"],     # or from turbine exhaust
-            dt=dt
-        )
-        self.state["condenser_pressure"] = condenser_result["pressure"]
-        self.state["condenser_temp"] = condenser_result["temperature"]
-        # ... etc.
-
-        # 4) Possibly handle control loops (e.g., a PID for valve or pressure control)
-        # self.update_controllers(dt)
-
-        # The state is now updated for this time step.
-        # The next call to step_simulation() will build on these updated values.
\ No newline at end of file
+        state = self.state
+        row = 0
+        written = 0
+        last_record = n_records * decimate
+        for step in range(1, n_steps + 1):
+            if inputs is not None:
+                i = (step - 1) % chunk_size
+                if i == 0:
+                    # Interpolated in bulk, so a step only copies floats
+                    n = min(chunk_size, n_steps - step + 1)
+                    block = inputs.sample(self.simulation_time + dt * np.arange(1, n + 1)).tolist()
+                for name, value in zip(input_fields, block[i]):
+                    setattr(state, name, value)
+            self.step_simulation(dt)
+            if step % decimate == 0:
+                chunk[row, 0] = self.simulation_time
+                chunk[row, 1:] = get_row(state)
+                row += 1
+            due = checkpoint is not None and step % checkpoint_every == 0
+            if row and (row == len(chunk) or step == last_record or due):
+                rows = chunk[:row].view(dtype)[:, 0]
+                if writer is not None:
+                    writer.write(rows)
+                else:
+                    trajectory[written:written + row] = rows
+                written += row
+                row = 0
+            if due:
+                # Rows up to this step are on disk before the checkpoint is
+                if writer is not None and hasattr(writer, "flush"):
+                    writer.flush()
+                self.save_checkpoint(checkpoint)
+        return trajectory
@@ -0,0 +1,176 @@
+# powerplantsim/simulation/frames.py
+#
+# Compact binary state frames for streaming the plant state to viewers.
+# All numbers are little-endian:
+#
+#   header   uint8 kind, uint32 sequence, float64 simulation time
+#   key      (kind 1) header + one float64 per field, in field order
+#   delta    (kind 2) header + bitmask of ceil(n_fields / 8) bytes (bit i of
+#            byte i // 8 set when field i is sent) + one float64 per set
+#            bit, in field order
+#
+# A delta only applies on top of the frame with the previous sequence
+# number; a viewer that missed a frame waits for the next key frame.
+#
+# With per-field deadbands a field is only sent once it has moved more than
+# its deadband from the value last sent, so in steady operation most frames
+# carry no values at all. Key frames carry the last sent values, so every
+# decoder holds the same state, within the deadbands of the engine's.
+
+import struct
+from operator import attrgetter
+
+from powerplantsim.simulation.state import PlantState
+
+KEY = 1
+DELTA = 2
+_HEADER = struct.Struct("<BId")
+
+
+class FrameEncoder:
+    """
+    Encodes successive states as delta frames and, on request, key frames.
+
+    Args:
+        fields (tuple): State fields to stream, defaults to all fields
+        deadbands (dict): Field -> smallest change that is sent; fields not
+            listed are sent on any change
+    """
+
+    def __init__(self, fields=PlantState.FIELDS, deadbands=None):
+        self.fields = tuple(fields)
+        deadbands = dict(deadbands or {})
+        for name, deadband in deadbands.items():
+            if name not in self.fields:
+                raise KeyError(name)
+            if not deadband >= 0:
+                raise ValueError(f"deadband of {name} must be >= 0, got {deadband}")
+        self.deadbands = tuple(float(deadbands.get(name, 0.0)) for name in self.fields)
+        self._get = attrgetter(*self.fields)
+        self._mask_bytes = (len(self.fields) + 7) // 8
+        self._sent = None  # last sent value of every field
+        self._time = 0.0
+        self._key = None  # key frame of the current sequence, built on demand
+        self.sequence = 0
+
+    def _update(self, time, state):
+        """Advances the sequence; returns (bitmask, values) of the fields to send."""
+        values = self._get(state)
+        if len(self.fields) == 1:
+            values = (values,)
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        self._time = time
+        self._key = None
+        sent = self._sent
+        if sent is None:
+            self._sent = list(values)
+            return (1 << len(values)) - 1, list(values)
+        if values == tuple(sent):
+            # Nothing changed, the usual case in steady operation. NaN
+            # fields compare equal here when they are the same object,
+            # otherwise the loop below decides.
+            return 0, []
+
+        mask = 0
+        changed = []
+        for i, (value, last, deadband) in enumerate(zip(values, sent, self.deadbands)):
+            if value != value or last != last:
+                # NaN marks a value that is not known yet; NaN to NaN is no change
+                moved = (value != value) != (last != last)
+            else:
+                moved = abs(value - last) > deadband
+            if moved:
+                mask |= 1 << i
+                changed.append(value)
+                sent[i] = value
+        return mask, changed
+
+    def encode(self, time, state):
+        """Advances the sequence and returns the delta frame from the values last sent."""
+        mask, changed = self._update(time, state)
+        return b"".join((
+            _HEADER.pack(DELTA, self.sequence, time),
+            mask.to_bytes(self._mask_bytes, "little"),
+            struct.pack(f"<{len(changed)}d", *changed),
+        ))
+
+    def changes(self, state, time=0.0):
+        """
+        Like encode() for in-process consumers: returns the fields to send
+        as name -> value instead of packing them.
+        """
+        mask, changed = self._update(time, state)
+        return dict(zip((name for i, name in enumerate(self.fields) if mask >> i & 1), changed))
+
+    def key_frame(self):
+        """Returns a key frame of the values last sent, at the current sequence."""
+        if self._key is None:
+            if self._sent is None:
+                raise ValueError("no state encoded yet")
+            self._key = _HEADER.pack(KEY, self.sequence, self._time) \
+                + struct.pack(f"<{len(self._sent)}d", *self._sent)
+        return self._key
+
+
+class StateFeed(FrameEncoder):
+    """
+    Change feed of one engine. Each poll() returns a delta frame with the
+    fields that moved beyond their deadband since the previous poll that
+    sent them; see SimulationEngine.state_feed().
+
+    Args:
+        engine (SimulationEngine): Engine whose state is fed
+        fields (tuple): State fields to feed
+        deadbands (dict): See FrameEncoder
+    """
+
+    def __init__(self, engine, fields=PlantState.FIELDS, deadbands=None):
+        super().__init__(fields, deadbands)
+        self.engine = engine
+
+    def poll(self):
+        return self.encode(self.engine.simulation_time, self.engine.state)
+
+
+class FrameDecoder:
+    """
+    Rebuilds the streamed state from key and delta frames.
+
+    Args:
+        fields (tuple): Field order of the encoder
+    """
+
+    def __init__(self, fields=PlantState.FIELDS):
+        self.fields = tuple(fields)
+        self._mask_bytes = (len(self.fields) + 7) // 8
+        self.values = {name: float("nan") for name in self.fields}
+        self.sequence = None
+        self.time = None
+
+    def decode(self, frame):
+        """
+        Applies 'frame' and returns the fields it changed, as name -> value.
+
+        Raises:
+            ValueError: for a malformed frame, or a delta that does not
+                follow the last applied sequence
+        """
+        kind, sequence, time = _HEADER.unpack_from(frame)
+        offset = _HEADER.size
+        if kind == KEY:
+            names = self.fields
+        elif kind == DELTA:
+            if self.sequence is None or sequence != (self.sequence + 1) & 0xFFFFFFFF:
+                raise ValueError(f"delta frame {sequence} does not follow frame {self.sequence}")
+            mask = int.from_bytes(frame[offset:offset + self._mask_bytes], "little")
+            offset += self._mask_bytes
+            names = [name for i, name in enumerate(self.fields) if mask >> i & 1]
+        else:
+            raise ValueError(f"unknown frame kind {kind}")
+        if len(frame) != offset + 8 * len(names):
+            raise ValueError("frame length does not match its field count")
+        changed = dict(zip(names, struct.unpack_from(f"<{len(names)}d", frame, offset)))
+        self.values.update(changed)
+        self.sequence = sequence
+        self.time = time
+        return changed
@@ -0,0 +1,406 @@
+# powerplantsim/simulation/graph.py
+#
+# Declarative plant layout. Components are nodes; streams are typed edges,
+# named by the state field that carries them. A graph is compiled once into
+# a Schedule: nodes in topological order, with tear streams where a recycle
+# loop has to be cut. Each step the schedule runs a flat list of prepared
+# node closures, skipping nodes whose inputs have not changed.
+
+from operator import attrgetter, itemgetter
+
+# Stream kinds. An edge may only connect ports of the same kind.
+PRESSURE = "pressure"        # bar
+TEMPERATURE = "temperature"  # °C
+MASS_FLOW = "mass_flow"      # kg/s
+POWER = "power"              # MW
+
+
+class Node:
+    """One component evaluation in a PlantGraph, see PlantGraph.add_node."""
+
+    def __init__(self, name, component, method, inputs, outputs, takes_dt=False):
+        self.name = name
+        self.component = component
+        self.method = method
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.takes_dt = takes_dt
+
+    def __repr__(self):
+        return f"Node({self.name!r}, {self.component}.{self.method})"
+
+
+class PlantGraph:
+    """
+    Plant layout as nodes connected by state fields. A node's inputs are
+    read from the state and its method's result is written back, so a
+    field written by one node and read by another is an edge between them.
+    Fields no node writes are external inputs (wellhead values, ...).
+    """
+
+    def __init__(self):
+        self.nodes = []
+
+    def add_node(self, name, component, method, inputs, outputs, takes_dt=False):
+        """
+        Args:
+            name (str): Node name, unique in the graph
+            component (str): Attribute of the engine that holds the component;
+                it is looked up on every evaluation, so components can be
+                swapped (e.g. by enable_memoization) without recompiling
+            method (str): Component method evaluated by this node
+            inputs (list): (argument, state field, kind) tuples
+            outputs (list): (result key, state field, kind) tuples; one key
+                may be written to several fields
+            takes_dt (bool): Also pass the step length as 'dt'. Such a node
+                may evolve with time at constant inputs, so it is never skipped
+        """
+        if any(node.name == name for node in self.nodes):
+            raise ValueError(f"duplicate node {name!r}")
+        self.nodes.append(Node(name, component, method, inputs, outputs, takes_dt))
+
+    def remove_node(self, name):
+        self.nodes = [node for node in self.nodes if node.name != name]
+
+    def producers(self):
+        """Returns state field -> (node index, kind) of the node writing it."""
+        producers = {}
+        for index, node in enumerate(self.nodes):
+            for _, field, kind in node.outputs:
+                if field in producers and producers[field][0] != index:
+                    raise ValueError(f"{field!r} is written by both "
+                                     f"{self.nodes[producers[field][0]].name!r} and {node.name!r}")
+                producers[field] = (index, kind)
+        return producers
+
+    def compile(self, owner, vectorized=False, skip_unchanged=True):
+        """
+        Checks the stream kinds and orders the nodes.
+
+        Args:
+            owner: Object holding the components (the engine)
+            vectorized (bool): Call the *_array variant of each method and
+                address the state by item, for dict-of-arrays states
+            skip_unchanged (bool): Skip nodes whose inputs, parameters and
+                outputs are as they were after their last evaluation
+
+        Returns:
+            Schedule
+        """
+        producers = self.producers()
+        kinds = {field: kind for field, (_, kind) in producers.items()}
+        deps = []
+        for node in self.nodes:
+            node_deps = set()
+            for _, field, kind in node.inputs:
+                expected = kinds.setdefault(field, kind)
+                if expected != kind:
+                    raise TypeError(f"{node.name!r} reads {field!r} as {kind}, "
+                                    f"but it carries {expected}")
+                if field in producers:
+                    node_deps.add(producers[field][0])
+            deps.append(node_deps)
+
+        order = []
+        tears = []
+        for component in _topological_components(deps):
+            # Inside a recycle loop keep the declaration order; every stream
+            # read before its producer has run this step is a tear.
+            position = {index: i for i, index in enumerate(component)}
+            for index in component:
+                for _, field, _ in self.nodes[index].inputs:
+                    producer = producers.get(field, (None,))[0]
+                    if producer in position and position[producer] >= position[index] \
+                            and field not in tears:
+                        tears.append(field)
+            order.extend(component)
+
+        nodes = [self.nodes[index] for index in order]
+        return Schedule(nodes, tuple(tears), owner, vectorized, skip_unchanged)
+
+
+def _topological_components(deps):
+    """
+    Strongly connected components of the dependency graph (Tarjan), each
+    sorted by declaration index, in an order where every component comes
+    after the ones it depends on.
+    """
+    index_of = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    def visit(v):
+        index_of[v] = lowlink[v] = len(index_of)
+        stack.append(v)
+        on_stack.add(v)
+        for w in sorted(deps[v]):
+            if w not in index_of:
+                visit(w)
+                lowlink[v] = min(lowlink[v], lowlink[w])
+            elif w in on_stack:
+                lowlink[v] = min(lowlink[v], index_of[w])
+        if lowlink[v] == index_of[v]:
+            component = []
+            while True:
+                w = stack.pop()
+                on_stack.discard(w)
+                component.append(w)
+                if w == v:
+                    break
+            components.append(sorted(component))
+
+    for v in range(len(deps)):
+        if v not in index_of:
+            visit(v)
+    # Tarjan emits a component only after everything it depends on
+    return components
+
+
+def _parameters(component):
+    # Components stamp a new _version on every attribute assignment (see
+    # components.Component; MemoizedComponent passes it through). Changes
+    # made inside a parameter (an array modified in place, the turbine's
+    # steam_properties reconfigured) are not seen; recompile after one.
+    try:
+        return component._version
+    except AttributeError:
+        # Any other object: compare its scalar attributes
+        return tuple(item for item in vars(getattr(component, "component", component)).items()
+                     if isinstance(item[1], (int, float, str)))
+
+
+class Schedule:
+    """
+    Compiled evaluation order of a PlantGraph. run() evaluates the nodes
+    in 'order'; streams in 'tears' are read from the previous step.
+    """
+
+    def __init__(self, nodes, tears, owner, vectorized=False, skip_unchanged=True):
+        self.order = tuple(node.name for node in nodes)
+        self.tears = tears
+        self.counts = {node.name: [0, 0] for node in nodes}  # [evaluated, skipped]
+        self._steps = [self._compile_node(node, owner, vectorized, skip_unchanged) for node in nodes]
+
+    def _compile_node(self, node, owner, vectorized, skip_unchanged):
+        attr = node.component
+        method = node.method + "_array" if vectorized else node.method
+        arg_names = [arg for arg, _, _ in node.inputs]
+        outputs = [(key, field) for key, field, _ in node.outputs]
+        getter = itemgetter if vectorized else attrgetter
+        get_inputs = _tuple_getter(getter, [field for _, field, _ in node.inputs])
+        get_outputs = _tuple_getter(getter, [field for _, field in outputs])
+        takes_dt = node.takes_dt
+        skip_unchanged = skip_unchanged and not takes_dt
+        counts = self.counts[node.name]
+        last = [None, None]  # inputs key and outputs after the last evaluation
+
+        def evaluate(state, dt):
+            component = getattr(owner, attr)
+            args = get_inputs(state)
+            if skip_unchanged:
+                key = (args, _parameters(component))
+                if key == last[0] and get_outputs(state) == last[1]:
+                    counts[1] += 1
+                    return
+            kwargs = dict(zip(arg_names, args))
+            if takes_dt:
+                kwargs["dt"] = dt
+            result = getattr(component, method)(**kwargs)
+            if vectorized:
+                for name, field in outputs:
+                    state[field] = result[name]
+            else:
+                for name, field in outputs:
+                    setattr(state, field, result[name])
+            counts[0] += 1
+            if skip_unchanged:
+                last[0] = key
+                last[1] = get_outputs(state)
+
+        return evaluate
+
+    def run(self, state, dt):
+        """Evaluates the plant once on 'state' (a PlantState, or a dict of arrays if vectorized)."""
+        for evaluate in self._steps:
+            evaluate(state, dt)
+
+    def stats(self):
+        """Returns node name -> {"evaluated", "skipped"} counts."""
+        return {name: {"evaluated": c[0], "skipped": c[1]} for name, c in self.counts.items()}
+
+
+def _tuple_getter(getter, fields):
+    if not fields:
+        return lambda state: ()
+    if len(fields) == 1:
+        get = getter(fields[0])
+        return lambda state: (get(state),)
+    return getter(*fields)
+
+
+def plant_graph(dynamics=False):
+    """
+    The single-train plant: wellhead -> separator -> moisture separator ->
+    turbine -> condenser, with the condenser pressure fed back to the turbine outlet as a tear
+    stream. With dynamics=True the condenser is left out; its pressure and
+    temperature are then integrated states (see dynamics.py).
+    """
+    graph = PlantGraph()
+    graph.add_node(
+        "separator", "steamseparator", "process",
+        inputs=[
+            ("separator_inlet_pressure", "wellhead_pressure", PRESSURE),
+            ("separator_inlet_temp", "wellhead_temp", TEMPERATURE),
+            ("separator_inlet_flow", "wellhead_flow", MASS_FLOW),
+        ],
+        outputs=[
+            ("separator_outlet_pressure", "separator_outlet_pressure", PRESSURE),
+            ("separator_outlet_steam_flow", "separator_outlet_steam_flow", MASS_FLOW),
+            ("separator_outlet_steam_temp", "separator_outlet_steam_temp", TEMPERATURE),
+            ("separator_outlet_steam_flow", "steam_flow", MASS_FLOW),
+        ],
+    )
+    graph.add_node(
+        "moisture", "moistureseparator", "process",
+        inputs=[
+            ("separator_outlet_pressure", "separator_outlet_pressure", PRESSURE),
+            ("inlet_temp", "separator_outlet_steam_temp", TEMPERATURE),
+            ("inlet_flow", "separator_outlet_steam_flow", MASS_FLOW),
+        ],
+        outputs=[
+            ("turbine_inlet_pressure", "turbine_inlet_pressure", PRESSURE),
+            ("turbine_inlet_temp", "turbine_inlet_temp", TEMPERATURE),
+            ("turbine_inlet_flow", "turbine_inlet_flow", MASS_FLOW),
+        ],
+    )
+    graph.add_node(
+        "turbine", "turbine", "compute_mechanical_power_output",
+        inputs=[
+            ("turbine_inlet_pressure", "turbine_inlet_pressure", PRESSURE),
+            ("turbine_inlet_temp", "turbine_inlet_temp", TEMPERATURE),
+            ("turbine_inlet_steam_flow", "turbine_inlet_flow", MASS_FLOW),
+            ("turbine_outlet_pressure", "condenser_pressure", PRESSURE),
+        ],
+        outputs=[
+            ("mechanical_power", "turbine_out_power", POWER),
+            ("exhaust_flow", "turbine_exhaust_flow", MASS_FLOW),
+        ],
+    )
+    if not dynamics:
+        graph.add_node(
+            "condenser", "condenser", "compute_cooling_capacity",
+            inputs=[
+                ("inlet_flow", "turbine_exhaust_flow", MASS_FLOW),
+                ("inlet_temp", "turbine_inlet_temp", TEMPERATURE),
+            ],
+            outputs=[
+                ("pressure", "condenser_pressure", PRESSURE),
+                ("temperature", "condenser_temp", TEMPERATURE),
+            ],
+            takes_dt=True,
+        )
+    return graph
+
+
+def multi_unit_graph():
+    """
+    Field layout for MultiUnitEngine: wells -> gathering manifold ->
+    separators -> steam header manifold -> splitter -> turbine trains, each
+    train with its own moisture separator and condenser. Every node handles all units of its type
+    in one vectorized call, so each field is an array over those units.
+    """
+    graph = PlantGraph()
+    graph.add_node(
+        "gathering", "gathering", "mix",
+        inputs=[
+            ("pressure", "wellhead_pressure", PRESSURE),
+            ("temp", "wellhead_temp", TEMPERATURE),
+            ("flow", "wellhead_flow", MASS_FLOW),
+        ],
+        outputs=[
+            ("pressure", "separator_inlet_pressure", PRESSURE),
+            ("temp", "separator_inlet_temp", TEMPERATURE),
+            ("flow", "separator_inlet_flow", MASS_FLOW),
+        ],
+    )
+    graph.add_node(
+        "separator", "steamseparator", "process",
+        inputs=[
+            ("separator_inlet_pressure", "separator_inlet_pressure", PRESSURE),
+            ("separator_inlet_temp", "separator_inlet_temp", TEMPERATURE),
+            ("separator_inlet_flow", "separator_inlet_flow", MASS_FLOW),
+        ],
+        outputs=[
+            ("separator_outlet_pressure", "separator_outlet_pressure", PRESSURE),
+            ("separator_outlet_steam_flow", "separator_outlet_steam_flow", MASS_FLOW),
+            ("separator_outlet_steam_temp", "separator_outlet_steam_temp", TEMPERATURE),
+        ],
+    )
+    graph.add_node(
+        "header", "header", "mix",
+        inputs=[
+            ("pressure", "separator_outlet_pressure", PRESSURE),
+            ("temp", "separator_outlet_steam_temp", TEMPERATURE),
+            ("flow", "separator_outlet_steam_flow", MASS_FLOW),
+        ],
+        outputs=[
+            ("pressure", "header_pressure", PRESSURE),
+            ("temp", "header_temp", TEMPERATURE),
+            ("flow", "header_flow", MASS_FLOW),
+        ],
+    )
+    graph.add_node(
+        "distribution", "splitter", "split",
+        inputs=[
+            ("pressure", "header_pressure", PRESSURE),
+            ("temp", "header_temp", TEMPERATURE),
+            ("flow", "header_flow", MASS_FLOW),
+        ],
+        outputs=[
+            ("pressure", "moisture_inlet_pressure", PRESSURE),
+            ("temp", "moisture_inlet_temp", TEMPERATURE),
+            ("flow", "moisture_inlet_flow", MASS_FLOW),
+            ("vented", "header_vented_flow", MASS_FLOW),
+        ],
+    )
+    graph.add_node(
+        "moisture", "moistureseparator", "process",
+        inputs=[
+            ("separator_outlet_pressure", "moisture_inlet_pressure", PRESSURE),
+            ("inlet_temp", "moisture_inlet_temp", TEMPERATURE),
+            ("inlet_flow", "moisture_inlet_flow", MASS_FLOW),
+        ],
+        outputs=[
+            ("turbine_inlet_pressure", "turbine_inlet_pressure", PRESSURE),
+            ("turbine_inlet_temp", "turbine_inlet_temp", TEMPERATURE),
+            ("turbine_inlet_flow", "turbine_inlet_flow", MASS_FLOW),
+        ],
+    )
+    graph.add_node(
+        "turbine", "turbine", "compute_mechanical_power_output",
+        inputs=[
+            ("turbine_inlet_pressure", "turbine_inlet_pressure", PRESSURE),
+            ("turbine_inlet_temp", "turbine_inlet_temp", TEMPERATURE),
+            ("turbine_inlet_steam_flow", "turbine_inlet_flow", MASS_FLOW),
+            ("turbine_outlet_pressure", "condenser_pressure", PRESSURE),
+        ],
+        outputs=[
+            ("mechanical_power", "turbine_out_power", POWER),
+            ("exhaust_flow", "turbine_exhaust_flow", MASS_FLOW),
+        ],
+    )
+    graph.add_node(
+        "condenser", "condenser", "compute_cooling_capacity",
+        inputs=[
+            ("inlet_flow", "turbine_exhaust_flow", MASS_FLOW),
+            ("inlet_temp", "turbine_inlet_temp", TEMPERATURE),
+        ],
+        outputs=[
+            ("pressure", "condenser_pressure", PRESSURE),
+            ("temperature", "condenser_temp", TEMPERATURE),
+        ],
+        takes_dt=True,
+    )
+    return graph
@@ -0,0 +1,98 @@
+# powerplantsim/simulation/memo.py
+
+from collections import OrderedDict
+
+
+class MemoizedComponent:
+    """
+    Wraps a component and caches the results of its evaluation methods in an
+    LRU keyed on the call's inputs rounded to multiples of 'tolerance'.
+    Inputs closer together than the tolerance may share a result, so pick it
+    below the resolution that matters.
+
+    Any other attribute access is passed through to the component. Changing
+    a component parameter (e.g. ``turbine.efficiency = 0.25``) clears the
+    cache the next time a memoized method is called.
+
+    Args:
+        component: Component instance to wrap
+        methods (tuple): Names of the methods to memoize
+        maxsize (int): Maximum number of cached results
+        tolerance (float): Input quantum; inputs are compared after rounding
+    """
+
+    def __init__(self, component, methods, maxsize=1024, tolerance=1e-6):
+        # Set through object.__setattr__ so they stay on the wrapper
+        object.__setattr__(self, "component", component)
+        object.__setattr__(self, "maxsize", maxsize)
+        object.__setattr__(self, "tolerance", tolerance)
+        object.__setattr__(self, "hits", 0)
+        object.__setattr__(self, "misses", 0)
+        object.__setattr__(self, "invalidations", 0)
+        object.__setattr__(self, "_cache", OrderedDict())
+        object.__setattr__(self, "_params", self._parameters())
+        for name in methods:
+            object.__setattr__(self, name, self._memoize(name, getattr(component, name)))
+
+    def _parameters(self):
+        return tuple(vars(self.component).items())
+
+    def _memoize(self, name, method):
+        cache = self._cache
+        quantum = self.tolerance
+
+        def memoized(*args, **kwargs):
+            params = self._parameters()
+            if params != self._params:
+                self.cache_clear()
+                object.__setattr__(self, "_params", params)
+                object.__setattr__(self, "invalidations", self.invalidations + 1)
+
+            key = (name,) + tuple(_quantize(value, quantum) for value in args)
+            if kwargs:
+                # Keyword names are part of the key, so f(a=1, b=2) and
+                # f(b=1, a=2) do not share a result
+                key += tuple((arg, _quantize(value, quantum)) for arg, value in sorted(kwargs.items()))
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+                object.__setattr__(self, "hits", self.hits + 1)
+                return dict(result)
+
+            object.__setattr__(self, "misses", self.misses + 1)
+            result = method(*args, **kwargs)
+            cache[key] = result
+            if len(cache) > self.maxsize:
+                cache.popitem(last=False)
+            return dict(result)
+
+        return memoized
+
+    def cache_clear(self):
+        self._cache.clear()
+
+    def cache_info(self):
+        """Returns hit/miss statistics as a dict."""
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / calls if calls else 0.0,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "invalidations": self.invalidations,
+        }
+
+    def __getattr__(self, name):
+        return getattr(self.component, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.component, name, value)
+
+
+def _quantize(value, quantum):
+    try:
+        return round(value / quantum)
+    except (TypeError, ValueError, OverflowError):
+        # None, NaN or inf: use as is (NaN never matches, so it always misses)
+        return value
@@ -0,0 +1,429 @@
+# powerplantsim/simulation/montecarlo.py
+#
+# Monte Carlo propagation of reservoir uncertainty. Wellhead inputs are
+# drawn from marginal distributions coupled by a Gaussian copula, each
+# chunk of realizations is solved as one BatchSimulationEngine on a process
+# pool, and the outputs only feed streaming estimators (Welford mean and
+# variance, t-digest quantiles), so memory does not grow with the number of
+# realizations.
+#
+# Every chunk draws from its own stream spawned from one SeedSequence and
+# the chunk results are merged in chunk order, so a seed gives the same
+# result for any number of workers.
+#
+# Command line:
+#   python -m powerplantsim.simulation.montecarlo -n 100000 \
+#       --wellhead_pressure normal:10.5:0.5 --wellhead_temp normal:178:2 \
+#       --wellhead_flow lognormal:85:10 --correlation wellhead_pressure:wellhead_flow:0.6
+
+import argparse
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from powerplantsim.simulation.batch import BatchSimulationEngine
+from powerplantsim.simulation.state import PlantState
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+DEFAULT_OUTPUTS = ("turbine_out_power", "steam_flow")
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+
+
+class Normal:
+    def __init__(self, mean, std):
+        self.mean = mean
+        self.std = std
+
+    def from_normal(self, z):
+        """Maps standard normal draws onto this distribution."""
+        return self.mean + self.std * z
+
+
+class LogNormal:
+    """Log-normal with the given mean and standard deviation (of the variable, not its log)."""
+
+    def __init__(self, mean, std):
+        if mean <= 0:
+            raise ValueError("a log-normal mean must be positive")
+        self.mean = mean
+        self.std = std
+        self.sigma = math.sqrt(math.log1p((std / mean) ** 2))
+        self.mu = math.log(mean) - self.sigma ** 2 / 2
+
+    def from_normal(self, z):
+        return np.exp(self.mu + self.sigma * z)
+
+
+class Uniform:
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def from_normal(self, z):
+        u = 0.5 * np.vectorize(math.erfc, otypes=[float])(-np.asarray(z) / math.sqrt(2.0))
+        return self.low + (self.high - self.low) * u
+
+
+DISTRIBUTIONS = {"normal": Normal, "lognormal": LogNormal, "uniform": Uniform}
+
+
+class InputModel:
+    """
+    Joint distribution of uncertain state inputs.
+
+    Args:
+        marginals (dict): State field -> Normal, LogNormal or Uniform
+        correlation (array): Correlation matrix of the Gaussian copula, in
+            the order of 'marginals'; None for independent inputs
+    """
+
+    def __init__(self, marginals, correlation=None):
+        for name in marginals:
+            if name not in PlantState.FIELDS:
+                raise KeyError(name)
+        self.marginals = dict(marginals)
+        n = len(self.marginals)
+        correlation = np.eye(n) if correlation is None else np.asarray(correlation, dtype=float)
+        if correlation.shape != (n, n) or not np.allclose(correlation, correlation.T) \
+                or not np.allclose(np.diag(correlation), 1.0):
+            raise ValueError("correlation must be a symmetric matrix with a unit diagonal")
+        try:
+            self._cholesky = np.linalg.cholesky(correlation)
+        except np.linalg.LinAlgError:
+            raise ValueError("correlation matrix is not positive definite") from None
+        self.correlation = correlation
+
+    def sample(self, rng, n):
+        """Returns n joint draws as state field -> array."""
+        z = rng.standard_normal((n, len(self.marginals))) @ self._cholesky.T
+        return {name: dist.from_normal(z[:, j]) for j, (name, dist) in enumerate(self.marginals.items())}
+
+
+class Welford:
+    """
+    Streaming mean and variance. Batches are folded in with the pairwise
+    form of Welford's update (Chan et al.), which also merges two
+    accumulators.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+
+    def _combine(self, n, mean, m2):
+        total = self.n + n
+        if n == 0:
+            return
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if values.size:
+            mean = float(values.mean())
+            self._combine(values.size, mean, float(((values - mean) ** 2).sum()))
+
+    def merge(self, other):
+        self._combine(other.n, other.mean, other.m2)
+
+    @property
+    def variance(self):
+        """Sample variance (n - 1 in the denominator)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else float("nan")
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class TDigest:
+    """
+    Merging t-digest (Dunning & Ertl, 2019) for streaming quantiles. Values
+    are buffered and periodically merged into at most about 'compression'
+    centroids, kept small near the tails by the k1 scale function, so
+    extreme quantiles stay accurate.
+
+    Args:
+        compression (float): Size parameter delta; more is more accurate
+    """
+
+    def __init__(self, compression=100.0):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []  # (means, weights) not merged yet
+        self._buffered = 0
+
+    def update(self, values, weights=None):
+        values = np.asarray(values, dtype=float).ravel()
+        if not values.size:
+            return
+        weights = np.ones(values.size) if weights is None else np.asarray(weights, dtype=float)
+        self._buffer.append((values, weights))
+        self._buffered += values.size
+        self.count += float(weights.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered > 5 * self.compression:
+            self._compress()
+
+    def merge(self, other):
+        other._compress()
+        if other.count:
+            self.update(other.means, other.weights)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def _scale(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means] + [m for m, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [w for _, w in self._buffer])
+        self._buffer, self._buffered = [], 0
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order].tolist(), weights[order].tolist()
+
+        total = self.count
+        merged_means, merged_weights = [], []
+        mean, weight = means[0], weights[0]
+        before = 0.0  # weight of the centroids already emitted
+        k_left = self._scale(0.0)
+        for m, w in zip(means[1:], weights[1:]):
+            if self._scale(min(1.0, (before + weight + w) / total)) - k_left <= 1.0:
+                weight += w
+                mean += (m - mean) * w / weight
+            else:
+                merged_means.append(mean)
+                merged_weights.append(weight)
+                before += weight
+                k_left = self._scale(min(1.0, before / total))
+                mean, weight = m, w
+        merged_means.append(mean)
+        merged_weights.append(weight)
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def quantile(self, q):
+        """Estimated q-quantile(s), q in [0, 1]."""
+        self._compress()
+        if not self.count:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else float("nan")
+        # Each centroid's mean sits at the middle of its weight
+        centres = np.cumsum(self.weights) - self.weights / 2
+        x = np.concatenate(([0.0], centres, [self.count]))
+        y = np.concatenate(([self.min], self.means, [self.max]))
+        result = np.interp(np.asarray(q, dtype=float) * self.count, x, y)
+        return float(result) if np.ndim(result) == 0 else result
+
+
+class OutputStatistics:
+    """Streaming statistics of one output over all realizations; NaN results are counted apart."""
+
+    def __init__(self, compression=100.0):
+        self.moments = Welford()
+        self.digest = TDigest(compression)
+        self.invalid = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        finite = values[np.isfinite(values)]
+        self.invalid += values.size - finite.size
+        self.moments.update(finite)
+        self.digest.update(finite)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.invalid += other.invalid
+
+    def summary(self, quantiles=DEFAULT_QUANTILES):
+        result = {
+            "n": self.moments.n,
+            "invalid": self.invalid,
+            "mean": self.moments.mean,
+            "std": self.moments.std,
+            "min": self.digest.min,
+            "max": self.digest.max,
+        }
+        for q, value in zip(quantiles, self.digest.quantile(quantiles)):
+            result[f"p{100 * q:g}"] = float(value)
+        return result
+
+
+def solve_batch(engine, tol=1e-12, max_iter=50):
+    """
+    Steps a BatchSimulationEngine with dt=0 until no field changes any more.
+
+    Returns:
+        bool array, True for every plant that settled within 'max_iter'
+        steps; the outputs of the others are not a steady state
+    """
+    settled = np.zeros(engine.n_instances, dtype=bool)
+    for _ in range(max_iter):
+        before = {name: column.copy() for name, column in engine.state.items()}
+        engine.step(0.0)
+        settled[:] = True
+        for name in before:
+            settled &= np.isclose(engine.state[name], before[name], rtol=tol, atol=0.0, equal_nan=True)
+        if settled.all():
+            break
+    return settled
+
+
+# Steam backend of each pool worker, created once by _init_worker
+_worker_properties = None
+
+
+def _init_worker(tabulated):
+    global _worker_properties
+    _worker_properties = TabulatedSteamProperties() if tabulated else None
+
+
+def _run_chunk(model, n, seed, outputs, n_steps, dt, compression):
+    """Runs n realizations drawn from stream 'seed' and returns their statistics."""
+    engine = BatchSimulationEngine(n, steam_properties=_worker_properties)
+    for name, values in model.sample(np.random.default_rng(seed), n).items():
+        engine.state[name][:] = values
+    settled = True
+    if n_steps is None:
+        settled = solve_batch(engine)
+    else:
+        for _ in range(n_steps):
+            engine.step(dt)
+    stats = {name: OutputStatistics(compression) for name in outputs}
+    for name in outputs:
+        # Realizations that did not settle count as invalid
+        stats[name].update(np.where(settled, engine.state[name], np.nan))
+    return stats
+
+
+class MonteCarloResult:
+    def __init__(self, stats, n_realizations, seed):
+        self.stats = stats  # output field -> OutputStatistics
+        self.n_realizations = n_realizations
+        self.seed = seed
+
+    def summary(self, quantiles=DEFAULT_QUANTILES):
+        """Returns output field -> dict of n, invalid, mean, std, min, max and the quantiles."""
+        return {name: stats.summary(quantiles) for name, stats in self.stats.items()}
+
+
+def monte_carlo(model, n_realizations, outputs=DEFAULT_OUTPUTS, seed=0, n_steps=None, dt=1.0,
+                chunk_size=1000, workers=None, tabulated=True, compression=100.0, progress=None):
+    """
+    Runs 'n_realizations' plants with inputs drawn from 'model'.
+
+    Args:
+        model (InputModel): Uncertain inputs; other fields keep their
+            initial values
+        n_realizations (int): Number of realizations
+        outputs (tuple): State fields whose statistics are collected
+        seed (int): Seed of the SeedSequence the chunk streams are spawned from
+        n_steps (int): Steps of 'dt' per realization; None solves each one
+            for its steady state
+        dt (float): Time step in seconds
+        chunk_size (int): Realizations per batch engine and per pool task
+        workers (int): Worker processes, defaults to the CPU count; 1 runs
+            in this process
+        tabulated (bool): Use the tabulated steam backend
+        compression (float): t-digest compression, see TDigest
+        progress (callable): Called as progress(done, total) after each chunk
+
+    Returns:
+        MonteCarloResult
+    """
+    for name in outputs:
+        if name not in PlantState.FIELDS:
+            raise KeyError(name)
+    sizes = [min(chunk_size, n_realizations - start) for start in range(0, n_realizations, chunk_size)]
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(model, n, stream, tuple(outputs), n_steps, dt, compression)
+            for n, stream in zip(sizes, streams)]
+
+    stats = {name: OutputStatistics(compression) for name in outputs}
+
+    def merge_all(chunks):
+        done = 0
+        for n, chunk in zip(sizes, chunks):
+            for name in outputs:
+                stats[name].merge(chunk[name])
+            done += n
+            if progress:
+                progress(done, n_realizations)
+
+    if workers == 1:
+        _init_worker(tabulated)
+        merge_all(_run_chunk(*chunk_args) for chunk_args in args)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(tabulated,)) as pool:
+            # map() yields in submission order, so the merge order is fixed
+            merge_all(pool.map(_run_chunk, *zip(*args)))
+    return MonteCarloResult(stats, n_realizations, seed)
+
+
+def _parse_distribution(text):
+    """'normal:mean:std', 'lognormal:mean:std' or 'uniform:low:high'"""
+    kind, a, b = text.split(":")
+    try:
+        return DISTRIBUTIONS[kind](float(a), float(b))
+    except KeyError:
+        raise argparse.ArgumentTypeError(f"unknown distribution {kind!r}") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo uncertainty propagation of the plant model")
+    parser.add_argument("-n", "--realizations", type=int, default=10000)
+    for name in ("wellhead_pressure", "wellhead_temp", "wellhead_flow"):
+        parser.add_argument(f"--{name}", type=_parse_distribution, default=None,
+                            help="normal:mean:std, lognormal:mean:std or uniform:low:high")
+    parser.add_argument("--correlation", action="append", default=[],
+                        help="field:field:rho, correlation of two inputs' normal scores in the copula")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--steps", type=int, default=None,
+                        help="time-march this many steps instead of solving for steady state")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--exact", action="store_true", help="use exact IAPWS-97 properties")
+    args = parser.parse_args(argv)
+
+    marginals = {name: getattr(args, name) for name in ("wellhead_pressure", "wellhead_temp", "wellhead_flow")
+                 if getattr(args, name) is not None}
+    if not marginals:
+        parser.error("give at least one input distribution")
+    names = list(marginals)
+    correlation = np.eye(len(names))
+    for text in args.correlation:
+        a, b, rho = text.split(":")
+        i, j = names.index(a), names.index(b)
+        correlation[i, j] = correlation[j, i] = float(rho)
+
+    start = time.perf_counter()
+
+    def report(done, total):
+        sys.stderr.write(f"\r{done}/{total} realizations")
+        sys.stderr.flush()
+
+    result = monte_carlo(InputModel(marginals, correlation), args.realizations, seed=args.seed,
+                         n_steps=args.steps, workers=args.workers, chunk_size=args.chunk_size,
+                         tabulated=not args.exact, progress=report)
+    sys.stderr.write("\n")
+    for name, summary in result.summary().items():
+        print(f"{name}: " + ", ".join(f"{key} {value:.4g}" if isinstance(value, float) else f"{key} {value}"
+                                      for key, value in summary.items()))
+    print(f"{args.realizations} realizations in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
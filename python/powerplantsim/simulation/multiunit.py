@@ -0,0 +1,124 @@
+# powerplantsim/simulation/multiunit.py
+
+import numpy as np
+from powerplantsim.simulation.components import (
+    Condenser, Manifold, MoistureSeparator, Splitter, SteamSeparator, SteamTurbine,
+)
+from powerplantsim.simulation.graph import multi_unit_graph
+from powerplantsim.simulation.state import INITIAL_STATE
+
+
+# Unit type of every stream in multi_unit_graph(); the stream's field is an
+# array with one value per unit of that type
+STREAM_UNITS = {
+    "wellhead_pressure": "well",
+    "wellhead_temp": "well",
+    "wellhead_flow": "well",
+    "separator_inlet_pressure": "separator",
+    "separator_inlet_temp": "separator",
+    "separator_inlet_flow": "separator",
+    "separator_outlet_pressure": "separator",
+    "separator_outlet_steam_flow": "separator",
+    "separator_outlet_steam_temp": "separator",
+    "header_pressure": "header",
+    "header_temp": "header",
+    "header_flow": "header",
+    "header_vented_flow": "header",
+    "moisture_inlet_pressure": "train",
+    "moisture_inlet_temp": "train",
+    "moisture_inlet_flow": "train",
+    "turbine_inlet_pressure": "train",
+    "turbine_inlet_temp": "train",
+    "turbine_inlet_flow": "train",
+    "turbine_out_power": "train",
+    "turbine_exhaust_flow": "train",
+    "condenser_pressure": "train",
+    "condenser_temp": "train",
+}
+
+
+class MultiUnitEngine:
+    """
+    A field of wells feeding shared separators, whose steam is collected in
+    steam headers and shared between turbine trains. All units of one type
+    are evaluated in a single vectorized call per step (see
+    multi_unit_graph), so the step cost is mostly per unit type rather than
+    per unit.
+
+    State fields are arrays over the units they belong to:
+    ``state["wellhead_flow"][i]`` is well i, ``state["turbine_out_power"][j]``
+    is turbine train j, and so on. Each turbine train has its own moisture separator
+    and condenser.
+
+    Args:
+        n_wells (int): Number of wells
+        n_separators (int): Number of separators
+        n_turbines (int): Number of turbine trains, each with a condenser
+        n_headers (int): Number of steam headers; each must feed at least
+            one turbine
+        well_separator (array): Separator fed by each well; round-robin if None
+        separator_header (array): Header fed by each separator; round-robin if None
+        turbine_header (array): Header feeding each turbine; round-robin if None
+        steam_properties: Steam property backend for the turbines, see thermo.py
+    """
+
+    def __init__(self, n_wells, n_separators=1, n_turbines=1, n_headers=1,
+                 well_separator=None, separator_header=None, turbine_header=None,
+                 steam_properties=None):
+        self.n_wells = n_wells
+        self.n_separators = n_separators
+        self.n_turbines = n_turbines
+        self.n_headers = n_headers
+
+        well_separator = _connections(well_separator, n_wells, n_separators)
+        separator_header = _connections(separator_header, n_separators, n_headers)
+        turbine_header = _connections(turbine_header, n_turbines, n_headers)
+        idle = np.flatnonzero(np.bincount(turbine_header, minlength=n_headers) == 0)
+        if len(idle):
+            raise ValueError(f"steam headers {idle.tolist()} feed no turbine")
+
+        self.gathering = Manifold(well_separator, n_separators)
+        self.steamseparator = SteamSeparator()
+        self.header = Manifold(separator_header, n_headers)
+        self.splitter = Splitter(turbine_header)
+        self.moistureseparator = MoistureSeparator()
+        self.turbine = SteamTurbine(steam_properties=steam_properties)
+        self.condenser = Condenser()
+
+        sizes = {
+            "well": n_wells, "separator": n_separators, "header": n_headers,
+            "train": n_turbines,
+        }
+        self.graph = multi_unit_graph()
+        self.state = {}
+        for node in self.graph.nodes:
+            for _, field, _ in node.inputs + node.outputs:
+                if field not in STREAM_UNITS:
+                    raise ValueError(f"no unit type declared for stream {field!r}")
+                size = sizes[STREAM_UNITS[field]]
+                self.state[field] = np.full(size, INITIAL_STATE.get(field, np.nan), dtype=float)
+        self.schedule = self.graph.compile(self, vectorized=True, skip_unchanged=False)
+        self.simulation_time = 0.0  # s
+
+    def step_simulation(self, dt=1.0):
+        """Advances every unit by one time-step 'dt'."""
+        self.simulation_time += dt
+        self.schedule.run(self.state, dt)
+
+    def totals(self):
+        """Returns plant-wide sums: well flow, steam flow, vented steam and turbine power."""
+        return {
+            "wellhead_flow": float(self.state["wellhead_flow"].sum()),
+            "steam_flow": float(self.state["header_flow"].sum()),
+            "vented_flow": float(self.state["header_vented_flow"].sum()),
+            "turbine_out_power": float(self.state["turbine_out_power"].sum()),
+        }
+
+
+def _connections(index, n_from, n_to):
+    if index is None:
+        return np.arange(n_from) % n_to
+    index = np.asarray(index)
+    if index.shape != (n_from,) or index.min(initial=0) < 0 or index.max(initial=0) >= n_to:
+        raise ValueError(f"expected {n_from} connections to units 0..{n_to - 1}")
+    return index
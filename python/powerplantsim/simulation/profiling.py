@@ -0,0 +1,148 @@
+# powerplantsim/simulation/profiling.py
+#
+# Opt-in timing instrumentation. A Profiler collects wall-time spans per
+# name (call count, total, p50/p99 over recent calls) and keeps the latest
+# spans as events for a Chrome trace (chrome://tracing or Perfetto).
+# Methods are instrumented by shadowing them on the instance with a timed
+# wrapper, so nothing is paid while profiling is off.
+
+import json
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+class Profiler:
+    """
+    Args:
+        window (int): Recent durations kept per name for the percentiles
+        max_events (int): Spans kept for the Chrome trace, newest last
+    """
+
+    def __init__(self, window=10000, max_events=200000):
+        self.window = window
+        self.origin = time.perf_counter()
+        self._spans = {}  # name -> [calls, total seconds, deque of recent durations]
+        self.events = deque(maxlen=max_events)  # (name, thread id, start, duration)
+        self._instrumented = []  # (object, attribute, previous instance value) from wrap_method
+
+    def record(self, name, start, duration):
+        """Adds one span; 'start' and 'duration' in perf_counter seconds."""
+        span = self._spans.get(name)
+        if span is None:
+            span = self._spans.setdefault(name, [0, 0.0, deque(maxlen=self.window)])
+        span[0] += 1
+        span[1] += duration
+        span[2].append(duration)
+        self.events.append((name, threading.get_ident(), start, duration))
+
+    def span(self, name):
+        """Context manager timing its block as 'name'."""
+        return _Span(self, name)
+
+    def wrap(self, func, name):
+        """Returns 'func' timed as 'name'."""
+        record = self.record
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, start, clock() - start)
+
+        timed.__wrapped__ = func
+        return timed
+
+    def wrap_method(self, obj, attr, name):
+        """Shadows obj.attr with a timed wrapper until unwrap()."""
+        previous = vars(obj).get(attr, _MISSING)
+        # object.__setattr__ keeps the wrapper on proxies such as
+        # MemoizedComponent instead of forwarding it to the wrapped object
+        object.__setattr__(obj, attr, self.wrap(getattr(obj, attr), name))
+        self._instrumented.append((obj, attr, previous))
+
+    def unwrap(self, objects=None):
+        """Restores the methods wrapped on 'objects' (default: all of them)."""
+        keep = []
+        for obj, attr, previous in reversed(self._instrumented):
+            if objects is not None and not any(obj is o for o in objects):
+                keep.append((obj, attr, previous))
+            elif previous is _MISSING:
+                object.__delattr__(obj, attr)
+            else:
+                object.__setattr__(obj, attr, previous)
+        self._instrumented = keep[::-1]
+
+    def reset(self):
+        self._spans.clear()
+        self.events.clear()
+
+    def stats(self):
+        """
+        Returns name -> dict with "calls", "total", "mean", "p50", "p99"
+        and "max" in seconds. Percentiles and max cover the last 'window'
+        calls; times are inclusive of nested spans.
+        """
+        result = {}
+        for name, (calls, total, recent) in list(self._spans.items()):
+            durations = np.array(recent)
+            if not len(durations):
+                continue
+            p50, p99 = np.percentile(durations, [50, 99])
+            result[name] = {
+                "calls": calls,
+                "total": total,
+                "mean": total / calls,
+                "p50": float(p50),
+                "p99": float(p99),
+                "max": float(durations.max()),
+            }
+        return result
+
+    def summary(self, top=3):
+        """One-line text of the names with the most total time, for status bars."""
+        stats = sorted(self.stats().items(), key=lambda item: item[1]["total"], reverse=True)
+        return " | ".join(
+            f"{name}: p50 {s['p50'] * 1e6:.0f} us, p99 {s['p99'] * 1e6:.0f} us"
+            for name, s in stats[:top]
+        )
+
+    def dump_chrome_trace(self, path):
+        """Writes the recorded spans in Chrome trace event format."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "cat": name.split(".")[0],
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, tid, start, duration in list(self.events)
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+_MISSING = object()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter() - self.start)
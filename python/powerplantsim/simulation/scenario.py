@@ -0,0 +1,386 @@
+# powerplantsim/simulation/scenario.py
+#
+# Scenario inputs from a workbook such as the repo's parameters.xlsx: plant
+# parameters (initial state fields and component parameters) and optional
+# time-series inputs (wellhead pressure, temperature, flow, ...). The
+# workbook is read and validated once, then compiled to an .npz cache keyed
+# by the SHA-256 of the file, so later starts skip the xlsx parsing.
+#
+# Workbook layout:
+#   Parameter table (first sheet): a header row with "Parameter" and
+#       "Total" (or "Value") columns, the unit in the column after the value.
+#       Rows name a state field ("wellhead_flow"), a component parameter
+#       ("turbine.efficiency") or one of the names in ALIASES. Rows without
+#       a value are skipped. A row may also give a stream further down the
+#       plant (see DERIVED); it is then turned back into the wellhead input
+#       that produces it.
+#   "Timeseries" sheet (optional): a header row starting with "time" (s)
+#       followed by state fields, then one numeric row per sample.
+
+import functools
+import hashlib
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+
+from powerplantsim.simulation.snapshot import COMPONENTS
+from powerplantsim.simulation.state import INITIAL_STATE
+from powerplantsim.utils.helpers import default_cache_dir
+
+_CACHE_VERSION = 3
+
+# Workbook row names -> state fields
+ALIASES = {
+    "wh_pressure": "wellhead_pressure",
+    "steam_seperator_temperature": "separator_outlet_steam_temp",
+    "steam_separator_temperature": "separator_outlet_steam_temp",
+    "Heildarflæði að vélum": "turbine_inlet_flow",  # total flow to the turbines
+}
+
+
+def _wellhead_temp(engine, separator_temp):
+    return separator_temp / engine.steamseparator.temperature_index
+
+
+def _wellhead_flow(engine, turbine_flow):
+    return turbine_flow / (engine.steamseparator.steam_fraction * engine.moistureseparator.flow_index)
+
+
+# Streams the engine computes that a workbook may give instead of the
+# wellhead input: stream -> (input field, function of (engine, value)
+# returning the input that produces 'value' with the engine's parameters)
+DERIVED = {
+    "separator_outlet_steam_temp": ("wellhead_temp", _wellhead_temp),
+    "turbine_inlet_flow": ("wellhead_flow", _wellhead_flow),
+}
+
+# Accepted units per state field; fields not listed are not checked
+UNITS = {
+    "wellhead_pressure": ("bar", "barG"),
+    "wellhead_temp": ("°C", "C"),
+    "wellhead_flow": ("kg/s",),
+    "separator_outlet_steam_temp": ("°C", "C"),
+    "turbine_inlet_flow": ("kg/s",),
+    "fan_speed": ("%",),
+    "generator_load": ("MW",),
+}
+
+_NS = {
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+
+
+def read_workbook(path):
+    """
+    Reads the cell values of an .xlsx file with the standard library only.
+    Formulas give their cached result.
+
+    Returns:
+        dict of sheet name -> list of rows, each a list of str, float or
+        None (empty cell), in sheet order
+    """
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        shared = []
+        if "xl/sharedStrings.xml" in names:
+            root = ET.fromstring(archive.read("xl/sharedStrings.xml"))
+            for item in root.findall("main:si", _NS):
+                # Rich text is split over several <t> runs
+                shared.append("".join(t.text or "" for t in item.iter(f"{{{_NS['main']}}}t")))
+
+        rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels.findall("rel:Relationship", _NS)}
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+        sheets = {}
+        for sheet in workbook.find("main:sheets", _NS):
+            target = targets[sheet.get(_REL_ID)]
+            member = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            sheets[sheet.get("name")] = _read_sheet(ET.fromstring(archive.read(member)), shared)
+    return sheets
+
+
+def _read_sheet(root, shared):
+    cells = {}
+    for cell in root.iter(f"{{{_NS['main']}}}c"):
+        column, row = _CELL_REF.match(cell.get("r")).groups()
+        index = 0
+        for letter in column:
+            index = index * 26 + ord(letter) - ord("A") + 1
+        kind = cell.get("t")
+        if kind == "inlineStr":
+            value = "".join(t.text or "" for t in cell.iter(f"{{{_NS['main']}}}t"))
+        else:
+            v = cell.find("main:v", _NS)
+            if v is None or v.text is None:
+                continue
+            if kind == "s":
+                value = shared[int(v.text)]
+            elif kind in ("str", "e"):
+                value = v.text
+            else:
+                value = float(v.text)
+        cells[int(row) - 1, index - 1] = value
+    if not cells:
+        return []
+    n_rows = max(r for r, _ in cells) + 1
+    n_cols = max(c for _, c in cells) + 1
+    rows = [[None] * n_cols for _ in range(n_rows)]
+    for (r, c), value in cells.items():
+        rows[r][c] = value
+    return rows
+
+
+class InputSeries:
+    """
+    Time-series inputs, one column per state field, linearly interpolated
+    in time and held at the first/last sample outside the table.
+
+    Args:
+        time (array): Sample times in seconds, strictly increasing
+        fields (list): State field of each column
+        values (array): Samples, shape (len(time), len(fields))
+    """
+
+    def __init__(self, time, fields, values):
+        self.time = np.asarray(time, dtype=float)
+        self.fields = tuple(fields)
+        self.values = np.asarray(values, dtype=float).reshape(len(self.time), len(self.fields))
+
+    def sample(self, times):
+        """Returns the inputs at 'times' as an array of shape (len(times), len(fields))."""
+        times = np.asarray(times, dtype=float)
+        out = np.empty((len(times), len(self.fields)))
+        for j in range(len(self.fields)):
+            out[:, j] = np.interp(times, self.time, self.values[:, j])
+        return out
+
+
+class Scenario:
+    """
+    Validated scenario inputs.
+
+    Args:
+        values (dict): State field or "component.parameter" -> value
+        inputs (InputSeries): Time-series inputs, or None
+    """
+
+    def __init__(self, values, inputs=None):
+        self.values = dict(values)
+        self.inputs = inputs
+
+    def state_values(self):
+        return {name: value for name, value in self.values.items() if "." not in name}
+
+    def apply(self, engine):
+        """
+        Sets the engine's component parameters, then its state fields. A
+        value for a stream in DERIVED sets the wellhead input that produces
+        it, worked out with the parameters just set.
+        """
+        for name, value in self.values.items():
+            if "." in name:
+                attr, parameter = name.split(".", 1)
+                component = getattr(engine, attr)
+                # Keep integer parameters integers
+                setattr(component, parameter, type(getattr(component, parameter))(value))
+        for name, value in self.state_values().items():
+            if name in DERIVED:
+                name, inverse = DERIVED[name]
+                value = inverse(engine, value)
+            engine.state[name] = value
+
+
+def _field(name):
+    name = ALIASES.get(name, name)
+    if name in INITIAL_STATE:
+        return name
+    if name.count(".") == 1 and name.split(".")[0] in COMPONENTS:
+        return name
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _engine():
+    # Component parameters are checked against a default engine
+    from powerplantsim.simulation.engine import SimulationEngine
+    return SimulationEngine()
+
+
+def _is_parameter(name):
+    """True if "component.attribute" is an int or float parameter of the engine."""
+    attr, parameter = name.split(".")
+    if parameter.startswith("_"):
+        return False
+    value = getattr(getattr(_engine(), attr), parameter, None)
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _number(value):
+    return isinstance(value, float) and np.isfinite(value)
+
+
+def _parameter_table(rows, sheet):
+    for header_row, row in enumerate(rows):
+        if "Parameter" in row:
+            break
+    else:
+        raise ValueError(f"sheet '{sheet}' has no header row with a 'Parameter' column")
+    key = row.index("Parameter")
+    value_col = next((row.index(h) for h in ("Total", "Value") if h in row), None)
+    if value_col is None:
+        raise ValueError(f"sheet '{sheet}' has no 'Total' or 'Value' column")
+    unit_col = value_col + 1
+
+    values, errors = {}, []
+    targets = set()  # state fields and parameters set so far
+    for n, row in enumerate(rows[header_row + 1:], start=header_row + 2):
+        name = row[key] if key < len(row) else None
+        if name is None:
+            continue
+        value = row[value_col] if value_col < len(row) else None
+        if value is None:
+            continue  # parameter listed but not set
+        field = _field(str(name).strip())
+        target = DERIVED[field][0] if field in DERIVED else field
+        unit = row[unit_col] if unit_col < len(row) else None
+        if field is None:
+            errors.append(f"row {n}: unknown parameter '{name}'")
+        elif "." in field and not _is_parameter(field):
+            errors.append(f"row {n}: '{name}' is not a numeric component parameter")
+        elif not _number(value):
+            errors.append(f"row {n}: '{name}' is not a number: {value!r}")
+        elif field in UNITS and unit is not None and unit not in UNITS[field]:
+            errors.append(f"row {n}: '{name}' in {unit}, expected {' or '.join(UNITS[field])}")
+        elif target in targets:
+            errors.append(f"row {n}: '{name}' sets {target} a second time")
+        else:
+            values[field] = value
+            targets.add(target)
+    return values, errors
+
+
+def _time_series(rows):
+    rows = [row for row in rows if any(value is not None for value in row)]
+    if not rows:
+        return None, []
+    header = rows[0]
+    if header[0] != "time":
+        return None, ["sheet 'Timeseries': the first column must be 'time'"]
+    errors = []
+    fields = []
+    for name in header[1:]:
+        field = _field(str(name).strip()) if name is not None else None
+        if field is None or "." in field or field in DERIVED:
+            errors.append(f"sheet 'Timeseries': unknown input '{name}'")
+        fields.append(field)
+    data = np.full((len(rows) - 1, len(header)), np.nan)
+    for i, row in enumerate(rows[1:]):
+        for j, value in enumerate(row[:len(header)]):
+            if _number(value):
+                data[i, j] = value
+    if not np.all(np.isfinite(data)):
+        errors.append("sheet 'Timeseries': every sample must be a number")
+    elif len(data) and not np.all(np.diff(data[:, 0]) > 0):
+        errors.append("sheet 'Timeseries': time must be strictly increasing")
+    if errors:
+        return None, errors
+    return InputSeries(data[:, 0], fields, data[:, 1:]), []
+
+
+def compile_workbook(path):
+    """
+    Reads and validates a scenario workbook.
+
+    Returns:
+        Scenario
+
+    Raises:
+        ValueError: if the file is not a workbook, or listing every
+            problem found in it
+    """
+    try:
+        sheets = read_workbook(path)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as error:
+        raise ValueError(f"{path}: not a readable .xlsx workbook: {error}") from error
+    series_sheet = next((name for name in sheets if name.lower() == "timeseries"), None)
+    table_sheet = next((name for name in sheets if name != series_sheet), None)
+    if table_sheet is None:
+        raise ValueError(f"{path}: no parameter sheet")
+    values, errors = _parameter_table(sheets[table_sheet], table_sheet)
+    inputs = None
+    if series_sheet is not None:
+        inputs, series_errors = _time_series(sheets[series_sheet])
+        errors += series_errors
+    if errors:
+        raise ValueError(f"{path}:\n  " + "\n  ".join(errors))
+    return Scenario(values, inputs)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_compiled(scenario, path):
+    """Writes 'scenario' as .npz to 'path', replacing it atomically."""
+    names = list(scenario.values)
+    inputs = scenario.inputs
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            version=np.array(_CACHE_VERSION),
+            names=np.array(names, dtype=str),
+            values=np.array([scenario.values[name] for name in names], dtype=float),
+            series_fields=np.array(inputs.fields if inputs else [], dtype=str),
+            series_time=inputs.time if inputs else np.empty(0),
+            series_values=inputs.values if inputs else np.empty((0, 0)),
+        )
+    os.replace(tmp, path)
+
+
+def load_compiled(path):
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["version"]) != _CACHE_VERSION:
+            raise ValueError("compiled scenario has an old format")
+        values = dict(zip(data["names"].tolist(), data["values"].tolist()))
+        inputs = None
+        if len(data["series_fields"]):
+            inputs = InputSeries(data["series_time"], data["series_fields"].tolist(), data["series_values"])
+    return Scenario(values, inputs)
+
+
+def load_scenario(path, cache_dir=None):
+    """
+    Returns the Scenario of the workbook at 'path', from the compiled cache
+    when the file has not changed since it was last compiled.
+
+    Args:
+        path (str): .xlsx workbook
+        cache_dir (str): Directory of compiled scenarios, defaults to
+            default_cache_dir(); False disables the cache
+    """
+    if cache_dir is False:
+        return compile_workbook(path)
+    cache_dir = cache_dir or default_cache_dir()
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cached = os.path.join(cache_dir, f"{stem}-{file_hash(path)[:16]}.npz")
+    try:
+        return load_compiled(cached)
+    except (OSError, ValueError, KeyError):
+        pass
+    scenario = compile_workbook(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_compiled(scenario, cached)
+    except OSError:
+        pass  # read-only location: compile again next time
+    return scenario
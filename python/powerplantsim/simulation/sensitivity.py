@@ -0,0 +1,384 @@
+# powerplantsim/simulation/sensitivity.py
+#
+# Global sensitivity analysis of the plant model. Parameters are state
+# inputs ("wellhead_flow") or numeric component parameters named like the
+# snapshot slots ("turbine.efficiency", "steamseparator.pressure_drop"),
+# each varied uniformly over a range. Designs are evaluated in chunks on
+# BatchSimulationEngine, where a component parameter becomes an array with
+# one value per plant, spread over a process pool.
+#
+#   sobol()   Saltelli design, first-order (Saltelli 2010) and total
+#             (Jansen) indices with bootstrap confidence intervals;
+#             n * (d + 2) runs for d parameters
+#   morris()  Morris elementary effects (mu, mu*, sigma), a cheap screening
+#             with r * (d + 1) runs
+#
+# Command line:
+#   python -m powerplantsim.simulation.sensitivity sobol -n 4096
+#   python -m powerplantsim.simulation.sensitivity morris -r 100
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+
+from powerplantsim.simulation.batch import BatchSimulationEngine
+from powerplantsim.simulation.montecarlo import solve_batch
+from powerplantsim.simulation.state import PlantState
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+
+class Parameter:
+    """
+    A model parameter varied uniformly between 'low' and 'high'.
+
+    Args:
+        name (str): A state field, or "<component>.<attribute>" of the
+            engine, e.g. "turbine.efficiency"
+        low (float): Lower bound
+        high (float): Upper bound
+    """
+
+    def __init__(self, name, low, high):
+        if not low < high:
+            raise ValueError(f"{name}: low must be below high")
+        component, _, attribute = name.rpartition(".")
+        if component:
+            target = getattr(BatchSimulationEngine(1), component, None)
+            if target is None or attribute.startswith("_") \
+                    or not isinstance(getattr(target, attribute, None), (int, float)):
+                raise KeyError(name)
+        elif name not in PlantState.FIELDS:
+            raise KeyError(name)
+        self.name = name
+        self.low = low
+        self.high = high
+
+    def __repr__(self):
+        return f"Parameter({self.name!r}, {self.low!r}, {self.high!r})"
+
+    def scale(self, unit):
+        """Maps values in [0, 1] onto [low, high]."""
+        return self.low + (self.high - self.low) * np.asarray(unit)
+
+    def apply(self, engine, values):
+        """Sets the parameter of every plant of a BatchSimulationEngine."""
+        component, _, attribute = self.name.rpartition(".")
+        if component:
+            setattr(getattr(engine, component), attribute, np.asarray(values, dtype=float))
+        else:
+            engine.state[self.name][:] = values
+
+
+# Ranges around the defaults of the components and INITIAL_STATE
+DEFAULT_PARAMETERS = (
+    Parameter("wellhead_pressure", 9.0, 12.0),
+    Parameter("wellhead_temp", 170.0, 185.0),
+    Parameter("wellhead_flow", 60.0, 110.0),
+    Parameter("steamseparator.pressure_drop", 1.5, 2.5),
+    Parameter("steamseparator.steam_fraction", 0.8, 0.95),
+    Parameter("steamseparator.temperature_index", 0.99, 1.0),
+    Parameter("moistureseparator.pressure_drop", 0.3, 0.7),
+    Parameter("moistureseparator.heat_index", 0.99, 1.0),
+    Parameter("moistureseparator.flow_index", 0.97, 1.0),
+    Parameter("turbine.efficiency", 0.19, 0.26),
+)
+
+
+# Steam backend of each pool worker, created once by _init_worker
+_worker_properties = None
+
+
+def _init_worker(tabulated):
+    global _worker_properties
+    _worker_properties = TabulatedSteamProperties() if tabulated else None
+
+
+def _evaluate_chunk(parameters, X, outputs, n_steps, dt):
+    engine = BatchSimulationEngine(len(X), steam_properties=_worker_properties)
+    for j, parameter in enumerate(parameters):
+        parameter.apply(engine, X[:, j])
+    settled = True
+    if n_steps is None:
+        settled = solve_batch(engine)
+    else:
+        for _ in range(n_steps):
+            engine.step(dt)
+    # Runs that did not settle give NaN rather than a transient value
+    return np.column_stack([np.where(settled, engine.state[name], np.nan) for name in outputs])
+
+
+def evaluate(parameters, X, outputs=("turbine_out_power",), n_steps=None, dt=1.0, chunk_size=4096,
+             workers=None, tabulated=True, progress=None):
+    """
+    Runs one plant per row of X.
+
+    Args:
+        parameters (tuple): Parameter per column of X
+        X (array): Parameter values, one row per run
+        outputs (tuple): State fields to return
+        n_steps (int): Steps of 'dt' per run; None solves for steady state
+        dt (float): Time step in seconds
+        chunk_size (int): Runs per batch engine and per pool task
+        workers (int): Worker processes, defaults to the CPU count; 1 runs
+            in this process
+        tabulated (bool): Use the tabulated steam backend
+        progress (callable): Called as progress(done, total) after each chunk
+
+    Returns:
+        array: One row per run, one column per output; NaN for steady-state
+        runs that did not settle
+    """
+    X = np.asarray(X, dtype=float)
+    chunks = [X[start:start + chunk_size] for start in range(0, len(X), chunk_size)]
+    args = [(tuple(parameters), chunk, tuple(outputs), n_steps, dt) for chunk in chunks]
+    Y = np.empty((len(X), len(outputs)))
+    done = 0
+
+    def collect(results):
+        nonlocal done
+        for chunk, result in zip(chunks, results):
+            Y[done:done + len(chunk)] = result
+            done += len(chunk)
+            if progress:
+                progress(done, len(X))
+
+    if workers == 1:
+        _init_worker(tabulated)
+        collect(_evaluate_chunk(*chunk_args) for chunk_args in args)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(tabulated,)) as pool:
+            collect(pool.map(_evaluate_chunk, *zip(*args)))
+    return Y
+
+
+def _to_unit(parameters, X):
+    low = np.array([p.low for p in parameters])
+    high = np.array([p.high for p in parameters])
+    return (np.asarray(X) - low) / (high - low)
+
+
+def _from_unit(parameters, U):
+    return np.column_stack([p.scale(U[:, j]) for j, p in enumerate(parameters)])
+
+
+def saltelli_design(parameters, n, seed=0):
+    """
+    Returns the n * (d + 2) runs of a Saltelli design, stacked as A, B and
+    AB_1 ... AB_d, where AB_i is A with column i taken from B.
+    """
+    d = len(parameters)
+    base = np.random.default_rng(seed).random((n, 2 * d))
+    A, B = base[:, :d], base[:, d:]
+    blocks = [A, B]
+    for i in range(d):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        blocks.append(AB)
+    return _from_unit(parameters, np.vstack(blocks))
+
+
+def sobol_indices(y, d, n_bootstrap=500, confidence=0.95, seed=0):
+    """
+    First-order and total Sobol indices from the outputs of a Saltelli design.
+
+    Args:
+        y (array): Output of each run of saltelli_design(), in its order
+        d (int): Number of parameters
+        n_bootstrap (int): Bootstrap resamples for the confidence intervals
+        confidence (float): Confidence level of the intervals
+        seed (int): Seed of the bootstrap resampling
+
+    Returns:
+        dict: "S1", "S1_conf", "ST", "ST_conf" -> array with one entry per
+        parameter; *_conf is the half-width of the confidence interval
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y) // (d + 2)
+    if n * (d + 2) != len(y):
+        raise ValueError(f"{len(y)} outputs do not make a Saltelli design of {d} parameters")
+    f_A, f_B = y[:n], y[n:2 * n]
+    f_AB = y[2 * n:].reshape(d, n)
+
+    def indices(rows):
+        a, b, ab = f_A[rows], f_B[rows], f_AB[:, rows]
+        # Centring leaves the estimators unbiased but cuts their variance
+        # when the mean is large against the spread
+        centre = 0.5 * (a.mean() + b.mean())
+        a, b, ab = a - centre, b - centre, ab - centre
+        variance = np.var(np.concatenate((a, b)))
+        first = np.mean(b * (ab - a), axis=-1) / variance
+        total = 0.5 * np.mean((a - ab) ** 2, axis=-1) / variance
+        return first, total
+
+    first, total = indices(np.arange(n))
+    rng = np.random.default_rng(seed)
+    samples = np.array([indices(rng.integers(0, n, n)) for _ in range(n_bootstrap)])
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    first_conf, total_conf = z * samples.std(axis=0, ddof=1)
+    return {"S1": first, "S1_conf": first_conf, "ST": total, "ST_conf": total_conf}
+
+
+def morris_design(parameters, trajectories, levels=4, seed=0):
+    """
+    Returns 'trajectories' Morris trajectories of d + 1 runs each, stacked.
+    Every step of a trajectory moves one parameter, in random order and
+    direction, by delta = levels / (2 (levels - 1)) of its range.
+    """
+    d = len(parameters)
+    delta = levels / (2.0 * (levels - 1))
+    rng = np.random.default_rng(seed)
+    # Starting grid levels from which a step of +delta stays inside [0, 1]
+    starts = np.arange(levels) / (levels - 1)
+    starts = starts[starts <= 1.0 - delta + 1e-12]
+    runs = []
+    for _ in range(trajectories):
+        x = rng.choice(starts, d)
+        up = rng.random(d) < 0.5
+        x = np.where(up, x, x + delta)
+        runs.append(x.copy())
+        for i in rng.permutation(d):
+            x[i] += delta if up[i] else -delta
+            runs.append(x.copy())
+    return _from_unit(parameters, np.array(runs))
+
+
+def morris_indices(parameters, X, y, n_bootstrap=500, confidence=0.95, seed=0):
+    """
+    Morris statistics of the elementary effects, in output units per full
+    parameter range.
+
+    Args:
+        parameters (tuple): Parameters of the design
+        X (array): Runs of morris_design()
+        y (array): Output of each run
+        n_bootstrap (int): Bootstrap resamples for the confidence interval of mu*
+        confidence (float): Confidence level of the interval
+        seed (int): Seed of the bootstrap resampling
+
+    Returns:
+        dict: "mu", "mu_star", "mu_star_conf", "sigma" -> array with one
+        entry per parameter
+    """
+    d = len(parameters)
+    U = _to_unit(parameters, X).reshape(-1, d + 1, d)
+    y = np.asarray(y, dtype=float).reshape(-1, d + 1)
+    steps = np.diff(U, axis=1)                          # (r, d, d), one nonzero per step
+    moved = np.argmax(np.abs(steps), axis=2)            # parameter moved by each step
+    size = np.take_along_axis(steps, moved[..., None], axis=2)[..., 0]
+    effects = np.empty((len(U), d))
+    np.put_along_axis(effects, moved, np.diff(y, axis=1) / size, axis=1)
+
+    rng = np.random.default_rng(seed)
+    r = len(effects)
+    resampled = np.array([np.abs(effects[rng.integers(0, r, r)]).mean(axis=0) for _ in range(n_bootstrap)])
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return {
+        "mu": effects.mean(axis=0),
+        "mu_star": np.abs(effects).mean(axis=0),
+        "mu_star_conf": z * resampled.std(axis=0, ddof=1),
+        "sigma": effects.std(axis=0, ddof=1),
+    }
+
+
+def _per_parameter(parameters, outputs, results):
+    """output -> statistic -> array  to  output -> parameter name -> statistic -> float"""
+    return {
+        output: {p.name: {key: float(values[j]) for key, values in stats.items()}
+                 for j, p in enumerate(parameters)}
+        for output, stats in zip(outputs, results)
+    }
+
+
+def sobol(parameters=DEFAULT_PARAMETERS, n=1024, outputs=("turbine_out_power",), seed=0,
+          n_bootstrap=500, confidence=0.95, **kwargs):
+    """
+    Sobol indices of every output with respect to every parameter.
+
+    Args:
+        parameters (tuple): Parameters to vary
+        n (int): Base samples; the study runs n * (len(parameters) + 2) plants
+        outputs (tuple): State fields to analyse
+        seed (int): Seed of the design and the bootstrap
+        n_bootstrap (int): See sobol_indices
+        confidence (float): See sobol_indices
+        **kwargs: Passed to evaluate(): n_steps, dt, chunk_size, workers,
+            tabulated, progress
+
+    Returns:
+        dict: output -> parameter name -> {"S1", "S1_conf", "ST", "ST_conf"}
+    """
+    X = saltelli_design(parameters, n, seed)
+    Y = evaluate(parameters, X, outputs, **kwargs)
+    return _per_parameter(parameters, outputs, [
+        sobol_indices(Y[:, k], len(parameters), n_bootstrap, confidence, seed) for k in range(len(outputs))
+    ])
+
+
+def morris(parameters=DEFAULT_PARAMETERS, trajectories=100, levels=4, outputs=("turbine_out_power",),
+           seed=0, n_bootstrap=500, confidence=0.95, **kwargs):
+    """
+    Morris screening of every output with respect to every parameter.
+
+    Args:
+        parameters (tuple): Parameters to vary
+        trajectories (int): Trajectories; the study runs
+            trajectories * (len(parameters) + 1) plants
+        levels (int): Grid levels per parameter
+        outputs (tuple): State fields to analyse
+        seed (int): Seed of the design and the bootstrap
+        n_bootstrap (int): See morris_indices
+        confidence (float): See morris_indices
+        **kwargs: Passed to evaluate()
+
+    Returns:
+        dict: output -> parameter name -> {"mu", "mu_star", "mu_star_conf", "sigma"}
+    """
+    X = morris_design(parameters, trajectories, levels, seed)
+    Y = evaluate(parameters, X, outputs, **kwargs)
+    return _per_parameter(parameters, outputs, [
+        morris_indices(parameters, X, Y[:, k], n_bootstrap, confidence, seed) for k in range(len(outputs))
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sensitivity analysis of the plant model")
+    parser.add_argument("method", choices=("sobol", "morris"))
+    parser.add_argument("-n", type=int, default=1024, help="Sobol base samples")
+    parser.add_argument("-r", "--trajectories", type=int, default=100, help="Morris trajectories")
+    parser.add_argument("--outputs", default="turbine_out_power", help="comma-separated state fields")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--exact", action="store_true", help="use exact IAPWS-97 properties")
+    args = parser.parse_args(argv)
+
+    outputs = tuple(args.outputs.split(","))
+
+    def report(done, total):
+        sys.stderr.write(f"\r{done}/{total} runs")
+        sys.stderr.flush()
+
+    start = time.perf_counter()
+    options = dict(outputs=outputs, seed=args.seed, workers=args.workers, tabulated=not args.exact,
+                   progress=report)
+    if args.method == "sobol":
+        results, rank = sobol(n=args.n, **options), "ST"
+    else:
+        results, rank = morris(trajectories=args.trajectories, **options), "mu_star"
+    sys.stderr.write("\n")
+
+    width = max(len(p.name) for p in DEFAULT_PARAMETERS)
+    for output, table in results.items():
+        keys = list(next(iter(table.values())))
+        print(f"\n{output}")
+        print(f"{'parameter':{width}} " + " ".join(f"{key:>12}" for key in keys))
+        for name, stats in sorted(table.items(), key=lambda item: -item[1][rank]):
+            print(f"{name:{width}} " + " ".join(f"{stats[key]:12.4g}" for key in keys))
+    print(f"\n{time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
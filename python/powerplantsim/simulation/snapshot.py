@@ -0,0 +1,99 @@
+# powerplantsim/simulation/snapshot.py
+#
+# Binary snapshots of a SimulationEngine: simulation time, every PlantState
+# field and the numeric parameters of every component (efficiency, ...),
+# packed as one float64 vector behind a small header. The header carries a
+# checksum of the slot names, so a blob only restores into an engine with
+# the same layout.
+
+import os
+import struct
+import zlib
+import numpy as np
+
+from powerplantsim.simulation.state import PlantState
+
+_MAGIC = b"PPSN"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHI")  # magic, version, layout checksum
+
+# Engine attributes holding components whose parameters are saved
+COMPONENTS = ("wellhead", "steamseparator", "moistureseparator", "turbine",
+              "condenser", "generator", "coolingtower", "relifvalve")
+
+
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class SnapshotLayout:
+    """
+    Slot order of an engine's snapshot: simulation time, the state fields,
+    each component's numeric parameters and the dynamics step size.
+    Components are looked up by attribute on every call, so swapping one
+    (e.g. enable_memoization) keeps the layout valid.
+    """
+
+    def __init__(self, engine):
+        self.parameters = []  # (component attribute, parameter name)
+        for attr in COMPONENTS:
+            component = getattr(engine, attr)
+            component = getattr(component, "component", component)  # MemoizedComponent
+            for name, value in vars(component).items():
+                # Underscore attributes (Component._version) are bookkeeping
+                if _numeric(value) and not name.startswith("_"):
+                    self.parameters.append((attr, name))
+        self.has_dynamics = engine.dynamics is not None
+        names = ["simulation_time"] + list(PlantState.FIELDS) \
+            + [f"{attr}.{name}" for attr, name in self.parameters] \
+            + (["dynamics.h"] if self.has_dynamics else [])
+        self.checksum = zlib.crc32(",".join(names).encode())
+        self.header = _HEADER.pack(_MAGIC, _VERSION, self.checksum)
+        self.size = len(names)
+
+    def pack(self, engine):
+        state = engine.state
+        values = [engine.simulation_time]
+        values += [getattr(state, name) for name in PlantState.FIELDS]
+        values += [getattr(getattr(engine, attr), name) for attr, name in self.parameters]
+        if self.has_dynamics:
+            h = engine.dynamics.integrator.h
+            values.append(np.nan if h is None else h)
+        return self.header + np.array(values, dtype="<f8").tobytes()
+
+    def unpack(self, engine, blob):
+        magic, version, checksum = _HEADER.unpack_from(blob)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("not a PowerPlantSim snapshot")
+        if checksum != self.checksum or len(blob) != _HEADER.size + 8 * self.size:
+            raise ValueError("snapshot was taken from an engine with a different layout")
+        values = np.frombuffer(blob, dtype="<f8", offset=_HEADER.size).tolist()
+
+        engine.simulation_time = values[0]
+        state = engine.state
+        n = len(PlantState.FIELDS)
+        for name, value in zip(PlantState.FIELDS, values[1:1 + n]):
+            setattr(state, name, value)
+        offset = 1 + n
+        for (attr, name), value in zip(self.parameters, values[offset:]):
+            component = getattr(engine, attr)
+            # Keep integer parameters integers
+            setattr(component, name, type(getattr(component, name))(value))
+        if self.has_dynamics:
+            h = values[-1]
+            engine.dynamics.integrator.h = None if h != h else h
+
+
+def write_checkpoint(path, blob):
+    """Writes 'blob' to 'path' atomically, so a crash leaves the old checkpoint intact."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_checkpoint(path):
+    with open(path, "rb") as f:
+        return f.read()
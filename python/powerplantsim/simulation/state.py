@@ -0,0 +1,83 @@
+# powerplantsim/simulation/state.py
+
+from collections.abc import MutableMapping
+
+# Plant state at start-up, in field order. NaN marks values that are only
+# known after the first step.
+INITIAL_STATE = {
+    "wellhead_pressure": 10.5,   # barG
+    "wellhead_temp": 178.0,      # °C
+    "wellhead_flow": 85.0,       # kg/s
+    "separator_outlet_pressure": float("nan"),
+    "separator_outlet_steam_flow": float("nan"),
+    "separator_outlet_steam_temp": float("nan"),
+    "turbine_inlet_pressure": float("nan"),
+    "turbine_inlet_temp": float("nan"),
+    "turbine_inlet_flow": float("nan"),
+    "waste_water_flow": float("nan"),
+    "turbine_out_power": 0.0,
+    "turbine_exhaust_flow": float("nan"),
+    "steam_flow": float("nan"),
+    "condenser_pressure": 0.06,
+    "condenser_temp": 35.0,
+    # Dynamic states, integrated when the engine runs with dynamics=True
+    "rotor_speed": 3000.0,       # rpm
+    "hotwell_level": 0.5,        # m
+    "basin_temp": 25.0,          # °C
+    "fan_speed": 70.0,           # % of full cooling tower fan speed
+    "generator_load": float("nan"),   # MW dispatched; NaN follows the turbine
+    "generator_power": float("nan"),  # MW
+}
+
+
+class PlantState(MutableMapping):
+    """
+    Plant state as one float per slot. The engine reads and writes fields as
+    attributes (``state.wellhead_pressure``); everything else can keep using
+    it like the old dict (``state["wellhead_pressure"]``, ``.items()``, ...).
+    The set of fields is fixed, so keys cannot be added or deleted.
+    """
+
+    FIELDS = tuple(INITIAL_STATE)
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        for name, value in INITIAL_STATE.items():
+            setattr(self, name, value)
+        self.update(values)
+
+    def __getitem__(self, key):
+        # Only fields are keys; methods and class attributes are not
+        try:
+            if key in INITIAL_STATE:
+                return getattr(self, key)
+        except TypeError:  # unhashable key
+            pass
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in INITIAL_STATE:
+            raise KeyError(key)
+        setattr(self, key, float(value))
+
+    def __delitem__(self, key):
+        raise TypeError("PlantState fields cannot be deleted")
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __contains__(self, key):
+        return key in INITIAL_STATE
+
+    def __repr__(self):
+        return f"PlantState({self.as_dict()})"
+
+    def as_dict(self):
+        """Returns a plain dict copy of the state."""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def copy(self):
+        return PlantState(**self.as_dict())
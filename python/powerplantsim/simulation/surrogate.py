@@ -0,0 +1,353 @@
+# powerplantsim/simulation/surrogate.py
+#
+# Fast approximation of a steady-state plant output (by default turbine
+# power) as a function of the wellhead inputs, for callers such as a
+# dispatch optimizer that need thousands of answers per second.
+#
+# The input box is split into a grid of cells and each cell gets its own
+# Legendre polynomial (a local polynomial chaos expansion), fitted by least
+# squares to engine runs drawn inside it. Power jumps where the turbine
+# inlet crosses the saturation line, which no smooth global fit can follow;
+# as in TabulatedSteamProperties, each cell is validated against held-out
+# engine runs instead, and queries in cells whose error exceeds
+# 'max_error', or outside the box, are answered by the full engine.
+#
+# Command line:
+#   python -m powerplantsim.simulation.surrogate power-surrogate.npz
+
+import argparse
+import itertools
+import math
+import time
+import numpy as np
+from numpy.polynomial import legendre
+
+from powerplantsim.simulation.batch import BatchSimulationEngine
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.montecarlo import solve_batch
+from powerplantsim.simulation.sensitivity import Parameter, evaluate
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+_FORMAT_VERSION = 1
+
+DEFAULT_INPUTS = (
+    Parameter("wellhead_pressure", 9.0, 12.0),
+    Parameter("wellhead_temp", 170.0, 185.0),
+    Parameter("wellhead_flow", 60.0, 110.0),
+)
+
+
+def _exponents(n_inputs, degree):
+    """Multi-indices of total degree <= 'degree', one row per basis term."""
+    return np.array([e for e in itertools.product(range(degree + 1), repeat=n_inputs)
+                     if sum(e) <= degree], dtype=np.intp)
+
+
+class PlantSurrogate:
+    """
+    Piecewise polynomial surrogate of one plant output. Build it with
+    PlantSurrogate.train() or load_surrogate().
+
+    Args:
+        inputs (tuple): Parameter per input; its range is the trained envelope
+        output (str): State field approximated
+        cells (tuple): Number of grid cells along each input
+        degree (int): Total degree of the polynomial in each cell
+        coeffs (array): Coefficients, shape cells + (n_terms,)
+        error_bound (array): Validated error bound per cell, shape cells
+        max_error (float): Cells with a larger error bound fall back to the engine
+        tabulated (bool): Steam backend of the fallback engine
+        validation (dict): Statistics of the held-out check, see train()
+    """
+
+    def __init__(self, inputs, output, cells, degree, coeffs, error_bound, max_error,
+                 tabulated=True, validation=None):
+        self.inputs = tuple(inputs)
+        self.output = output
+        self.cells = tuple(int(c) for c in cells)
+        self.degree = int(degree)
+        self.coeffs = np.asarray(coeffs, dtype=float)
+        self.error_bound = np.asarray(error_bound, dtype=float)
+        self.max_error = float(max_error)
+        self.tabulated = bool(tabulated)
+        self.validation = dict(validation or {})
+        self.valid = self.error_bound <= self.max_error
+        self.low = np.array([p.low for p in self.inputs])
+        self.high = np.array([p.high for p in self.inputs])
+        self.exponents = _exponents(len(self.inputs), self.degree)
+        self.fallback_count = 0
+        self._steam_properties = None
+        self._engine = None  # scalar engine for predict_one()
+        # Plain Python copies for predict_one(); indexing NumPy arrays one
+        # element at a time is slower than evaluating the polynomial.
+        self._bounds = list(zip(self.low.tolist(), self.high.tolist(), self.cells))
+        self._terms = [tuple(e) for e in self.exponents.tolist()]
+        self._cells = [
+            (tuple(c), b) if ok else None
+            for c, b, ok in zip(self.coeffs.reshape(-1, len(self.exponents)).tolist(),
+                                self.error_bound.ravel().tolist(), self.valid.ravel().tolist())
+        ]
+
+    @classmethod
+    def train(cls, inputs=DEFAULT_INPUTS, output="turbine_out_power", cells=(32, 32, 1), degree=2,
+              samples_per_cell=30, holdout_per_cell=10, max_error=0.01, safety=2.0, seed=0, workers=1,
+              tabulated=True):
+        """
+        Fits a surrogate to steady-state engine runs and validates it.
+
+        Every cell gets 'samples_per_cell' uniform training runs and
+        'holdout_per_cell' further runs that are only used to measure its
+        error, and is also checked at its corners, which catches a phase
+        boundary that only clips a corner of the cell. A cell's error bound
+        is 'safety' times the largest error on any of these points.
+
+        Args:
+            inputs (tuple): Parameter per input, see sensitivity.py
+            output (str): State field to approximate
+            cells (tuple): Grid cells along each input
+            degree (int): Total polynomial degree per cell
+            samples_per_cell (int): Training runs per cell
+            holdout_per_cell (int): Validation runs per cell
+            max_error (float): Error above which a cell falls back to the engine
+            safety (float): Factor on the largest error seen in a cell
+            seed (int): Seed of the sampling
+            workers (int): Worker processes for the engine runs, see evaluate()
+            tabulated (bool): Use the tabulated steam backend
+
+        Returns:
+            PlantSurrogate
+        """
+        d = len(inputs)
+        cells = tuple(cells)
+        if len(cells) != d:
+            raise ValueError(f"need a cell count for each of the {d} inputs")
+        exponents = _exponents(d, degree)
+        if samples_per_cell < len(exponents):
+            raise ValueError(f"degree {degree} needs at least {len(exponents)} samples per cell")
+        n_cells = int(np.prod(cells))
+        per_cell = samples_per_cell + holdout_per_cell
+
+        # Stratified sampling: 'per_cell' uniform points in every cell
+        rng = np.random.default_rng(seed)
+        index = np.repeat(np.indices(cells).reshape(d, -1).T, per_cell, axis=0)
+        unit = (index + rng.random(index.shape)) / np.array(cells)
+        # plus every grid vertex, for the corner checks
+        vertices = np.indices(tuple(c + 1 for c in cells)).reshape(d, -1).T
+        points = np.vstack((unit, vertices / np.array(cells)))
+        X = np.column_stack([p.scale(points[:, j]) for j, p in enumerate(inputs)])
+        start = time.perf_counter()
+        y = evaluate(inputs, X, (output,), workers=workers, tabulated=tabulated)[:, 0]
+        engine_time = time.perf_counter() - start
+        y, at_vertex = y[:len(unit)], y[len(unit):].reshape(tuple(c + 1 for c in cells))
+
+        local = (2.0 * (unit * np.array(cells) - index) - 1.0).reshape(n_cells, per_cell, d)
+        y = y.reshape(n_cells, per_cell)
+        basis = cls._basis(local.reshape(-1, d), exponents, degree).reshape(n_cells, per_cell, -1)
+
+        # Each cell's corners: local coordinates and the vertex values there
+        offsets = np.array(list(itertools.product((0, 1), repeat=d)))
+        cell_index = np.indices(cells).reshape(d, -1).T
+        corner_basis = cls._basis(2.0 * offsets - 1.0, exponents, degree)
+        corner_values = np.stack([at_vertex[tuple((cell_index + o).T)] for o in offsets], axis=1)
+
+        coeffs = np.empty((n_cells, len(exponents)))
+        error_bound = np.empty(n_cells)
+        fit, check = slice(0, samples_per_cell), slice(samples_per_cell, per_cell)
+        for k in range(n_cells):
+            if np.all(np.isfinite(y[k])) and np.all(np.isfinite(corner_values[k])):
+                coeffs[k] = np.linalg.lstsq(basis[k, fit], y[k, fit], rcond=None)[0]
+                error_bound[k] = safety * max(np.abs(basis[k] @ coeffs[k] - y[k]).max(),
+                                              np.abs(corner_basis @ coeffs[k] - corner_values[k]).max())
+            else:
+                coeffs[k] = np.nan
+                error_bound[k] = np.inf
+
+        holdout = basis[:, check] @ coeffs[..., None]
+        errors = np.abs(holdout[..., 0] - y[:, check])
+        valid = error_bound <= max_error
+        validation = {
+            "n_train": n_cells * samples_per_cell,
+            "n_holdout": n_cells * holdout_per_cell + at_vertex.size,
+            "engine_seconds": engine_time,
+            "valid_fraction": float(valid.mean()),
+            "holdout_rmse": float(np.sqrt(np.mean(errors[valid] ** 2))) if valid.any() else float("nan"),
+            "holdout_max_error": float(errors[valid].max()) if valid.any() else float("nan"),
+        }
+        return cls(inputs, output, cells, degree, coeffs.reshape(cells + (-1,)), error_bound.reshape(cells),
+                   max_error, tabulated, validation)
+
+    @staticmethod
+    def _basis(local, exponents, degree):
+        """Legendre basis of every row of 'local' (coordinates in [-1, 1]), one column per term."""
+        d = local.shape[1]
+        vander = [legendre.legvander(local[:, j], degree) for j in range(d)]
+        terms = vander[0][:, exponents[:, 0]]
+        for j in range(1, d):
+            terms = terms * vander[j][:, exponents[:, j]]
+        return terms
+
+    def inside(self, X):
+        """True for every row of X inside the trained envelope."""
+        X = np.asarray(X, dtype=float)
+        return np.all((X >= self.low) & (X <= self.high), axis=1)
+
+    def predict(self, X):
+        """
+        Approximates the output for every row of X (one column per input).
+
+        Rows outside the envelope or in cells that failed validation are
+        run through the engine and count towards 'fallback_count'. Rows
+        with a NaN or infinite input give NaN.
+
+        Returns:
+            tuple: (values, error_bound) arrays; the bound is the validated
+            error of the row's cell, 0 for engine results
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        cells = np.array(self.cells)
+        finite = np.all(np.isfinite(X), axis=1)
+        inside = self.inside(X)
+        unit = (X - self.low) / (self.high - self.low)
+        # Points on the upper boundary belong to the last cell; rows outside
+        # are given cell 0 and answered by the engine
+        unit = np.where(inside[:, None], unit, 0.0)
+        index = np.clip(np.floor(unit * cells), 0, cells - 1).astype(np.intp)
+        index_tuple = tuple(index.T)
+        ok = inside & self.valid[index_tuple]
+
+        local = 2.0 * (unit * cells - index) - 1.0
+        basis = self._basis(local, self.exponents, self.degree)
+        values = np.einsum("ij,ij->i", basis, self.coeffs[index_tuple])
+        bound = self.error_bound[index_tuple].copy()
+
+        values[~finite] = bound[~finite] = np.nan
+        miss = np.nonzero(~ok & finite)[0]
+        if miss.size:
+            self.fallback_count += miss.size
+            values[miss] = self.run_engine(X[miss])
+            bound[miss] = 0.0
+        return values, bound
+
+    def predict_one(self, *x):
+        """
+        predict() for a single query given as one value per input, e.g.
+        predict_one(pressure, temp, flow); returns (value, error_bound).
+        Falls back to a scalar engine solved for steady state; a NaN or
+        infinite input gives (nan, nan).
+
+        Raises:
+            ValueError: if not given one value per input
+        """
+        if len(x) != len(self.inputs):
+            raise ValueError(f"expected {len(self.inputs)} values, one per input, got {len(x)}")
+        if not all(math.isfinite(value) for value in x):
+            return math.nan, math.nan
+        flat = 0
+        local = []
+        for value, (low, high, n) in zip(x, self._bounds):
+            u = (value - low) / (high - low)
+            if not 0.0 <= u <= 1.0:
+                break
+            i = min(int(u * n), n - 1)
+            flat = flat * n + i
+            local.append(2.0 * (u * n - i) - 1.0)
+        else:
+            cell = self._cells[flat]
+            if cell is not None:
+                coeffs, bound = cell
+                # Legendre polynomials of each local coordinate, by recurrence
+                legendre_values = []
+                for z in local:
+                    p = [1.0, z]
+                    for k in range(1, self.degree):
+                        p.append(((2 * k + 1) * z * p[k] - k * p[k - 1]) / (k + 1))
+                    legendre_values.append(p)
+                value = 0.0
+                for c, term in zip(coeffs, self._terms):
+                    for p, e in zip(legendre_values, term):
+                        c *= p[e]
+                    value += c
+                return value, bound
+        self.fallback_count += 1
+        engine = self._engine
+        if engine is None:
+            engine = self._engine = SimulationEngine(steam_properties=self._fallback_properties())
+        for parameter, value in zip(self.inputs, x):
+            component, _, attribute = parameter.name.rpartition(".")
+            if component:
+                setattr(getattr(engine, component), attribute, value)
+            else:
+                engine.state[parameter.name] = value
+        engine.solve_steady_state()
+        return engine.state[self.output], 0.0
+
+    def _fallback_properties(self):
+        if self._steam_properties is None and self.tabulated:
+            self._steam_properties = TabulatedSteamProperties()
+        return self._steam_properties
+
+    def run_engine(self, X):
+        """Steady-state output of the full engine for every row of X, NaN where it did not settle."""
+        engine = BatchSimulationEngine(len(X), steam_properties=self._fallback_properties())
+        for j, parameter in enumerate(self.inputs):
+            parameter.apply(engine, X[:, j])
+        settled = solve_batch(engine)
+        return np.where(settled, engine.state[self.output], np.nan)
+
+    def save(self, path):
+        """Writes the surrogate to an .npz file, see load_surrogate()."""
+        np.savez(
+            path,
+            version=_FORMAT_VERSION,
+            names=np.array([p.name for p in self.inputs]),
+            low=self.low, high=self.high,
+            output=self.output, degree=self.degree, cells=np.array(self.cells),
+            coeffs=self.coeffs, error_bound=self.error_bound, max_error=self.max_error,
+            tabulated=self.tabulated,
+            validation_keys=np.array(list(self.validation)),
+            validation_values=np.array(list(self.validation.values()), dtype=float),
+        )
+
+
+def load_surrogate(path):
+    """
+    Reads a surrogate written by PlantSurrogate.save().
+
+    Raises:
+        ValueError: for a file of another format version
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["version"]) != _FORMAT_VERSION:
+            raise ValueError(f"{path}: surrogate format {int(data['version'])}, expected {_FORMAT_VERSION}")
+        inputs = [Parameter(str(name), float(low), float(high))
+                  for name, low, high in zip(data["names"], data["low"], data["high"])]
+        validation = dict(zip((str(k) for k in data["validation_keys"]),
+                              (float(v) for v in data["validation_values"])))
+        return PlantSurrogate(inputs, str(data["output"]), data["cells"], int(data["degree"]),
+                              data["coeffs"], data["error_bound"], float(data["max_error"]),
+                              bool(data["tabulated"]), validation)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train a surrogate of the plant's steady-state output")
+    parser.add_argument("path", help="output .npz file")
+    parser.add_argument("--output", default="turbine_out_power", help="state field to approximate")
+    parser.add_argument("--cells", default="32,32,1", help="grid cells per input, comma-separated")
+    parser.add_argument("--degree", type=int, default=2)
+    parser.add_argument("--max-error", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--exact", action="store_true", help="use exact IAPWS-97 properties")
+    args = parser.parse_args(argv)
+
+    surrogate = PlantSurrogate.train(
+        output=args.output, cells=tuple(int(c) for c in args.cells.split(",")), degree=args.degree,
+        max_error=args.max_error, seed=args.seed, workers=args.workers, tabulated=not args.exact)
+    surrogate.save(args.path)
+    for key, value in surrogate.validation.items():
+        print(f"{key:18} {value:.6g}")
+    print(f"Saved to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
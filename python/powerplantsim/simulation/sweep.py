@@ -0,0 +1,206 @@
+# powerplantsim/simulation/sweep.py
+#
+# Parallel parameter sweeps: every combination of the input grids is solved
+# for its steady state, shards of combinations are spread over a
+# process pool, and the results are appended to one .npy table as shards
+# finish. Re-running with resume=True skips combinations already in the file.
+#
+# The grids and run settings are recorded next to the table in
+# <output>.json; a resume with different ones is refused, as the flat
+# combination indices of the file would then mean other parameter values.
+#
+# Command line:
+#   python -m powerplantsim.simulation.sweep -o sweep.npy \
+#       --wellhead_pressure 5:20:16 --wellhead_temp 150:200:11 --wellhead_flow 50:150:11
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.state import PlantState
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+from powerplantsim.simulation.trajectory import NpyTrajectoryWriter
+
+# Input ranges of the plant controls in MainWindow: (min, max)
+DEFAULT_RANGES = {
+    "wellhead_pressure": (5.0, 20.0),   # barG
+    "wellhead_temp": (150.0, 200.0),    # °C
+    "wellhead_flow": (50.0, 150.0),     # kg/s
+}
+
+DEFAULT_OUTPUTS = ("turbine_out_power", "steam_flow", "separator_outlet_pressure")
+
+# Engine owned by each pool worker, created once by _init_worker
+_worker_engine = None
+
+
+def sweep_dtype(parameters, outputs):
+    """Row layout of a sweep table: combination index, inputs, then outputs."""
+    return np.dtype([("index", "i8")] + [(name, "f8") for name in parameters]
+                    + [(name, "f8") for name in outputs])
+
+
+def sweep_settings_path(output):
+    """File recording the grids and run settings of the sweep table at 'output'."""
+    return output + ".json"
+
+
+def _init_worker(tabulated):
+    global _worker_engine
+    _worker_engine = SimulationEngine(
+        steam_properties=TabulatedSteamProperties() if tabulated else None)
+
+
+def _run_shard(grids, indices, outputs, n_steps, dt):
+    """Runs the combinations with the given flat indices on this worker's engine."""
+    engine = _worker_engine
+    names = list(grids)
+    shape = tuple(len(values) for values in grids.values())
+    coords = np.unravel_index(indices, shape)
+
+    rows = np.empty(len(indices), dtype=sweep_dtype(names, outputs))
+    rows["index"] = indices
+    for name, values, coord in zip(names, grids.values(), coords):
+        rows[name] = np.asarray(values, dtype=float)[coord]
+
+    for row in rows:
+        engine.state = PlantState(**{name: row[name] for name in names})
+        engine.simulation_time = 0.0
+        if n_steps is None:
+            engine.solve_steady_state()
+        else:
+            for _ in range(n_steps):
+                engine.step_simulation(dt)
+        for name in outputs:
+            row[name] = engine.state[name]
+    return rows
+
+
+def sweep(grids, output, outputs=DEFAULT_OUTPUTS, n_steps=None, dt=1.0,
+          workers=None, shard_size=256, resume=False, tabulated=True, progress=None):
+    """
+    Runs every combination of the parameter grids and appends the results
+    to the .npy table at 'output'.
+
+    Args:
+        grids (dict): State field -> sequence of values
+        output (str): .npy file for the result table
+        outputs (tuple): State fields recorded after the last step
+        n_steps (int): Steps run per combination; None solves each one
+            directly with SimulationEngine.solve_steady_state
+        dt (float): Time step in seconds
+        workers (int): Worker processes, defaults to the CPU count
+        shard_size (int): Combinations per task sent to a worker
+        resume (bool): Keep rows already in 'output' and skip their
+            combinations; the grids and settings must match the run that
+            wrote them
+        tabulated (bool): Use the tabulated steam backend in the workers
+        progress (callable): Called as progress(done, total) after each shard
+
+    Returns:
+        Number of combinations run by this call
+
+    Raises:
+        ValueError: when resuming a table written with other grids or settings
+    """
+    for name in list(grids) + list(outputs):
+        if name not in PlantState.FIELDS:
+            raise KeyError(name)
+    grids = {name: [float(v) for v in values] for name, values in grids.items()}
+    total = int(np.prod([len(values) for values in grids.values()]))
+
+    # Grids as [name, values] pairs: their order defines the flat index
+    settings = {"grids": [[name, values] for name, values in grids.items()], "outputs": list(outputs), "n_steps": n_steps, "dt": float(dt),
+                "tabulated": bool(tabulated)}
+    settings_path = sweep_settings_path(output)
+    if resume and os.path.exists(output):
+        try:
+            with open(settings_path) as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            raise ValueError(f"{settings_path} is missing or unreadable; cannot tell which grids "
+                             f"{output} was run with") from None
+        if recorded != settings:
+            changed = sorted(key for key in settings if recorded.get(key) != settings[key])
+            raise ValueError(f"{output} was written with different {', '.join(changed)}; "
+                             "run without resume to start over")
+    else:
+        with open(settings_path, "w") as f:
+            json.dump(settings, f, indent=1)
+
+    with NpyTrajectoryWriter(output, sweep_dtype(grids, outputs), append=resume) as writer:
+        remaining = np.arange(total)
+        if writer.n_rows:
+            remaining = np.setdiff1d(remaining, writer.rows()["index"])
+        done = total - len(remaining)
+        if progress:
+            progress(done, total)
+
+        shards = [remaining[i:i + shard_size] for i in range(0, len(remaining), shard_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(tabulated,)) as pool:
+            futures = [pool.submit(_run_shard, grids, shard, tuple(outputs), n_steps, dt)
+                       for shard in shards]
+            for future in as_completed(futures):
+                rows = future.result()
+                writer.write(rows)
+                writer.flush()
+                done += len(rows)
+                if progress:
+                    progress(done, total)
+    return len(remaining)
+
+
+def load_sweep(path, sort=True):
+    """Loads a sweep table, ordered by combination index unless sort=False."""
+    table = np.load(path)
+    return np.sort(table, order="index") if sort else table
+
+
+def _parse_range(text):
+    """'start:stop:num' -> np.linspace(start, stop, num); 'a,b,c' -> [a, b, c]"""
+    if ":" in text:
+        start, stop, num = text.split(":")
+        return np.linspace(float(start), float(stop), int(num))
+    return [float(v) for v in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep of the plant model")
+    parser.add_argument("-o", "--output", required=True, help=".npy result table")
+    for name, (low, high) in DEFAULT_RANGES.items():
+        parser.add_argument(f"--{name}", type=_parse_range, default=None,
+                            help=f"start:stop:num or comma separated values (range {low}-{high})")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=None,
+                        help="time-march this many steps instead of solving for steady state")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted sweep")
+    parser.add_argument("--exact", action="store_true", help="use exact IAPWS-97 properties")
+    args = parser.parse_args(argv)
+
+    grids = {name: getattr(args, name) for name in DEFAULT_RANGES if getattr(args, name) is not None}
+    if not grids:
+        parser.error("give at least one parameter grid")
+
+    start = time.perf_counter()
+
+    def report(done, total):
+        rate = done / max(time.perf_counter() - start, 1e-9)
+        sys.stderr.write(f"\r{done}/{total} combinations ({100 * done / total:.1f}%, {rate:.0f}/s)")
+        sys.stderr.flush()
+
+    ran = sweep(grids, args.output, n_steps=args.steps, workers=args.workers,
+                shard_size=args.shard_size, resume=args.resume,
+                tabulated=not args.exact, progress=report)
+    sys.stderr.write("\n")
+    print(f"Ran {ran} combinations in {time.perf_counter() - start:.1f} s -> {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# powerplantsim/simulation/thermo.py
+#
+# Steam property backends used by the components. Every backend takes
+# pressure in MPa and temperature in K (the IAPWS-97 convention) and returns
+# specific enthalpy in kJ/kg.
+
+import os
+import zlib
+import numpy as np
+
+from powerplantsim.utils.helpers import default_cache_dir
+
+# iapws imports scipy.optimize, which dominates the start-up time of a
+# headless worker; it is only loaded when an exact property is needed.
+_iapws97 = None
+
+
+def _iapws():
+    global _iapws97
+    if _iapws97 is None:
+        import iapws.iapws97
+        _iapws97 = iapws.iapws97
+    return _iapws97
+
+
+# IAPWS-97 Eq. 31 coefficients
+_N_SAT = (0, 0.11670521452767E+04, -0.72421316703206E+06, -0.17073846940092E+02,
+          0.12020824702470E+05, -0.32325550322333E+07, 0.14915108613530E+02,
+          -0.48232657361591E+04, 0.40511340542057E+06, -0.23855557567849E+00,
+          0.65017534844798E+03)
+
+
+def _t_sat(P):
+    """iapws.iapws97._TSat_P without the bound check, same operations."""
+    n = _N_SAT
+    beta = P ** 0.25
+    E = beta ** 2 + n[3] * beta + n[6]
+    F = n[1] * beta ** 2 + n[4] * beta + n[7]
+    G = n[2] * beta ** 2 + n[5] * beta + n[8]
+    D = 2 * G / (-F - (F ** 2 - 4 * E * G) ** 0.5)
+    return (n[10] + D - ((n[10] + D) ** 2 - 4 * (n[9] + n[10] * D)) ** 0.5) / 2
+
+
+def saturation_temperature(P):
+    """
+    Saturation temperature in K at pressure P in MPa (IAPWS-97 Eq. 31).
+
+    Raises:
+        ValueError: if P is outside the triple point to critical point range
+    """
+    if P < 611.212677 / 1e6 or P > 22.064:
+        raise ValueError(f"saturation pressure {P} MPa out of bound")
+    return _t_sat(P)
+
+
+class IAPWS97Properties:
+    """Exact IAPWS-97 properties, one full solve per call."""
+
+    def enthalpy(self, P, T):
+        return _iapws().IAPWS97(P=P, T=T).h
+
+    def enthalpy_array(self, P, T):
+        P, T = np.broadcast_arrays(np.asarray(P, dtype=float), np.asarray(T, dtype=float))
+        out = np.empty(P.shape)
+        for idx in np.ndindex(P.shape):
+            out[idx] = self.enthalpy(float(P[idx]), float(T[idx]))
+        return out
+
+
+# Maps a bicubic Hermite patch (values and derivatives at the four corners)
+# onto the 16 polynomial coefficients, see Press et al., Numerical Recipes §3.6.
+_HERMITE = np.array([
+    [1.0, 0.0, 0.0, 0.0],
+    [0.0, 0.0, 1.0, 0.0],
+    [-3.0, 3.0, -2.0, -1.0],
+    [2.0, -2.0, 1.0, 1.0],
+])
+
+# Tables are expensive to build, so they are shared between instances that
+# ask for the same grid, and stored in the cache directory for later runs.
+_TABLE_CACHE = {}
+_TABLE_VERSION = 1
+
+
+class TabulatedSteamProperties:
+    """
+    Bicubic interpolation of IAPWS-97 enthalpy on a precomputed (P, T) grid.
+
+    The liquid (region 1) and vapour (region 2) equations are tabulated
+    separately and the saturation line picks which table to use, so no cell
+    ever interpolates across the phase change. After building, every cell is
+    checked at its centre against the exact equation; cells whose error
+    exceeds ``max_error`` (kJ/kg), and any query outside the grid, fall back
+    to the exact backend.
+
+    Args:
+        p_range (tuple): (min, max, step) pressure in MPa
+        t_range (tuple): (min, max, step) temperature in K
+        max_error (float): Allowed enthalpy error in kJ/kg
+    """
+
+    def __init__(self, p_range=(0.2, 2.0, 0.05), t_range=(393.15, 493.15, 2.5), max_error=0.05):
+        self.p_range = tuple(p_range)
+        self.t_range = tuple(t_range)
+        self.max_error = max_error
+        self.exact = IAPWS97Properties()
+        self.fallback_count = 0
+
+        key = (self.p_range, self.t_range, max_error)
+        if key not in _TABLE_CACHE:
+            _TABLE_CACHE[key] = self._load_tables(key)
+        self.p_grid, self.t_grid, self.coeffs, self.valid = _TABLE_CACHE[key]
+
+        self.p0, self.t0 = self.p_grid[0], self.t_grid[0]
+        self.dp = self.p_grid[1] - self.p_grid[0]
+        self.dt = self.t_grid[1] - self.t_grid[0]
+        self.n_p = len(self.p_grid) - 1
+        self.n_t = len(self.t_grid) - 1
+        # Plain Python copies for the scalar path; indexing NumPy arrays one
+        # element at a time is slower than the interpolation itself.
+        self._cells = [
+            [[tuple(c) if self.valid[phase, i, j] else None for j, c in enumerate(row)]
+             for i, row in enumerate(self.coeffs[phase])]
+            for phase in range(2)
+        ]
+
+    def _load_tables(self, key):
+        """Returns the tables for 'key' from the cache directory, building them if missing."""
+        name = "steam-table-{:08x}.npz".format(zlib.crc32(repr((_TABLE_VERSION,) + key).encode()))
+        path = os.path.join(default_cache_dir(), name)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return data["p_grid"], data["t_grid"], data["coeffs"], data["valid"]
+        except (OSError, ValueError, KeyError):
+            pass
+        tables = self._build_tables()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, **dict(zip(("p_grid", "t_grid", "coeffs", "valid"), tables)))
+            os.replace(tmp, path)
+        except OSError:
+            pass  # read-only cache: build again next run
+        return tables
+
+    def _build_tables(self):
+        p_grid = np.arange(self.p_range[0], self.p_range[1] + self.p_range[2] / 2, self.p_range[2])
+        t_grid = np.arange(self.t_range[0], self.t_range[1] + self.t_range[2] / 2, self.t_range[2])
+        regions = (_iapws()._Region1, _iapws()._Region2)
+
+        coeffs = np.empty((2, len(p_grid) - 1, len(t_grid) - 1, 4, 4))
+        valid = np.zeros((2, len(p_grid) - 1, len(t_grid) - 1), dtype=bool)
+        with np.errstate(all="ignore"):
+            for phase, region in enumerate(regions):
+                h = np.array([[_region_h(region, T, P) for T in t_grid] for P in p_grid])
+                coeffs[phase] = _bicubic_coefficients(h)
+
+                p_mid = p_grid[:-1] + self.p_range[2] / 2
+                t_mid = t_grid[:-1] + self.t_range[2] / 2
+                exact = np.array([[_region_h(region, T, P) for T in t_mid] for P in p_mid])
+                approx = _evaluate(coeffs[phase], 0.5, 0.5)
+                valid[phase] = np.abs(approx - exact) <= self.max_error
+        return p_grid, t_grid, coeffs, valid
+
+    def _locate(self, P, T):
+        x = (P - self.p0) / self.dp
+        y = (T - self.t0) / self.dt
+        i = int(x)
+        j = int(y)
+        if x < 0 or y < 0 or i > self.n_p or j > self.n_t:
+            return None
+        # Points on the upper grid boundary belong to the last cell.
+        if i == self.n_p:
+            i -= 1
+        if j == self.n_t:
+            j -= 1
+        return i, j, x - i, y - j
+
+    def enthalpy(self, P, T):
+        loc = self._locate(P, T)
+        if loc is not None:
+            i, j, u, v = loc
+            phase = 0 if T <= _t_sat(P) else 1
+            c = self._cells[phase][i][j]
+            if c is not None:
+                # Horner evaluation of sum(c[a][b] * u**a * v**b)
+                r0 = ((c[3][3] * v + c[3][2]) * v + c[3][1]) * v + c[3][0]
+                r1 = ((c[2][3] * v + c[2][2]) * v + c[2][1]) * v + c[2][0]
+                r2 = ((c[1][3] * v + c[1][2]) * v + c[1][1]) * v + c[1][0]
+                r3 = ((c[0][3] * v + c[0][2]) * v + c[0][1]) * v + c[0][0]
+                return ((r0 * u + r1) * u + r2) * u + r3
+        self.fallback_count += 1
+        return self.exact.enthalpy(P, T)
+
+    def enthalpy_array(self, P, T):
+        P, T = np.broadcast_arrays(np.asarray(P, dtype=float), np.asarray(T, dtype=float))
+        x = (P - self.p0) / self.dp
+        y = (T - self.t0) / self.dt
+        inside = (x >= 0) & (y >= 0) & (x <= self.n_p) & (y <= self.n_t)
+        i = np.clip(np.floor(x), 0, self.n_p - 1).astype(np.intp)
+        j = np.clip(np.floor(y), 0, self.n_t - 1).astype(np.intp)
+        phase = np.where(T <= _t_sat_array(np.where(inside, P, self.p0)), 0, 1)
+        ok = inside & self.valid[phase, i, j]
+
+        c = self.coeffs[phase, i, j]
+        out = _evaluate(c, x - i, y - j)
+        miss = np.nonzero(~ok)
+        if miss[0].size:
+            self.fallback_count += miss[0].size
+            out[miss] = self.exact.enthalpy_array(P[miss], T[miss])
+        return out
+
+
+def _t_sat_array(P):
+    """Vectorized _t_sat."""
+    n = _N_SAT
+    beta = P ** 0.25
+    E = beta ** 2 + n[3] * beta + n[6]
+    F = n[1] * beta ** 2 + n[4] * beta + n[7]
+    G = n[2] * beta ** 2 + n[5] * beta + n[8]
+    D = 2 * G / (-F - np.sqrt(F ** 2 - 4 * E * G))
+    return (n[10] + D - np.sqrt((n[10] + D) ** 2 - 4 * (n[9] + n[10] * D))) / 2
+
+
+def _region_h(region, T, P):
+    # The iapws region equations raise NotImplementedError out of bound
+    try:
+        return region(T, P)["h"]
+    except (NotImplementedError, ValueError, ZeroDivisionError):
+        return np.nan
+
+
+def _bicubic_coefficients(h):
+    """Per-cell coefficient matrices for grid values h[P, T] (unit cell spacing)."""
+    fx = _derivative(h, axis=0)
+    fy = _derivative(h, axis=1)
+    fxy = _derivative(fx, axis=1)
+
+    def corners(f):
+        return f[:-1, :-1], f[:-1, 1:], f[1:, :-1], f[1:, 1:]
+
+    f00, f01, f10, f11 = corners(h)
+    x00, x01, x10, x11 = corners(fx)
+    y00, y01, y10, y11 = corners(fy)
+    xy00, xy01, xy10, xy11 = corners(fxy)
+    F = np.stack([
+        np.stack([f00, f01, y00, y01], axis=-1),
+        np.stack([f10, f11, y10, y11], axis=-1),
+        np.stack([x00, x01, xy00, xy01], axis=-1),
+        np.stack([x10, x11, xy10, xy11], axis=-1),
+    ], axis=-2)
+    return _HERMITE @ F @ _HERMITE.T
+
+
+def _derivative(f, axis):
+    """Finite-difference derivative in grid units, one-sided at the edges."""
+    return np.gradient(f, axis=axis, edge_order=2)
+
+
+def _evaluate(c, u, v):
+    """Evaluates coefficient matrices c[..., 4, 4] at local coordinates (u, v)."""
+    u = np.asarray(u, dtype=float)
+    v = np.asarray(v, dtype=float)
+    upow = np.stack([np.ones_like(u), u, u * u, u * u * u], axis=-1)
+    vpow = np.stack([np.ones_like(v), v, v * v, v * v * v], axis=-1)
+    upow, vpow = np.broadcast_arrays(upow, vpow)
+    return np.einsum("...i,...ij,...j->...", upow, c, vpow)
@@ -0,0 +1,203 @@
+# powerplantsim/simulation/trajectory.py
+#
+# Streaming storage for recorded trajectories (see SimulationEngine.run).
+# Writers append one chunk of rows at a time, so memory use does not grow
+# with the length of the run; readers return a time window without loading
+# the whole file.
+
+import os
+import struct
+import numpy as np
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+# Room reserved in the header for the final row count
+_NPY_SHAPE_DIGITS = 20
+
+
+def trajectory_dtype(fields):
+    """Row layout used by SimulationEngine.run: time plus one float64 per field."""
+    return np.dtype([("time", "f8")] + [(name, "f8") for name in fields])
+
+
+class NpyTrajectoryWriter:
+    """
+    Appends rows to a .npy file. The header is written up front with room
+    for the final row count and patched on close, so the result is a normal
+    .npy file that np.load(..., mmap_mode="r") can map.
+
+    With append=True an existing file written by this class is continued.
+    Its row count is taken from the file size rather than the header, so a
+    file left behind by a crashed run is recovered up to its last full row.
+
+    Args:
+        path (str): Output file
+        dtype: Structured row dtype, see trajectory_dtype()
+        append (bool): Continue an existing file instead of replacing it
+    """
+
+    def __init__(self, path, dtype, append=False):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.n_rows = 0
+        if append and os.path.exists(path):
+            self._file = open(path, "r+b")
+            header_size = len(self._header(0))
+            np.lib.format.read_magic(self._file)
+            file_dtype = np.lib.format.read_array_header_1_0(self._file)[2]
+            if file_dtype != self.dtype or self._file.tell() != header_size:
+                self._file.close()
+                raise ValueError(f"{path} was not written with this row layout")
+            self.n_rows = (os.path.getsize(path) - header_size) // self.dtype.itemsize
+            self._file.truncate(header_size + self.n_rows * self.dtype.itemsize)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(self._header(0))
+
+    def _header(self, n_rows):
+        header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (
+            np.lib.format.dtype_to_descr(self.dtype), n_rows)
+        # Fixed width regardless of n_rows, so it can be rewritten in place
+        width = len(header) + _NPY_SHAPE_DIGITS - len(str(n_rows))
+        total = len(_NPY_MAGIC) + 2 + width + 1
+        padding = -total % 64
+        header = header.ljust(width + padding) + "\n"
+        return _NPY_MAGIC + struct.pack("<H", len(header)) + header.encode("latin1")
+
+    def write(self, rows):
+        """Appends a structured array of rows."""
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        self._file.write(rows.tobytes())
+        self.n_rows += len(rows)
+
+    def flush(self):
+        self._file.flush()
+
+    def discard_after(self, time):
+        """
+        Drops the rows after 'time', e.g. those written after the checkpoint
+        a crashed run is resumed from.
+        """
+        self.flush()
+        if self.n_rows:
+            rows = self.rows()
+            keep = int(np.searchsorted(rows["time"], time, side="right"))
+            del rows  # release the mapping before truncating
+        else:
+            keep = 0
+        self.n_rows = keep
+        self._file.truncate(len(self._header(0)) + keep * self.dtype.itemsize)
+        self._file.seek(0, os.SEEK_END)
+
+    def rows(self):
+        """Memory-maps the rows written so far (after a flush)."""
+        if self.n_rows == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode="r",
+                         offset=len(self._header(0)), shape=(self.n_rows,))
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(self._header(self.n_rows))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetTrajectoryWriter:
+    """
+    Appends rows to a Parquet file, one row group per write. Needs pyarrow.
+
+    Args:
+        path (str): Output file
+        dtype: Structured row dtype, see trajectory_dtype()
+    """
+
+    def __init__(self, path, dtype):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet trajectories need pyarrow (pip install pyarrow)") from None
+        self._pa = pa
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.n_rows = 0
+        self.schema = pa.schema([(name, pa.float64()) for name in self.dtype.names])
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        """Appends a structured array of rows as one row group."""
+        columns = [self._pa.array(np.ascontiguousarray(rows[name])) for name in self.dtype.names]
+        self._writer.write_table(self._pa.Table.from_arrays(columns, schema=self.schema))
+        self.n_rows += len(rows)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_trajectory_writer(path, fields):
+    """Returns a writer for 'path', picked by extension (.npy or .parquet)."""
+    dtype = trajectory_dtype(fields)
+    if str(path).endswith(".parquet"):
+        return ParquetTrajectoryWriter(path, dtype)
+    return NpyTrajectoryWriter(path, dtype)
+
+
+def read_trajectory(path, t_start=None, t_end=None, fields=None):
+    """
+    Reads the rows with t_start <= time < t_end from a trajectory file.
+
+    Args:
+        path (str): .npy or .parquet trajectory
+        t_start (float): Window start in seconds, None for the beginning
+        t_end (float): Window end in seconds, None for the end
+        fields (list): Fields to return besides 'time', defaults to all
+
+    Returns:
+        numpy structured array
+    """
+    if str(path).endswith(".parquet"):
+        return _read_parquet(path, t_start, t_end, fields)
+
+    data = np.load(path, mmap_mode="r")
+    # Time is increasing, so the window is found by binary search and only
+    # the pages inside it are read.
+    time = data["time"]
+    lo = 0 if t_start is None else int(np.searchsorted(time, t_start, side="left"))
+    hi = len(time) if t_end is None else int(np.searchsorted(time, t_end, side="left"))
+    names = ["time"] + list(fields if fields is not None else data.dtype.names[1:])
+    window = np.empty(max(hi - lo, 0), dtype=trajectory_dtype(names[1:]))
+    for name in names:
+        window[name] = data[name][lo:hi]
+    return window
+
+
+def _read_parquet(path, t_start, t_end, fields):
+    import pyarrow.parquet as pq
+
+    filters = []
+    if t_start is not None:
+        filters.append(("time", ">=", t_start))
+    if t_end is not None:
+        filters.append(("time", "<", t_end))
+    columns = None if fields is None else ["time"] + list(fields)
+    # Row groups whose time statistics fall outside the window are skipped
+    table = pq.read_table(path, columns=columns, filters=filters or None)
+    names = table.column_names
+    window = np.empty(table.num_rows, dtype=trajectory_dtype(names[1:]))
+    for name in names:
+        window[name] = table.column(name).to_numpy()
+    return window
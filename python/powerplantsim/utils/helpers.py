@@ -0,0 +1,16 @@
+# powerplantsim/utils/helpers.py
+
+import os
+
+
+def default_cache_dir():
+    """
+    Directory for compiled inputs and property tables:
+    $POWERPLANTSIM_CACHE, else $XDG_CACHE_HOME/powerplantsim or
+    ~/.cache/powerplantsim.
+    """
+    path = os.environ.get("POWERPLANTSIM_CACHE")
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "powerplantsim")
@@ -4,11 +4,15 @@ setup(
     name="powerplantsim",
     version="0.1.0",
     packages=find_packages(),
+    # Headless use (engine, batch runs, sweeps) needs only these; install
+    # "powerplantsim[gui]" for the desktop application.
     install_requires=[
         "iapws",
-        "PyQt5",
-        "pyqtgraph",
-        "opencv-python-headless",
+        "numpy",
     ],
+    extras_require={
+        "gui": ["PyQt5", "pyqtgraph", "opencv-python-headless"],
+        "parquet": ["pyarrow"],
+    },
     python_requires=">=3.7",
-) 
\ No newline at end of file
+)
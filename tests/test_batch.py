@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from powerplantsim.simulation.batch import BatchSimulationEngine
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+
+class TestBatchSimulationEngine(unittest.TestCase):
+    def test_matches_scalar_engine(self):
+        rng = np.random.default_rng(2)
+        n = 20
+        batch = BatchSimulationEngine(n)
+        batch.state["wellhead_pressure"][:] = rng.uniform(5, 20, n)
+        batch.state["wellhead_temp"][:] = rng.uniform(150, 200, n)
+        batch.state["wellhead_flow"][:] = rng.uniform(50, 150, n)
+
+        engines = []
+        for k in range(n):
+            engine = SimulationEngine()
+            engine.state.update({
+                name: batch.state[name][k]
+                for name in ("wellhead_pressure", "wellhead_temp", "wellhead_flow")
+            })
+            engines.append(engine)
+
+        for _ in range(3):
+            batch.step(0.1)
+            for engine in engines:
+                engine.step_simulation(0.1)
+
+        for k, engine in enumerate(engines):
+            np.testing.assert_allclose(
+                list(batch.instance_state(k).values()), list(engine.state.values()), rtol=1e-9
+            )
+
+    def test_tabulated_backend(self):
+        batch = BatchSimulationEngine(1000, steam_properties=TabulatedSteamProperties())
+        batch.step(0.1)
+        engine = SimulationEngine()
+        engine.step_simulation(0.1)
+        np.testing.assert_allclose(batch.state["turbine_out_power"], engine.state["turbine_out_power"], atol=1e-2)
+
+
+if __name__ == "__main__":
+    unittest.main()
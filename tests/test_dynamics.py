@@ -0,0 +1,66 @@
+import math
+import unittest
+import numpy as np
+from powerplantsim.simulation.dynamics import DormandPrince45, FixedStepRK4
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+
+class TestDormandPrince45(unittest.TestCase):
+    def test_decay_matches_exact_solution(self):
+        integrator = DormandPrince45(rtol=1e-8, atol=1e-10)
+        y = integrator.integrate(lambda t, y: -y, 0.0, [1.0], 5.0)
+        self.assertAlmostEqual(y[0], math.exp(-5.0), places=7)
+
+    def test_steps_grow_on_quiet_solution(self):
+        # Slow decay: the span must be covered by a handful of long steps
+        integrator = DormandPrince45(rtol=1e-6, atol=1e-9)
+        integrator.integrate(lambda t, y: -0.01 * y, 0.0, [1.0], 2000.0)
+        self.assertLess(integrator.steps, 100)
+        self.assertGreater(integrator.h, 10.0)
+
+    def test_non_finite_rates_raise(self):
+        with self.assertRaises(FloatingPointError):
+            DormandPrince45().integrate(lambda t, y: y * np.nan, 0.0, [1.0], 1.0)
+        # Blows up at t = 1: the step shrinks until it cannot advance t
+        with self.assertRaises(FloatingPointError):
+            DormandPrince45().integrate(lambda t, y: 1.0 / (1.0 - t) ** 2, 0.0, [0.0], 2.0)
+
+
+class TestPlantDynamics(unittest.TestCase):
+    def make_engine(self, integrator=None):
+        engine = SimulationEngine(steam_properties=TabulatedSteamProperties(),
+                                  dynamics=True, integrator=integrator)
+        engine.solve_steady_state()
+        engine.state["generator_load"] = engine.state["generator_power"]
+        return engine
+
+    def test_nan_input_raises(self):
+        engine = self.make_engine()
+        engine.state["wellhead_flow"] = math.nan
+        with self.assertRaises(FloatingPointError):
+            engine.step_simulation(0.1)
+
+    def test_equilibrium_is_steady(self):
+        engine = self.make_engine()
+        before = engine.state.copy()
+        engine.step_simulation(3600.0)
+        for name in ("rotor_speed", "condenser_pressure", "hotwell_level", "basin_temp"):
+            self.assertAlmostEqual(engine.state[name], before[name], delta=1e-6 * before[name])
+        self.assertEqual(engine.simulation_time, 3600.0)
+
+    def test_adaptive_matches_fixed_step(self):
+        adaptive = self.make_engine()
+        fixed = self.make_engine(FixedStepRK4(0.5))
+        for engine in (adaptive, fixed):
+            engine.state["wellhead_flow"] = 100.0
+            engine.step_simulation(600.0)
+        self.assertGreater(adaptive.state["rotor_speed"], 3000.0)
+        self.assertGreater(adaptive.state["condenser_pressure"], 0.1)
+        for name in ("rotor_speed", "condenser_pressure", "hotwell_level", "basin_temp"):
+            np.testing.assert_allclose(adaptive.state[name], fixed.state[name], rtol=1e-5)
+        self.assertLess(adaptive.dynamics.integrator.evaluations, fixed.dynamics.integrator.evaluations / 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
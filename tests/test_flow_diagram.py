@@ -0,0 +1,47 @@
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+try:
+    from PyQt5.QtWidgets import QApplication
+    from powerplantsim.gui.flow_diagram import FlowDiagramWidget
+except ImportError:
+    QApplication = None
+from powerplantsim.simulation.engine import SimulationEngine
+
+
+@unittest.skipUnless(QApplication, "PyQt5 not installed")
+class TestFlowDiagramWidget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_unchanged_values_touch_nothing(self):
+        widget = FlowDiagramWidget()
+        engine = SimulationEngine()
+        engine.step_simulation(0.1)
+        widget.update_values(engine.state)
+        updates = widget.item_updates
+        self.assertGreater(updates, 0)
+
+        widget.update_values(engine.state)
+        self.assertEqual(widget.item_updates, updates)
+
+        engine.state["wellhead_flow"] = 100.0
+        engine.step_simulation(0.1)
+        widget.update_values(engine.state)
+        self.assertGreater(widget.item_updates, updates)
+        self.assertTrue(widget.flash_timer.isActive())
+
+    def test_repaint_rate_drops_to_zero(self):
+        widget = FlowDiagramWidget()
+        widget.repaint_count += 30  # as if painted 30 times
+        widget.update_repaint_rate()
+        self.assertGreater(widget.repaints_per_second, 0.0)
+        widget.update_repaint_rate()
+        self.assertEqual(widget.repaints_per_second, 0.0)
+        self.assertTrue(widget.repaint_rate_timer.isActive())
+
+
+if __name__ == "__main__":
+    unittest.main()
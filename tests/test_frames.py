@@ -0,0 +1,57 @@
+import unittest
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.frames import DELTA, KEY, FrameDecoder, FrameEncoder
+
+
+class TestFrames(unittest.TestCase):
+    def test_round_trip(self):
+        engine = SimulationEngine()
+        encoder = FrameEncoder()
+        decoder = FrameDecoder()
+        encoder.encode(0.0, engine.state)
+        decoder.decode(encoder.key_frame())
+
+        engine.step_simulation(0.1)
+        delta = encoder.encode(0.1, engine.state)
+        self.assertEqual(delta[0], DELTA)
+        decoder.decode(delta)
+        self.assertEqual(decoder.values["turbine_out_power"], engine.state.turbine_out_power)
+
+        # Unchanged fields, NaN included, are left out
+        steady = encoder.encode(0.2, engine.state)
+        self.assertEqual(decoder.decode(steady), {})
+        self.assertEqual(decoder.time, 0.2)
+
+        encoder.encode(0.3, engine.state)
+        with self.assertRaises(ValueError):
+            decoder.decode(encoder.encode(0.4, engine.state))  # missed a frame
+        self.assertEqual(encoder.key_frame()[0], KEY)
+        decoder.decode(encoder.key_frame())
+
+    def test_deadbands(self):
+        engine = SimulationEngine()
+        feed = engine.state_feed(deadbands={"wellhead_flow": 1.0}, fields=["wellhead_flow", "wellhead_temp"])
+        decoder = FrameDecoder(feed.fields)
+        feed.poll()
+        decoder.decode(feed.key_frame())
+
+        engine.state["wellhead_flow"] = 85.6
+        self.assertEqual(decoder.decode(feed.poll()), {})
+        engine.state["wellhead_flow"] = 86.2  # 1.2 from the value last sent
+        engine.state["wellhead_temp"] = 178.01
+        self.assertEqual(decoder.decode(feed.poll()), {"wellhead_flow": 86.2, "wellhead_temp": 178.01})
+
+        # Key frames carry the values last sent, so late joiners agree
+        engine.state["wellhead_flow"] = 86.9
+        decoder.decode(feed.poll())
+        late = FrameDecoder(feed.fields)
+        late.decode(feed.key_frame())
+        self.assertEqual(late.values, decoder.values)
+        self.assertEqual(late.values["wellhead_flow"], 86.2)
+
+        with self.assertRaises(KeyError):
+            FrameEncoder(deadbands={"no_such_field": 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
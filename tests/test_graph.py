@@ -0,0 +1,79 @@
+import unittest
+from types import SimpleNamespace
+import numpy as np
+from powerplantsim.simulation.components import Component
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.graph import PlantGraph, MASS_FLOW, PRESSURE, plant_graph
+
+
+class TestPlantGraph(unittest.TestCase):
+    def test_plant_order_and_tears(self):
+        schedule = plant_graph().compile(SimulationEngine())
+        self.assertEqual(schedule.order, ("separator", "moisture", "turbine", "condenser"))
+        self.assertEqual(schedule.tears, ("condenser_pressure",))
+        # Without the condenser there is no recycle loop left
+        self.assertEqual(plant_graph(dynamics=True).compile(None).tears, ())
+
+    def test_topological_order_ignores_declaration_order(self):
+        graph = PlantGraph()
+        graph.add_node("b", "b", "f", inputs=[("x", "mid", MASS_FLOW)], outputs=[("y", "out", MASS_FLOW)])
+        graph.add_node("a", "a", "f", inputs=[("x", "src", MASS_FLOW)], outputs=[("y", "mid", MASS_FLOW)])
+        schedule = graph.compile(None)
+        self.assertEqual(schedule.order, ("a", "b"))
+        self.assertEqual(schedule.tears, ())
+
+    def test_stream_kind_mismatch(self):
+        graph = PlantGraph()
+        graph.add_node("a", "a", "f", inputs=[], outputs=[("y", "mid", MASS_FLOW)])
+        graph.add_node("b", "b", "f", inputs=[("x", "mid", PRESSURE)], outputs=[])
+        with self.assertRaises(TypeError):
+            graph.compile(None)
+
+    def test_unchanged_nodes_are_skipped(self):
+        engine = SimulationEngine()
+        for _ in range(3):
+            engine.step_simulation(0.1)
+        stats = engine.schedule.stats()
+        self.assertEqual(stats["separator"], {"evaluated": 1, "skipped": 2})
+        self.assertEqual(stats["moisture"], {"evaluated": 1, "skipped": 2})
+        self.assertEqual(stats["turbine"]["evaluated"], 2)  # condenser pressure settles after step 1
+        self.assertEqual(stats["condenser"]["skipped"], 0)  # takes dt, always evaluated
+
+        power = engine.state["turbine_out_power"]
+        engine.turbine.efficiency = 0.25  # parameter change invalidates the node
+        engine.step_simulation(0.1)
+        self.assertGreater(engine.state["turbine_out_power"], power)
+        self.assertEqual(engine.schedule.stats()["separator"]["evaluated"], 1)
+
+        power = engine.state["turbine_out_power"]
+        engine.moistureseparator.flow_index = 0.9  # less steam reaches the turbine
+        engine.step_simulation(0.1)
+        self.assertLess(engine.state["turbine_out_power"], power)
+        self.assertEqual(engine.state["turbine_inlet_flow"], engine.state["steam_flow"] * 0.9)
+
+    def test_array_parameters(self):
+        class Gain(Component):
+            def __init__(self):
+                self.gain = 2.0
+                self.table = np.arange(3.0)
+
+            def f(self, x):
+                return {"y": self.gain * x}
+
+        graph = PlantGraph()
+        graph.add_node("gain", "gain", "f", inputs=[("x", "src", MASS_FLOW)], outputs=[("y", "out", MASS_FLOW)])
+        owner = SimpleNamespace(gain=Gain())
+        schedule = graph.compile(owner)
+        state = SimpleNamespace(src=1.0, out=0.0)
+        schedule.run(state, 1.0)
+        owner.gain.table = np.arange(3.0) + 1.0  # a new array is a parameter change
+        schedule.run(state, 1.0)
+        schedule.run(state, 1.0)
+        self.assertEqual(schedule.stats()["gain"], {"evaluated": 2, "skipped": 1})
+        owner.gain = Gain()  # so is a new component
+        schedule.run(state, 1.0)
+        self.assertEqual(schedule.stats()["gain"]["evaluated"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
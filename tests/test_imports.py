@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import unittest
+import powerplantsim
+
+HEADLESS_MODULES = (
+    "powerplantsim.main",
+    "powerplantsim.simulation.engine",
+    "powerplantsim.simulation.batch",
+    "powerplantsim.simulation.multiunit",
+    "powerplantsim.simulation.sweep",
+    "powerplantsim.simulation.scenario",
+    "powerplantsim.simulation.montecarlo",
+    "powerplantsim.simulation.sensitivity",
+    "powerplantsim.simulation.surrogate",
+    "powerplantsim.server.simulation_server",
+)
+# Must not be loaded by importing the headless modules
+HEAVY_MODULES = ("PyQt5", "pyqtgraph", "cv2", "iapws", "scipy")
+
+
+class TestHeadlessImports(unittest.TestCase):
+    def test_no_gui_or_property_libraries(self):
+        code = "; ".join(
+            [f"import {name}" for name in HEADLESS_MODULES]
+            + [f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"]
+        )
+        env = dict(os.environ)
+        package_dir = os.path.dirname(os.path.dirname(os.path.abspath(powerplantsim.__file__)))
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_dir, env.get("PYTHONPATH")]))
+        output = subprocess.run([sys.executable, "-c", "import sys; " + code], env=env,
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
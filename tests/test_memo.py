@@ -0,0 +1,67 @@
+import unittest
+from powerplantsim.simulation.components import SteamSeparator, SteamTurbine
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.memo import MemoizedComponent
+
+
+class TestMemoization(unittest.TestCase):
+    def test_engine_results_unchanged(self):
+        plain = SimulationEngine()
+        memo = SimulationEngine()
+        memo.enable_memoization()
+        for flow in (85.0, 85.0, 90.0, 90.0, 85.0):
+            plain.state["wellhead_flow"] = memo.state["wellhead_flow"] = flow
+            plain.step_simulation(0.1)
+            memo.step_simulation(0.1)
+            self.assertEqual(plain.state.as_dict()["turbine_out_power"], memo.state["turbine_out_power"])
+
+    def test_repeated_inputs_hit(self):
+        # Called directly, independent of which nodes the engine's schedule skips
+        separator = MemoizedComponent(SteamSeparator(), ("process",))
+        for flow in (85.0, 85.0, 90.0, 90.0, 85.0):
+            self.assertEqual(separator.process(10.5, 178.0, flow), SteamSeparator().process(10.5, 178.0, flow))
+        info = separator.cache_info()
+        self.assertEqual((info["hits"], info["misses"]), (3, 2))
+
+    def test_keyword_names_in_key(self):
+        turbine = MemoizedComponent(SteamTurbine(), ("compute_mechanical_power_output",))
+        args = dict(turbine_inlet_pressure=8.5, turbine_inlet_temp=177.11,
+                    turbine_inlet_steam_flow=76.5, turbine_outlet_pressure=0.1)
+        first = turbine.compute_mechanical_power_output(**args)
+        # Same values in the same order, bound to other names
+        second = turbine.compute_mechanical_power_output(
+            turbine_outlet_pressure=8.5, turbine_inlet_temp=177.11,
+            turbine_inlet_steam_flow=76.5, turbine_inlet_pressure=0.1)
+        self.assertNotEqual(first, second)
+        self.assertEqual(turbine.cache_info()["hits"], 0)
+        self.assertEqual(turbine.compute_mechanical_power_output(**dict(reversed(list(args.items())))), first)
+        self.assertEqual(turbine.cache_info()["hits"], 1)
+
+    def test_quantized_inputs_and_lru(self):
+        turbine = MemoizedComponent(SteamTurbine(), ("compute_mechanical_power_output",),
+                                    maxsize=2, tolerance=0.01)
+        args = dict(turbine_inlet_pressure=8.5, turbine_inlet_temp=177.11,
+                    turbine_inlet_steam_flow=76.5, turbine_outlet_pressure=0.1)
+        first = turbine.compute_mechanical_power_output(**args)
+        args["turbine_inlet_steam_flow"] = 76.501
+        self.assertEqual(turbine.compute_mechanical_power_output(**args), first)
+        for flow in (70.0, 60.0):
+            args["turbine_inlet_steam_flow"] = flow
+            turbine.compute_mechanical_power_output(**args)
+        info = turbine.cache_info()
+        self.assertEqual((info["hits"], info["misses"], info["size"]), (1, 3, 2))
+
+    def test_parameter_change_invalidates(self):
+        engine = SimulationEngine()
+        engine.enable_memoization()
+        engine.step_simulation(0.1)
+        before = engine.state["turbine_out_power"]
+        engine.turbine.efficiency = 0.3
+        self.assertEqual(engine.turbine.component.efficiency, 0.3)
+        engine.step_simulation(0.1)
+        self.assertGreater(engine.state["turbine_out_power"], before)
+        self.assertEqual(engine.memo_stats()["turbine"]["invalidations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
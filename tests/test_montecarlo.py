@@ -0,0 +1,115 @@
+import unittest
+from unittest import mock
+import numpy as np
+from powerplantsim.simulation.batch import BatchSimulationEngine
+from powerplantsim.simulation import montecarlo
+from powerplantsim.simulation.montecarlo import (
+    InputModel, LogNormal, Normal, TDigest, Uniform, Welford, monte_carlo, solve_batch,
+)
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+
+class TestEstimators(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(1).lognormal(0.0, 0.75, 50000)
+
+    def test_welford_matches_numpy(self):
+        whole, left, right = Welford(), Welford(), Welford()
+        for chunk in np.array_split(self.values, 37):
+            whole.update(chunk)
+        left.update(self.values[:123])
+        right.update(self.values[123:])
+        left.merge(right)
+        for moments in (whole, left):
+            self.assertEqual(moments.n, self.values.size)
+            self.assertAlmostEqual(moments.mean, self.values.mean(), places=10)
+            self.assertAlmostEqual(moments.variance, self.values.var(ddof=1), places=10)
+
+    def test_tdigest_quantiles(self):
+        digests = [TDigest() for _ in range(4)]
+        for k, chunk in enumerate(np.array_split(self.values, 200)):
+            digests[k % 4].update(chunk)
+        for other in digests[1:]:
+            digests[0].merge(other)
+        digest = digests[0]
+        self.assertEqual(digest.count, self.values.size)
+        self.assertLess(len(digest.means), 200)
+        q = [0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999]
+        # Compare in rank space: the estimate's rank must be close to q
+        ranks = np.searchsorted(np.sort(self.values), digest.quantile(q)) / self.values.size
+        np.testing.assert_allclose(ranks, q, atol=0.002)
+        self.assertEqual(digest.quantile(0.0), self.values.min())
+        self.assertEqual(digest.quantile(1.0), self.values.max())
+
+
+class TestInputModel(unittest.TestCase):
+    def test_marginals_and_correlation(self):
+        model = InputModel(
+            {"wellhead_pressure": Normal(10.5, 0.5), "wellhead_flow": LogNormal(85.0, 10.0),
+             "wellhead_temp": Uniform(175.0, 181.0)},
+            [[1.0, 0.8, 0.0], [0.8, 1.0, 0.0], [0.0, 0.0, 1.0]])
+        draws = model.sample(np.random.default_rng(0), 100000)
+        self.assertAlmostEqual(draws["wellhead_pressure"].mean(), 10.5, delta=0.01)
+        self.assertAlmostEqual(draws["wellhead_flow"].mean(), 85.0, delta=0.2)
+        self.assertAlmostEqual(draws["wellhead_flow"].std(), 10.0, delta=0.2)
+        self.assertGreaterEqual(draws["wellhead_temp"].min(), 175.0)
+        self.assertLessEqual(draws["wellhead_temp"].max(), 181.0)
+        rho = np.corrcoef(draws["wellhead_pressure"], draws["wellhead_flow"])[0, 1]
+        self.assertAlmostEqual(rho, 0.8, delta=0.02)
+
+    def test_rejects_bad_correlation(self):
+        with self.assertRaises(ValueError):
+            InputModel({"wellhead_pressure": Normal(10.5, 0.5), "wellhead_flow": Normal(85.0, 5.0)},
+                       [[1.0, 1.5], [1.5, 1.0]])
+        with self.assertRaises(KeyError):
+            InputModel({"reservoir_depth": Normal(1.0, 1.0)})
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def setUp(self):
+        self.model = InputModel({"wellhead_pressure": Normal(10.5, 0.5),
+                                 "wellhead_flow": LogNormal(85.0, 10.0)})
+
+    def test_independent_of_workers(self):
+        one = monte_carlo(self.model, 2500, seed=7, chunk_size=400, workers=1)
+        two = monte_carlo(self.model, 2500, seed=7, chunk_size=400, workers=2)
+        self.assertEqual(one.summary(), two.summary())
+        other = monte_carlo(self.model, 2500, seed=8, chunk_size=400, workers=1)
+        self.assertNotEqual(one.summary(), other.summary())
+
+    def test_matches_stored_realizations(self):
+        result = monte_carlo(self.model, 3000, seed=3, chunk_size=1000, workers=1)
+
+        # The same draws, kept in full
+        streams = np.random.SeedSequence(3).spawn(3)
+        power = []
+        for stream in streams:
+            engine = BatchSimulationEngine(1000, steam_properties=TabulatedSteamProperties())
+            for name, values in self.model.sample(np.random.default_rng(stream), 1000).items():
+                engine.state[name][:] = values
+            self.assertTrue(solve_batch(engine).all())
+            power.append(engine.state["turbine_out_power"])
+        power = np.concatenate(power)
+
+        summary = result.summary((0.1, 0.5, 0.9))["turbine_out_power"]
+        self.assertEqual(summary["n"], 3000)
+        self.assertAlmostEqual(summary["mean"], power.mean(), places=9)
+        self.assertAlmostEqual(summary["std"], power.std(ddof=1), places=9)
+        for q in (0.1, 0.5, 0.9):
+            rank = np.searchsorted(np.sort(power), summary[f"p{100 * q:g}"]) / power.size
+            self.assertAlmostEqual(rank, q, delta=0.01)
+
+    def test_unsettled_realizations_are_invalid(self):
+        engine = BatchSimulationEngine(4, steam_properties=TabulatedSteamProperties())
+        self.assertFalse(solve_batch(engine, max_iter=1).any())
+        self.assertTrue(solve_batch(engine).all())
+
+        settled = np.array([True, False, True, True])
+        with mock.patch.object(montecarlo, "solve_batch", return_value=settled):
+            stats = montecarlo._run_chunk(self.model, 4, 1, ("turbine_out_power",), None, 1.0, 100)
+        summary = stats["turbine_out_power"].summary((0.5,))
+        self.assertEqual((summary["n"], summary["invalid"]), (3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.multiunit import MultiUnitEngine
+
+
+class TestMultiUnitEngine(unittest.TestCase):
+    def test_single_unit_matches_engine(self):
+        multi = MultiUnitEngine(1)
+        engine = SimulationEngine()
+        for _ in range(3):
+            multi.step_simulation(0.1)
+            engine.step_simulation(0.1)
+        for name in ("turbine_out_power", "condenser_pressure", "turbine_inlet_flow"):
+            np.testing.assert_allclose(multi.state[name], [engine.state[name]], rtol=1e-12)
+
+    def test_headers_conserve_mass(self):
+        rng = np.random.default_rng(4)
+        multi = MultiUnitEngine(100, n_separators=10, n_turbines=8, n_headers=2)
+        multi.state["wellhead_flow"][:] = rng.uniform(50, 150, 100)
+        multi.state["wellhead_pressure"][:] = rng.uniform(8, 12, 100)
+        multi.splitter.share[3] = 0.0  # tripped train
+        multi.step_simulation(1.0)
+
+        state = multi.state
+        self.assertAlmostEqual(state["separator_inlet_flow"].sum(), state["wellhead_flow"].sum())
+        self.assertAlmostEqual(state["moisture_inlet_flow"].sum(), 0.9 * state["wellhead_flow"].sum())
+        self.assertAlmostEqual(state["turbine_inlet_flow"].sum(), 0.99 * state["moisture_inlet_flow"].sum())
+        self.assertEqual(state["turbine_out_power"][3], 0.0)
+        # Turbines on the same header share its flow equally
+        header0 = multi.splitter.outlet_header == 0
+        self.assertTrue(np.allclose(state["turbine_inlet_flow"][header0], state["turbine_inlet_flow"][header0][0]))
+        self.assertGreater(multi.totals()["turbine_out_power"], 0.0)
+
+    def test_tripped_header_is_vented(self):
+        multi = MultiUnitEngine(4, n_separators=2, n_turbines=3, n_headers=2, turbine_header=[0, 0, 1])
+        multi.splitter.share[2] = 0.0  # the only turbine on header 1
+        multi.step_simulation(1.0)
+
+        state = multi.state
+        self.assertEqual(state["header_vented_flow"][0], 0.0)
+        self.assertEqual(state["header_vented_flow"][1], state["header_flow"][1])
+        self.assertAlmostEqual(state["moisture_inlet_flow"].sum() + state["header_vented_flow"].sum(),
+                               state["header_flow"].sum())
+        totals = multi.totals()
+        self.assertAlmostEqual(totals["vented_flow"], state["header_flow"][1])
+
+    def test_bad_connections(self):
+        with self.assertRaises(ValueError):
+            MultiUnitEngine(4, n_separators=2, well_separator=[0, 1, 2, 0])
+        # Round-robin leaves header 2 without a turbine
+        with self.assertRaises(ValueError):
+            MultiUnitEngine(4, n_turbines=2, n_headers=3)
+        with self.assertRaises(ValueError):
+            MultiUnitEngine(4, n_turbines=2, n_headers=2, turbine_header=[1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
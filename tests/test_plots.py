@@ -0,0 +1,43 @@
+import os
+import unittest
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+try:
+    from PyQt5.QtWidgets import QApplication
+    from powerplantsim.gui.plots import MinMaxRing, PlotWidget
+except ImportError:
+    QApplication = None
+
+
+@unittest.skipUnless(QApplication, "PyQt5/pyqtgraph not installed")
+class TestPlotWidget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_ring_keeps_order_after_wrap(self):
+        ring = MinMaxRing(capacity=4, bucket_size=2, n_series=1)
+        for i in range(11):
+            ring.append(float(i), np.array([i]))
+        time, vmin, vmax = ring.latest(3)
+        np.testing.assert_array_equal(time, [6.0, 8.0, 10.0])
+        np.testing.assert_array_equal(vmin[0], [6, 8, 10])
+        np.testing.assert_array_equal(vmax[0], [7, 9, 10])
+
+    def test_uses_simulation_time_and_bounds_points(self):
+        widget = PlotWidget()
+        widget.resize(400, 300)
+        widget.update_time_window('1 hour')
+        for i in range(5000):
+            widget.update_plot(float(i % 10), simulation_time=i * 1.0)
+        x, y = widget.plot_lines['Power Output (MW)'].getData()
+        # Min/max buckets: two points per bucket, at most about one per pixel
+        self.assertLess(len(x), 2 * 400 + 4)
+        self.assertGreater(x[-1], 4999 - 16)
+        self.assertLessEqual(x[-1] - x[2], 3600)
+        self.assertEqual(np.nanmax(y), 9.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
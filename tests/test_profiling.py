@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+import unittest
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.profiling import Profiler
+
+
+class TestProfiling(unittest.TestCase):
+    def test_engine_components_are_timed(self):
+        engine = SimulationEngine()
+        profiler = engine.enable_profiling()
+        for flow in (85.0, 90.0, 95.0):
+            engine.state["wellhead_flow"] = flow
+            engine.step_simulation(0.1)
+
+        stats = engine.profile_stats()
+        self.assertEqual(stats["engine.step_simulation"]["calls"], 3)
+        self.assertEqual(stats["steamseparator.process"]["calls"], 3)
+        self.assertEqual(stats["steam_properties.enthalpy"]["calls"], 3)
+        turbine = stats["turbine.compute_mechanical_power_output"]
+        self.assertLessEqual(turbine["p50"], turbine["p99"])
+        self.assertLessEqual(turbine["p99"], turbine["max"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiler.dump_chrome_trace(path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), sum(s["calls"] for s in stats.values()))
+        self.assertEqual(events[0]["ph"], "X")
+
+    def test_disable_restores_methods(self):
+        engine = SimulationEngine()
+        engine.enable_memoization()
+        memoized = engine.turbine.compute_mechanical_power_output
+        engine.enable_profiling()
+        engine.disable_profiling()
+        self.assertIs(engine.turbine.compute_mechanical_power_output, memoized)
+        self.assertNotIn("step_simulation", vars(engine))
+        self.assertNotIn("enthalpy", vars(engine.turbine.steam_properties))
+
+        calls = engine.profiler.stats()
+        engine.step_simulation(0.1)
+        self.assertEqual(engine.profiler.stats(), calls)
+
+    def test_span(self):
+        profiler = Profiler()
+        with profiler.span("block"):
+            pass
+        self.assertEqual(profiler.stats()["block"]["calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
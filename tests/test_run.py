@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from powerplantsim.simulation.engine import SimulationEngine
+
+
+class TestHeadlessRun(unittest.TestCase):
+    def test_matches_step_simulation(self):
+        stepped = SimulationEngine()
+        powers = []
+        for _ in range(7):
+            stepped.step_simulation(0.5)
+            powers.append(stepped.state["turbine_out_power"])
+
+        trajectory = SimulationEngine().run(7, dt=0.5, record=["turbine_out_power"], chunk_size=3)
+        self.assertEqual(trajectory.dtype.names, ("time", "turbine_out_power"))
+        np.testing.assert_allclose(trajectory["turbine_out_power"], powers)
+        np.testing.assert_allclose(trajectory["time"], np.arange(1, 8) * 0.5)
+
+    def test_decimate(self):
+        engine = SimulationEngine()
+        trajectory = engine.run(25, dt=0.1, decimate=10)
+        self.assertEqual(len(trajectory), 2)
+        np.testing.assert_allclose(trajectory["time"], [1.0, 2.0])
+        self.assertAlmostEqual(engine.simulation_time, 2.5)
+
+    def test_checkpoints_after_last_record(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = os.path.join(tmp, "run.ckpt")
+            SimulationEngine().run(25, dt=0.1, decimate=10, checkpoint=checkpoint, checkpoint_every=4)
+            # Step 24 comes after the last recorded step, 20
+            resumed = SimulationEngine()
+            resumed.load_checkpoint(checkpoint)
+            self.assertAlmostEqual(resumed.simulation_time, 2.4)
+
+    def test_unknown_field(self):
+        with self.assertRaises(KeyError):
+            SimulationEngine().run(1, record=["no_such_field"])
+
+    def test_invalid_arguments(self):
+        engine = SimulationEngine()
+        for kwargs in ({"n_steps": -1}, {"n_steps": 10, "decimate": 0},
+                       {"n_steps": 10, "chunk_size": 0}, {"n_steps": 10, "record": []}):
+            with self.assertRaises(ValueError):
+                engine.run(**kwargs)
+        self.assertEqual(engine.simulation_time, 0.0)
+        self.assertEqual(len(engine.run(0)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+import zipfile
+from xml.sax.saxutils import escape
+import numpy as np
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.scenario import InputSeries, Scenario, compile_workbook, load_scenario
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "parameters.xlsx")
+
+
+def write_xlsx(path, sheets):
+    """Writes a minimal workbook; 'sheets' maps sheet name -> rows of str/float/None."""
+    main = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    rel = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    with zipfile.ZipFile(path, "w") as archive:
+        entries, rels = [], []
+        for i, (name, rows) in enumerate(sheets.items(), start=1):
+            entries.append(f'<sheet name="{escape(name)}" sheetId="{i}" r:id="rId{i}"/>')
+            rels.append(f'<Relationship Id="rId{i}" Type="{rel}/worksheet" Target="worksheets/sheet{i}.xml"/>')
+            cells = []
+            for r, row in enumerate(rows, start=1):
+                cells.append(f'<row r="{r}">')
+                for c, value in enumerate(row):
+                    ref = f"{chr(ord('A') + c)}{r}"
+                    if isinstance(value, str):
+                        cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{escape(value)}</t></is></c>')
+                    elif value is not None:
+                        cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+                cells.append("</row>")
+            archive.writestr(f"xl/worksheets/sheet{i}.xml",
+                             f'<worksheet xmlns="{main}"><sheetData>{"".join(cells)}</sheetData></worksheet>')
+        archive.writestr("xl/workbook.xml",
+                         f'<workbook xmlns="{main}" xmlns:r="{rel}"><sheets>{"".join(entries)}</sheets></workbook>')
+        archive.writestr("xl/_rels/workbook.xml.rels",
+                         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                         f'{"".join(rels)}</Relationships>')
+
+
+class TestScenario(unittest.TestCase):
+    def test_repo_workbook(self):
+        scenario = compile_workbook(WORKBOOK)
+        self.assertEqual(scenario.values, {
+            "wellhead_pressure": 8.5, "separator_outlet_steam_temp": 177.0, "turbine_inlet_flow": 156.0})
+        # The separator temperature and turbine flow are what the plant
+        # produces from the wellhead inputs, not the inputs themselves
+        engine = SimulationEngine()
+        scenario.apply(engine)
+        engine.step_simulation(0.1)
+        self.assertEqual(engine.state.wellhead_pressure, 8.5)
+        self.assertAlmostEqual(engine.state.separator_outlet_steam_temp, 177.0, places=3)
+        self.assertAlmostEqual(engine.state.turbine_inlet_flow, 156.0, places=9)
+
+        # ... with the component parameters of the same workbook
+        Scenario({"turbine_inlet_flow": 156.0, "moistureseparator.flow_index": 0.95}).apply(engine)
+        engine.step_simulation(0.1)
+        self.assertAlmostEqual(engine.state.turbine_inlet_flow, 156.0, places=9)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "plant.xlsx")
+            write_xlsx(path, {
+                "Sheet1": [["Parameter", "Total", "Unit"],
+                           ["wh_pressure", 9.0, "bar"],
+                           ["turbine.efficiency", 0.25, None]],
+                "Timeseries": [["time", "wellhead_flow"], [0.0, 80.0], [10.0, 100.0]],
+            })
+            cache = os.path.join(tmp, "cache")
+            first = load_scenario(path, cache)
+            self.assertEqual(len(os.listdir(cache)), 1)
+            cached = load_scenario(path, cache)
+            self.assertEqual(cached.values, first.values)
+            np.testing.assert_equal(cached.inputs.values, [[80.0], [100.0]])
+
+            # A changed workbook is compiled again
+            write_xlsx(path, {"Sheet1": [["Parameter", "Total"], ["wh_pressure", 7.0]]})
+            self.assertEqual(load_scenario(path, cache).values, {"wellhead_pressure": 7.0})
+            self.assertEqual(len(os.listdir(cache)), 2)
+
+    def test_validation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bad.xlsx")
+            write_xlsx(path, {
+                "Sheet1": [["Parameter", "Total", "Unit"],
+                           ["wh_pressure", 9.0, "psi"],
+                           ["no_such_thing", 1.0, None],
+                           ["wellhead_flow", "lots", None],
+                           ["turbine.eficiency", 0.2, None],
+                           ["turbine.steam_properties", 1.0, None],
+                           ["wellhead_temp", 180.0, None],
+                           ["steam_separator_temperature", 177.0, None]],
+                "Timeseries": [["time", "wellhead_flow"], [5.0, 80.0], [1.0, 90.0]],
+            })
+            with self.assertRaises(ValueError) as raised:
+                compile_workbook(path)
+            message = str(raised.exception)
+            for problem in ("psi", "no_such_thing", "not a number", "strictly increasing",
+                            "row 5: 'turbine.eficiency'", "row 6: 'turbine.steam_properties'",
+                            "row 8: 'steam_separator_temperature' sets wellhead_temp a second time"):
+                self.assertIn(problem, message)
+
+    def test_unreadable_workbooks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bad.xlsx")
+            with open(path, "wb") as f:
+                f.write(b"not a zip file")
+            with self.assertRaises(ValueError):
+                compile_workbook(path)
+            with zipfile.ZipFile(path, "w") as archive:
+                archive.writestr("hello.txt", "not a workbook")
+            with self.assertRaises(ValueError):
+                compile_workbook(path)
+            write_xlsx(path, {"Timeseries": [["time", "wellhead_flow"], [0.0, 80.0]]})
+            with self.assertRaisesRegex(ValueError, "no parameter sheet"):
+                compile_workbook(path)
+
+    def test_run_with_inputs(self):
+        inputs = InputSeries([0.0, 1.0], ["wellhead_flow"], [[80.0], [90.0]])
+        engine = SimulationEngine()
+        result = engine.run(20, dt=0.1, record=["wellhead_flow"], chunk_size=4, inputs=inputs)
+        np.testing.assert_allclose(result["wellhead_flow"][:10], np.linspace(81.0, 90.0, 10))
+        np.testing.assert_allclose(result["wellhead_flow"][10:], 90.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import math
+import unittest
+import numpy as np
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.sensitivity import (
+    DEFAULT_PARAMETERS, Parameter, evaluate, morris, morris_design, morris_indices, saltelli_design,
+    sobol, sobol_indices,
+)
+
+# Any three valid names will do for the analytic test functions
+PI_BOX = (Parameter("wellhead_pressure", -math.pi, math.pi),
+          Parameter("wellhead_temp", -math.pi, math.pi),
+          Parameter("wellhead_flow", -math.pi, math.pi))
+
+
+def ishigami(X, a=7.0, b=0.1):
+    return np.sin(X[:, 0]) + a * np.sin(X[:, 1]) ** 2 + b * X[:, 2] ** 4 * np.sin(X[:, 0])
+
+
+class TestEstimators(unittest.TestCase):
+    def test_sobol_ishigami(self):
+        X = saltelli_design(PI_BOX, 20000, seed=1)
+        indices = sobol_indices(ishigami(X), 3, n_bootstrap=100)
+        # Analytic values for a = 7, b = 0.1
+        np.testing.assert_allclose(indices["S1"], [0.3139, 0.4424, 0.0], atol=0.03)
+        np.testing.assert_allclose(indices["ST"], [0.5576, 0.4424, 0.2437], atol=0.03)
+        self.assertTrue(np.all(indices["S1_conf"] > 0))
+        self.assertTrue(np.all(indices["ST_conf"] < 0.05))
+
+    def test_morris_linear(self):
+        X = morris_design(PI_BOX, 20, seed=2)
+        self.assertEqual(X.shape, (20 * 4, 3))
+        y = X @ np.array([1.0, -2.0, 0.0])
+        indices = morris_indices(PI_BOX, X, y, n_bootstrap=50)
+        # Effects per full range of 2 pi
+        np.testing.assert_allclose(indices["mu"], [2 * math.pi, -4 * math.pi, 0.0], atol=1e-9)
+        np.testing.assert_allclose(indices["mu_star"], [2 * math.pi, 4 * math.pi, 0.0], atol=1e-9)
+        np.testing.assert_allclose(indices["sigma"], 0.0, atol=1e-9)
+
+
+class TestPlantSensitivity(unittest.TestCase):
+    def test_parameter_names(self):
+        with self.assertRaises(KeyError):
+            Parameter("turbine.colour", 0.0, 1.0)
+        with self.assertRaises(KeyError):
+            Parameter("reservoir_depth", 0.0, 1.0)
+        with self.assertRaises(ValueError):
+            Parameter("turbine.efficiency", 0.3, 0.2)
+
+    def test_batch_matches_engine(self):
+        X = saltelli_design(DEFAULT_PARAMETERS, 2, seed=3)[:3]
+        Y = evaluate(DEFAULT_PARAMETERS, X, n_steps=2, workers=1, tabulated=False)
+        for row, power in zip(X, Y[:, 0]):
+            engine = SimulationEngine()
+            for parameter, value in zip(DEFAULT_PARAMETERS, row):
+                component, _, attribute = parameter.name.rpartition(".")
+                if component:
+                    setattr(getattr(engine, component), attribute, value)
+                else:
+                    engine.state[parameter.name] = value
+            engine.step_simulation(1.0)
+            engine.step_simulation(1.0)
+            self.assertAlmostEqual(engine.state["turbine_out_power"], power, places=9)
+
+    def test_sobol_study(self):
+        results = sobol(n=256, outputs=("turbine_out_power", "steam_flow"), n_bootstrap=50, workers=2)
+        flow = results["steam_flow"]
+        # Steam flow is the steam separator's outlet: wellhead flow times
+        # steam fraction and nothing else
+        self.assertGreater(flow["wellhead_flow"]["ST"], 0.8)
+        for name in ("turbine.efficiency", "wellhead_pressure", "moistureseparator.flow_index"):
+            self.assertEqual(flow[name]["ST"], 0.0)
+        power = results["turbine_out_power"]
+        for name in ("turbine.efficiency", "moistureseparator.flow_index", "moistureseparator.pressure_drop"):
+            self.assertGreater(power[name]["ST"], 0.0)
+        self.assertEqual(results, sobol(n=256, outputs=("turbine_out_power", "steam_flow"),
+                                        n_bootstrap=50, workers=1))
+
+    def test_morris_study(self):
+        results = morris(trajectories=20, n_bootstrap=50, workers=1)["turbine_out_power"]
+        self.assertGreater(results["turbine.efficiency"]["mu"], 0.0)
+        self.assertGreater(results["moistureseparator.heat_index"]["mu_star"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import unittest
+from powerplantsim.server.simulation_server import Session, SimulationServer, Viewer
+from powerplantsim.server.websocket import connect
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.frames import KEY, FrameDecoder
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+        self.backlog = 0
+
+    def write_frame(self, frame):
+        self.frames.append(frame)
+
+    def buffered(self):
+        return self.backlog
+
+
+class TestSimulationServer(unittest.TestCase):
+    def test_viewers_share_one_engine(self):
+        async def scenario():
+            server = SimulationServer(rate=50.0)
+            await server.start(port=0)
+            control = await connect("127.0.0.1", server.port)
+            watcher = await connect("127.0.0.1", server.port, "/default")
+            layout = json.loads(await watcher.recv())
+            decoder = FrameDecoder(layout["fields"])
+            await control.recv()
+
+            await control.send(json.dumps({"type": "input", "name": "wellhead_flow", "value": 100.0}))
+            await control.send(json.dumps({"type": "input", "name": "no_such_field", "value": 1.0}))
+            error = json.loads(await control.recv())
+            while decoder.values["wellhead_flow"] != 100.0:
+                decoder.decode(await asyncio.wait_for(watcher.recv(), 5.0))
+            await control.close()
+            await watcher.close()
+            await server.close()
+            return error, server.sessions
+
+        error, sessions = asyncio.run(scenario())
+        self.assertEqual(error["type"], "error")
+        self.assertEqual(list(sessions), ["default"])
+
+    def test_slow_viewer_is_skipped_then_resynced(self):
+        session = Session("test", SimulationEngine(), high_water=1000)
+        fast, slow = Viewer(FakeWebSocket()), Viewer(FakeWebSocket())
+        session.viewers.update((fast, slow))
+        session.broadcast(0.0)
+
+        slow.websocket.backlog = 5000
+        for i in range(1, 4):
+            session.engine.step_simulation(0.1)
+            session.broadcast(0.1 * i)
+        self.assertEqual((fast.frames, slow.frames, slow.skipped), (4, 1, 3))
+
+        # Back under the high-water mark: a key frame, then deltas again
+        slow.websocket.backlog = 0
+        session.broadcast(0.5)
+        session.broadcast(0.6)
+        # Strip the WebSocket header, 4 bytes for payloads over 125 bytes
+        key, delta = [frame[4:] if frame[1] == 126 else frame[2:] for frame in slow.websocket.frames[-2:]]
+        self.assertEqual(key[0], KEY)
+        decoder = FrameDecoder()
+        decoder.decode(key)
+        decoder.decode(delta)
+        self.assertEqual(decoder.values["wellhead_flow"], session.engine.state.wellhead_flow)
+
+    def test_speed_and_inputs_are_bounded(self):
+        session = Session("test", SimulationEngine(), dt=0.1, max_speed=50.0, max_steps_per_tick=20)
+        self.assertIsNotNone(session.handle(json.dumps({"type": "speed", "value": float("inf")})))
+        self.assertIsNotNone(session.handle('{"type": "speed", "value": NaN}'))
+        self.assertEqual(session.speed, 1.0)
+        self.assertIsNone(session.handle(json.dumps({"type": "speed", "value": 1e9})))
+        self.assertEqual(session.speed, 50.0)
+
+        flow = session.engine.state.wellhead_flow
+        self.assertIsNotNone(session.handle('{"type": "input", "name": "wellhead_flow", "value": NaN}'))
+        self.assertIsNotNone(session.handle('{"type": "input", "name": "wellhead_flow", "value": -Infinity}'))
+        self.assertEqual(session.engine.state.wellhead_flow, flow)
+
+        # However far behind, one tick runs at most max_steps_per_tick steps
+        session.max_speed = session.speed = 1e9
+        session.advance(0.0)
+        session.advance(1000.0)
+        self.assertAlmostEqual(session.engine.simulation_time, 20 * 0.1, delta=0.1 + 1e-9)
+        self.assertEqual(session.overruns, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
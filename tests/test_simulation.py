@@ -1,10 +1,14 @@
+import math
 import unittest
-from powerplantsim.simulation.engine import run_simulation_step
+from powerplantsim.simulation.engine import SimulationEngine
 
 class TestEngine(unittest.TestCase):
-    def test_run_simulation_step(self):
-        # Just verify it doesn't crash.
-        run_simulation_step()
+    def test_step_simulation(self):
+        engine = SimulationEngine()
+        engine.step_simulation(1.0)
+        self.assertEqual(engine.simulation_time, 1.0)
+        self.assertTrue(math.isfinite(engine.state["turbine_out_power"]))
+        self.assertGreater(engine.state["turbine_out_power"], 0.0)
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
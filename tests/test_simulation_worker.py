@@ -0,0 +1,48 @@
+import time
+import unittest
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.thermo import TabulatedSteamProperties
+
+try:
+    from powerplantsim.gui.simulation_worker import LatestValue, SimulationWorker
+except ImportError:
+    SimulationWorker = None
+
+
+@unittest.skipUnless(SimulationWorker, "PyQt5 not installed")
+class TestSimulationWorker(unittest.TestCase):
+    def test_latest_value_counts_dropped(self):
+        handoff = LatestValue()
+        self.assertIsNone(handoff.take())
+        for i in range(3):
+            handoff.publish(i)
+        self.assertEqual(handoff.take(), 2)
+        self.assertIsNone(handoff.take())
+        self.assertEqual(handoff.dropped, 2)
+
+    def test_runs_faster_than_real_time(self):
+        worker = SimulationWorker(SimulationEngine(), dt=0.1, speed=20.0)
+        worker.set_input("wellhead_flow", 100.0)
+        worker.set_running(True)
+        worker.start()
+        time.sleep(0.5)
+        worker.stop()
+        sim_time, state = worker.snapshots.take()
+        self.assertGreater(sim_time, 5.0)
+        self.assertEqual(state["wellhead_flow"], 100.0)
+        self.assertAlmostEqual(state["steam_flow"], 90.0)
+
+    def test_time_warp_adapts_steps_per_frame(self):
+        worker = SimulationWorker(SimulationEngine(steam_properties=TabulatedSteamProperties()), dt=0.1, speed=1.0)
+        worker.set_time_warp(True, frame_interval=0.01)
+        worker.set_running(True)
+        worker.start()
+        time.sleep(0.5)
+        worker.stop()
+        sim_time, _ = worker.snapshots.take()
+        self.assertGreater(worker.warp_steps, 1)
+        self.assertGreater(sim_time, 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.trajectory import NpyTrajectoryWriter, trajectory_dtype
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_restore_reproduces_branch(self):
+        engine = SimulationEngine()
+        engine.state["wellhead_flow"] = 100.0
+        engine.step_simulation(1.0)
+        engine.turbine.efficiency = 0.25
+        blob = engine.snapshot()
+
+        engine.step_simulation(1.0)
+        expected = engine.state.as_dict()
+
+        engine.turbine.efficiency = 0.3
+        engine.state["wellhead_flow"] = 50.0
+        engine.step_simulation(1.0)
+
+        engine.restore(blob)
+        self.assertEqual(engine.simulation_time, 1.0)
+        self.assertEqual(engine.turbine.efficiency, 0.25)
+        engine.step_simulation(1.0)
+        np.testing.assert_equal(engine.state.as_dict(), expected)
+
+        # Any engine built the same way accepts the blob
+        other = SimulationEngine()
+        other.restore(blob)
+        self.assertEqual(other.state["wellhead_flow"], 100.0)
+
+    def test_layout_mismatch(self):
+        blob = SimulationEngine(dynamics=True).snapshot()
+        with self.assertRaises(ValueError):
+            SimulationEngine().restore(blob)
+
+    def test_resume_after_crash(self):
+        fields = ["turbine_out_power"]
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = os.path.join(tmp, "run.ckpt")
+            path = os.path.join(tmp, "run.npy")
+
+            reference = SimulationEngine().run(100, record=fields)
+
+            engine = SimulationEngine()
+            with NpyTrajectoryWriter(path, trajectory_dtype(fields)) as writer:
+                # "Crash" after 70 steps; the last checkpoint is at step 60
+                engine.run(70, record=fields, writer=writer, chunk_size=8,
+                           checkpoint=checkpoint, checkpoint_every=20)
+
+            resumed = SimulationEngine()
+            resumed.load_checkpoint(checkpoint)
+            self.assertEqual(resumed.simulation_time, 60.0)
+            with NpyTrajectoryWriter(path, trajectory_dtype(fields), append=True) as writer:
+                writer.discard_after(resumed.simulation_time)
+                resumed.run(40, record=fields, writer=writer)
+            result = np.load(path)
+        np.testing.assert_array_equal(result, reference)
+
+
+if __name__ == "__main__":
+    unittest.main()
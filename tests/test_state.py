@@ -0,0 +1,32 @@
+import math
+import unittest
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.state import INITIAL_STATE, PlantState
+
+
+class TestPlantState(unittest.TestCase):
+    def test_dict_compatible(self):
+        state = PlantState(wellhead_flow=90)
+        self.assertEqual(list(state), list(INITIAL_STATE))
+        self.assertEqual(state["wellhead_flow"], 90.0)
+        state["wellhead_temp"] = 180
+        self.assertEqual(state.wellhead_temp, 180.0)
+        self.assertTrue(math.isnan(state.get("steam_flow")))
+        with self.assertRaises(KeyError):
+            state["no_such_field"] = 1.0
+        with self.assertRaises(KeyError):
+            state["no_such_field"]
+        for name in ("as_dict", "copy", "FIELDS", "__slots__"):
+            with self.assertRaises(KeyError):
+                state[name]
+        self.assertIsNone(state.get("as_dict"))
+
+    def test_engine_fills_derived_fields(self):
+        engine = SimulationEngine()
+        engine.step_simulation(0.1)
+        self.assertFalse(math.isnan(engine.state["separator_outlet_pressure"]))
+        self.assertFalse(math.isnan(engine.state["steam_flow"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from powerplantsim.simulation.engine import SimulationEngine
+
+
+class CoupledCondenser:
+    """Condenser whose pressure relaxes towards 0.1 bar from its last value."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def compute_cooling_capacity(self, inlet_flow, inlet_temp, dt):
+        pressure = self.engine.state["condenser_pressure"]
+        return {"pressure": 0.5 * pressure + 0.05, "temperature": 40.0}
+
+
+class TestSteadyState(unittest.TestCase):
+    def test_matches_time_marching(self):
+        marched = SimulationEngine()
+        marched.state["wellhead_flow"] = 100.0
+        for _ in range(5):
+            marched.step_simulation(1.0)
+
+        solved = SimulationEngine()
+        result = solved.solve_steady_state({"wellhead_flow": 100.0})
+        self.assertTrue(result["converged"])
+        self.assertEqual(solved.simulation_time, 0.0)
+        for name, value in marched.state.items():
+            if value == value:  # skip NaN fields
+                self.assertAlmostEqual(solved.state[name], value)
+
+    def test_wegstein_beats_substitution(self):
+        plain = SimulationEngine()
+        plain.condenser = CoupledCondenser(plain)
+        plain_result = plain.solve_steady_state(acceleration=None, max_iter=500)
+
+        fast = SimulationEngine()
+        fast.condenser = CoupledCondenser(fast)
+        fast_result = fast.solve_steady_state()
+
+        self.assertTrue(plain_result["converged"] and fast_result["converged"])
+        self.assertLess(fast_result["iterations"], plain_result["iterations"] / 5)
+        self.assertAlmostEqual(fast.state["condenser_pressure"], 0.1, places=8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from powerplantsim.simulation.sensitivity import evaluate
+from powerplantsim.simulation.surrogate import DEFAULT_INPUTS, PlantSurrogate, load_surrogate
+
+
+class TestSurrogate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.surrogate = PlantSurrogate.train()
+        rng = np.random.default_rng(11)
+        cls.X = np.column_stack([p.scale(rng.random(5000)) for p in DEFAULT_INPUTS])
+        cls.exact = evaluate(DEFAULT_INPUTS, cls.X, workers=1)[:, 0]
+
+    def test_accuracy_within_bounds(self):
+        values, bound = self.surrogate.predict(self.X)
+        error = np.abs(values - self.exact)
+        self.assertLess(error.max(), self.surrogate.max_error)
+        self.assertLess(np.mean(error > bound), 0.001)
+        # Cells across the phase change are answered by the engine, exactly
+        fallback = bound == 0.0
+        self.assertTrue(0 < np.mean(fallback) < 0.1)
+        np.testing.assert_array_equal(values[fallback], self.exact[fallback])
+        self.assertGreater(self.surrogate.validation["valid_fraction"], 0.9)
+
+    def test_outside_envelope(self):
+        X = np.array([[8.0, 178.0, 85.0], [10.5, 178.0, 130.0]])
+        before = self.surrogate.fallback_count
+        values, bound = self.surrogate.predict(X)
+        np.testing.assert_array_equal(bound, 0.0)
+        np.testing.assert_array_equal(values, evaluate(DEFAULT_INPUTS, X, workers=1)[:, 0])
+        self.assertEqual(self.surrogate.fallback_count, before + 2)
+
+    def test_non_finite_inputs(self):
+        X = np.array([[np.nan, 178.0, 85.0], [10.5, np.inf, 85.0], [10.5, 178.0, 85.0]])
+        before = self.surrogate.fallback_count
+        values, bound = self.surrogate.predict(X)
+        np.testing.assert_array_equal(values[:2], np.nan)
+        np.testing.assert_array_equal(bound[:2], np.nan)
+        self.assertEqual((values[2], bound[2]), self.surrogate.predict_one(10.5, 178.0, 85.0))
+        self.assertEqual(self.surrogate.fallback_count, before)
+        self.assertTrue(all(np.isnan(self.surrogate.predict_one(np.nan, 178.0, 85.0))))
+
+    def test_predict_one(self):
+        X = np.vstack((self.X[:500], [[8.0, 178.0, 85.0]]))
+        values, bound = self.surrogate.predict(X)
+        for row, value, b in zip(X.tolist(), values, bound):
+            self.assertEqual(self.surrogate.predict_one(*row), (value, b))
+        with self.assertRaises(ValueError):
+            self.surrogate.predict_one(10.5, 178.0)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "surrogate.npz")
+            self.surrogate.save(path)
+            loaded = load_surrogate(path)
+            self.assertEqual(loaded.validation, self.surrogate.validation)
+            self.assertEqual([p.name for p in loaded.inputs], [p.name for p in DEFAULT_INPUTS])
+            for a, b in zip(loaded.predict(self.X[:1000]), self.surrogate.predict(self.X[:1000])):
+                np.testing.assert_array_equal(a, b)
+
+            data = dict(np.load(path))
+            data["version"] = 99
+            np.savez(path, **data)
+            with self.assertRaises(ValueError):
+                load_surrogate(path)
+
+    def test_train_arguments(self):
+        with self.assertRaises(ValueError):
+            PlantSurrogate.train(cells=(4, 4))
+        with self.assertRaises(ValueError):
+            PlantSurrogate.train(degree=4, samples_per_cell=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.sweep import load_sweep, sweep, sweep_dtype, sweep_settings_path
+from powerplantsim.simulation.trajectory import NpyTrajectoryWriter
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "sweep.npy")
+        self.grids = {"wellhead_pressure": [9.0, 10.5, 12.0], "wellhead_flow": [60.0, 85.0]}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_matches_engine(self):
+        ran = sweep(self.grids, self.path, workers=2, shard_size=2, tabulated=False)
+        self.assertEqual(ran, 6)
+        table = load_sweep(self.path)
+        np.testing.assert_array_equal(table["index"], np.arange(6))
+        for row in table:
+            engine = SimulationEngine()
+            engine.state["wellhead_pressure"] = row["wellhead_pressure"]
+            engine.state["wellhead_flow"] = row["wellhead_flow"]
+            engine.step_simulation(1.0)
+            engine.step_simulation(1.0)
+            self.assertEqual(row["turbine_out_power"], engine.state["turbine_out_power"])
+
+    def test_resume_skips_finished_combinations(self):
+        sweep(self.grids, self.path, workers=1, tabulated=False)
+        full = load_sweep(self.path)
+
+        # Keep two finished rows plus half a row, as if the run had crashed
+        dtype = sweep_dtype(self.grids, ("turbine_out_power", "steam_flow", "separator_outlet_pressure"))
+        with NpyTrajectoryWriter(self.path, dtype) as writer:
+            writer.write(full[:2])
+        with open(self.path, "ab") as f:
+            f.write(b"\0" * (dtype.itemsize // 2))
+
+        progress = []
+        ran = sweep(self.grids, self.path, workers=1, resume=True, tabulated=False,
+                    progress=lambda done, total: progress.append(done))
+        self.assertEqual(ran, 4)
+        self.assertEqual(progress[0], 2)
+        np.testing.assert_array_equal(load_sweep(self.path), full)
+
+    def test_resume_refuses_other_grids(self):
+        sweep(self.grids, self.path, workers=1, shard_size=2, tabulated=False)
+        with open(self.path, "rb") as f:
+            before = f.read()
+        for grids in ({"wellhead_pressure": [9.0, 10.5, 12.0], "wellhead_flow": [60.0, 70.0]},
+                      {"wellhead_flow": [60.0, 85.0], "wellhead_pressure": [9.0, 10.5, 12.0]}):
+            with self.assertRaises(ValueError):
+                sweep(grids, self.path, workers=1, resume=True, tabulated=False)
+        with self.assertRaises(ValueError):
+            sweep(self.grids, self.path, workers=1, resume=True, tabulated=True)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(sweep(self.grids, self.path, workers=1, resume=True, tabulated=False), 0)
+
+        os.remove(sweep_settings_path(self.path))
+        with self.assertRaises(ValueError):
+            sweep(self.grids, self.path, workers=1, resume=True, tabulated=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
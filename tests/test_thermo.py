@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.thermo import IAPWS97Properties, TabulatedSteamProperties, saturation_temperature
+
+
+class TestTabulatedSteamProperties(unittest.TestCase):
+    def setUp(self):
+        self.exact = IAPWS97Properties()
+        self.table = TabulatedSteamProperties()
+
+    def test_within_error_bound(self):
+        rng = np.random.default_rng(1)
+        P = rng.uniform(0.2, 2.0, 200)
+        T = rng.uniform(393.15, 493.15, 200)
+        for p, t in zip(P, T):
+            self.assertAlmostEqual(self.table.enthalpy(p, t), self.exact.enthalpy(p, t),
+                                   delta=self.table.max_error)
+        h = self.table.enthalpy_array(P, T)
+        expected = self.exact.enthalpy_array(P, T)
+        self.assertLessEqual(np.max(np.abs(h - expected)), self.table.max_error)
+
+    def test_fallback_outside_grid(self):
+        h = self.table.enthalpy(3.0, 550.0)
+        self.assertEqual(h, self.exact.enthalpy(3.0, 550.0))
+        self.assertEqual(self.table.fallback_count, 1)
+
+    def test_engine_matches_exact_backend(self):
+        exact = SimulationEngine()
+        fast = SimulationEngine(steam_properties=self.table)
+        for _ in range(5):
+            exact.step_simulation(0.1)
+            fast.step_simulation(0.1)
+        self.assertAlmostEqual(exact.state["turbine_out_power"], fast.state["turbine_out_power"], places=2)
+
+
+class TestSaturationTemperature(unittest.TestCase):
+    def test_out_of_bound(self):
+        self.assertAlmostEqual(saturation_temperature(0.101325), 373.124, places=3)
+        for P in (1e-4, 25.0):
+            with self.assertRaises(ValueError):
+                saturation_temperature(P)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from powerplantsim.simulation.engine import SimulationEngine
+from powerplantsim.simulation.trajectory import open_trajectory_writer, read_trajectory
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestTrajectoryStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.fields = ["turbine_out_power", "steam_flow"]
+        self.expected = SimulationEngine().run(50, dt=0.5, record=self.fields)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def stream(self, name):
+        path = os.path.join(self.tmpdir.name, name)
+        with open_trajectory_writer(path, self.fields) as writer:
+            self.assertIsNone(SimulationEngine().run(50, dt=0.5, record=self.fields, chunk_size=8, writer=writer))
+        return path
+
+    def check_window(self, path):
+        np.testing.assert_array_equal(read_trajectory(path), self.expected)
+        window = read_trajectory(path, t_start=5.0, t_end=10.0, fields=["steam_flow"])
+        self.assertEqual(window.dtype.names, ("time", "steam_flow"))
+        np.testing.assert_allclose(window["time"], np.arange(10, 20) * 0.5)
+
+    def test_npy(self):
+        path = self.stream("run.npy")
+        self.assertEqual(len(np.load(path, mmap_mode="r")), 50)
+        self.check_window(path)
+
+    @unittest.skipUnless(pyarrow, "pyarrow not installed")
+    def test_parquet(self):
+        self.check_window(self.stream("run.parquet"))
+
+
+if __name__ == "__main__":
+    unittest.main()